@@ -57,8 +57,7 @@ class CachedAttachment(object):
         return self._data
 
     def delete(self):
-        for key in self.chunk_keys:
-            self._cache.inner.delete(key)
+        self._cache.inner.delete_many(list(self.chunk_keys))
 
     @property
     def chunk_keys(self):
@@ -123,6 +122,31 @@ class BaseAttachmentCache(object):
         key = ATTACHMENT_DATA_CHUNK_KEY.format(key=key, id=id, chunk_index=chunk_index)
         self.inner.set(key, zlib.compress(chunk_data), timeout, raw=True)
 
+    def set_chunks(self, chunks, timeout=None, pool=None):
+        """
+        Stores many attachment chunks at once. ``chunks`` is a list of
+        ``(key, id, chunk_index, chunk_data)`` tuples.
+
+        Chunks are compressed on ``pool`` if one is given (``zlib`` releases
+        the GIL) and written in a single batch, which the redis backends turn
+        into one pipeline per node.
+        """
+        if not chunks:
+            return
+
+        datas = [chunk_data for _, _, _, chunk_data in chunks]
+        if pool is not None:
+            compressed = pool.map(zlib.compress, datas)
+        else:
+            compressed = [zlib.compress(data) for data in datas]
+
+        items = [
+            (ATTACHMENT_DATA_CHUNK_KEY.format(key=key, id=id, chunk_index=chunk_index), value)
+            for (key, id, chunk_index, _), value in zip(chunks, compressed)
+        ]
+        metrics.timing("attachments.chunks-batch-size", len(items))
+        self.inner.set_many(items, timeout, raw=True)
+
     def set_unchunked_data(self, key, id, data, timeout=None, metrics_tags=None):
         key = ATTACHMENT_UNCHUNKED_DATA_KEY.format(key=key, id=id)
         compressed = zlib.compress(data)
@@ -145,8 +169,7 @@ class BaseAttachmentCache(object):
     def get_data(self, attachment):
         data = []
 
-        for key in attachment.chunk_keys:
-            raw_data = self.inner.get(key, raw=True)
+        for raw_data in self.inner.get_many(list(attachment.chunk_keys), raw=True):
             if raw_data is None:
                 raise MissingAttachmentChunks()
             data.append(zlib.decompress(raw_data))
@@ -154,7 +177,8 @@ class BaseAttachmentCache(object):
         return b"".join(data)
 
     def delete(self, key):
+        keys = [ATTACHMENT_META_KEY.format(key=key)]
         for attachment in self.get(key):
-            attachment.delete()
+            keys.extend(attachment.chunk_keys)
 
-        self.inner.delete(ATTACHMENT_META_KEY.format(key=key))
+        self.inner.delete_many(keys)
@@ -19,8 +19,35 @@ class BaseCache(local):
     def set(self, key, value, timeout, version=None, raw=False):
         raise NotImplementedError
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        """
+        Stores every ``(key, value)`` pair of ``items``. Backends that can
+        batch writes should override this, the default implementation issues
+        one ``set`` per key.
+        """
+        for key, value in items:
+            self.set(key, value, timeout, version=version, raw=raw)
+
     def delete(self, key, version=None):
         raise NotImplementedError
 
+    def delete_many(self, keys, version=None):
+        """
+        Deletes every key of ``keys``. Backends that can batch writes should
+        override this, the default implementation issues one ``delete`` per
+        key.
+        """
+        for key in keys:
+            self.delete(key, version=version)
+
     def get(self, key, version=None, raw=False):
         raise NotImplementedError
+
+    def get_many(self, keys, version=None, raw=False):
+        """
+        Returns a list with the value of each key of ``keys`` (in the same
+        order), or ``None`` for keys that are missing. Backends that can batch
+        reads should override this, the default implementation issues one
+        ``get`` per key.
+        """
+        return [self.get(key, version=version, raw=raw) for key in keys]
@@ -0,0 +1,75 @@
+from __future__ import absolute_import
+
+import msgpack
+import zlib
+
+from sentry.utils import json
+
+
+class Codec(object):
+    """
+    Encodes values stored in the cache and decodes them when they are read.
+
+    Codecs with a ``version`` prefix the encoded payload with that byte so
+    that values can be decoded regardless of which codec a writer used, which
+    allows the codec to be changed while older values are still in the cache.
+    """
+
+    version = None
+
+    def encode(self, value):
+        raise NotImplementedError
+
+    def decode(self, value):
+        raise NotImplementedError
+
+
+class JSONCodec(Codec):
+    """
+    The original, unversioned format. JSON documents never begin with a
+    control character, so they can't be mistaken for a versioned payload.
+    """
+
+    def encode(self, value):
+        return json.dumps(value)
+
+    def decode(self, value):
+        return json.loads(value)
+
+
+class CompressedMsgpackCodec(Codec):
+    """
+    Byte strings are packed as msgpack ``bin`` and text as ``str``, so values
+    decode to the types they were written with. Text that isn't valid UTF-8
+    raises on decode, as it does with JSON.
+    """
+
+    version = b"\x02"
+
+    def __init__(self, level=1):
+        # A low compression level keeps the CPU overhead small; most of the
+        # size reduction for event payloads comes from the first levels.
+        self.level = level
+
+    def encode(self, value):
+        return self.version + zlib.compress(
+            msgpack.packb(value, use_bin_type=True, default=json.better_default_encoder),
+            self.level,
+        )
+
+    def decode(self, value):
+        return msgpack.unpackb(
+            zlib.decompress(value[1:]), raw=False, use_list=True, unicode_errors="strict"
+        )
+
+
+default_codec = JSONCodec()
+
+versioned_codecs = {codec.version: codec for codec in [CompressedMsgpackCodec()]}
+
+
+def decode(value):
+    """
+    Decodes a value written by any known codec.
+    """
+    return versioned_codecs.get(value[:1], default_codec).decode(value)
@@ -9,8 +9,18 @@ class DjangoCache(BaseCache):
     def set(self, key, value, timeout, version=None, raw=False):
         cache.set(key, value, timeout, version=version or self.version)
 
+    def set_many(self, items, timeout, version=None, raw=False):
+        cache.set_many(dict(items), timeout, version=version or self.version)
+
     def delete(self, key, version=None):
         cache.delete(key, version=version or self.version)
 
+    def delete_many(self, keys, version=None):
+        cache.delete_many(keys, version=version or self.version)
+
     def get(self, key, version=None, raw=False):
         return cache.get(key, version=version or self.version)
+
+    def get_many(self, keys, version=None, raw=False):
+        values = cache.get_many(keys, version=version or self.version)
+        return [values.get(key) for key in keys]
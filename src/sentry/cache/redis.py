@@ -1,8 +1,11 @@
 from __future__ import absolute_import
 
-from sentry.utils import json
+from contextlib import contextmanager
+
+from sentry.utils.imports import import_string
 from sentry.utils.redis import get_cluster_from_options, redis_clusters
 
+from . import codecs
 from .base import BaseCache
 
 
@@ -16,29 +19,91 @@ class CommonRedisCache(BaseCache):
 
     def __init__(self, client, **options):
         self.client = client
+        # The ``codec`` option only selects how values are written: values are
+        # always decoded according to their version prefix, so the codec can
+        # be switched while values written by the previous one are still live.
+        codec = options.pop("codec", None)
+        self.codec = import_string(codec)() if codec is not None else codecs.default_codec
         BaseCache.__init__(self, **options)
 
-    def set(self, key, value, timeout, version=None, raw=False):
-        key = self.make_key(key, version=version)
-        v = json.dumps(value) if not raw else value
+    @contextmanager
+    def pipeline(self):
+        """
+        Yields a client that buffers commands and sends them in one batch
+        when the block exits.
+        """
+        pipe = self.client.pipeline(transaction=False)
+        yield pipe
+        pipe.execute()
+
+    def _prepare_value(self, key, value, raw):
+        v = self.codec.encode(value) if not raw else value
         if len(v) > self.max_size:
             raise ValueTooLarge("Cache key too large: %r %r" % (key, len(v)))
+        return v
+
+    def _set(self, client, key, value, timeout):
         if timeout:
-            self.client.setex(key, int(timeout), v)
+            client.setex(key, int(timeout), value)
         else:
-            self.client.set(key, v)
+            client.set(key, value)
+
+    def set(self, key, value, timeout, version=None, raw=False):
+        key = self.make_key(key, version=version)
+        v = self._prepare_value(key, value, raw)
+        self._set(self.client, key, v, timeout)
+
+    def set_many(self, items, timeout, version=None, raw=False):
+        # Validate (and encode) everything up front so that an oversized
+        # value does not leave a partially written batch behind.
+        values = []
+        for key, value in items:
+            key = self.make_key(key, version=version)
+            values.append((key, self._prepare_value(key, value, raw)))
+
+        if not values:
+            return
+
+        with self.pipeline() as client:
+            for key, v in values:
+                self._set(client, key, v, timeout)
 
     def delete(self, key, version=None):
         key = self.make_key(key, version=version)
         self.client.delete(key)
 
+    def delete_many(self, keys, version=None):
+        keys = [self.make_key(key, version=version) for key in keys]
+        if not keys:
+            return
+
+        with self.pipeline() as client:
+            for key in keys:
+                client.delete(key)
+
     def get(self, key, version=None, raw=False):
         key = self.make_key(key, version=version)
         result = self.client.get(key)
         if result is not None and not raw:
-            result = json.loads(result)
+            result = codecs.decode(result)
         return result
 
+    def _get_many(self, keys):
+        pipe = self.client.pipeline(transaction=False)
+        for key in keys:
+            pipe.get(key)
+        return pipe.execute()
+
+    def get_many(self, keys, version=None, raw=False):
+        keys = [self.make_key(key, version=version) for key in keys]
+        if not keys:
+            return []
+
+        results = self._get_many(keys)
+        if not raw:
+            results = [codecs.decode(r) if r is not None else None for r in results]
+        return results
+
 
 class RbCache(CommonRedisCache):
     def __init__(self, **options):
@@ -46,6 +111,16 @@ class RbCache(CommonRedisCache):
         client = cluster.get_routing_client()
         CommonRedisCache.__init__(self, client, **options)
 
+    def pipeline(self):
+        # The routing client's map mode groups the buffered commands by the
+        # node owning each key and sends one pipeline per node.
+        return self.client.map()
+
+    def _get_many(self, keys):
+        with self.client.map() as client:
+            promises = [client.get(key) for key in keys]
+        return [promise.value for promise in promises]
+
 
 # Confusing legacy name for RbCache.  We don't actually have a pure redis cache
 RedisCache = RbCache
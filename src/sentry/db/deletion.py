@@ -10,15 +10,28 @@ from sentry.utils.compat import zip
 
 
 class BulkDeleteQuery(object):
-    def __init__(self, model, project_id=None, dtfield=None, days=None, order_by=None):
+    def __init__(
+        self,
+        model,
+        project_id=None,
+        dtfield=None,
+        days=None,
+        order_by=None,
+        min_id=None,
+        max_id=None,
+    ):
         self.model = model
         self.project_id = int(project_id) if project_id else None
         self.dtfield = dtfield
         self.days = int(days) if days is not None else None
         self.order_by = order_by
+        # Restricts the query to the half-open id range [min_id, max_id),
+        # which is used to shard a deletion across several workers.
+        self.min_id = int(min_id) if min_id is not None else None
+        self.max_id = int(max_id) if max_id is not None else None
         self.using = router.db_for_write(model)
 
-    def execute(self, chunk_size=10000):
+    def _get_where(self):
         quote_name = connections[self.using].ops.quote_name
 
         where = []
@@ -27,12 +40,20 @@ class BulkDeleteQuery(object):
                 u"{} < '{}'::timestamptz".format(
                     quote_name(self.dtfield),
                     (timezone.now() - timedelta(days=self.days)).isoformat(),
-                    self.days,
                 )
             )
         if self.project_id:
             where.append(u"project_id = {}".format(self.project_id))
+        if self.min_id is not None:
+            where.append(u"id >= {}".format(self.min_id))
+        if self.max_id is not None:
+            where.append(u"id < {}".format(self.max_id))
+        return where
+
+    def execute(self, chunk_size=10000):
+        quote_name = connections[self.using].ops.quote_name
 
+        where = self._get_where()
         if where:
             where_clause = u"where {}".format(" and ".join(where))
         else:
@@ -68,13 +89,48 @@ class BulkDeleteQuery(object):
         return self._continuous_query(query)
 
     def _continuous_query(self, query):
-        results = True
+        """
+        Runs ``query`` until it stops affecting rows and returns the total
+        number of affected rows.
+        """
+        total = 0
         cursor = connections[self.using].cursor()
-        while results:
+        while True:
             cursor.execute(query)
-            results = cursor.rowcount > 0
+            if cursor.rowcount <= 0:
+                break
+            total += cursor.rowcount
+        return total
+
+    def get_id_ranges(self, num_shards):
+        """
+        Splits the ids of the rows matched by this query into ``num_shards``
+        half-open ``(min_id, max_id)`` ranges of equal width. Each range can
+        be passed back to a ``BulkDeleteQuery`` to process one shard.
+        """
+        where = self._get_where()
+        cursor = connections[self.using].cursor()
+        cursor.execute(
+            u"select min(id), max(id) from {table} {where}".format(
+                table=self.model._meta.db_table,
+                where=u"where {}".format(" and ".join(where)) if where else "",
+            )
+        )
+        min_id, max_id = cursor.fetchone()
+        if min_id is None:
+            return []
+
+        max_id += 1
+        step = max(1, -(-(max_id - min_id) // num_shards))
+        return [(start, min(start + step, max_id)) for start in range(min_id, max_id, step)]
 
     def iterator(self, chunk_size=100, batch_size=100000):
+        """
+        Yields the ids of the matching rows in chunks of ``chunk_size``,
+        ordered by ``order_by``. Rows are paginated by ``(order_by, id)``
+        keys, so every row is yielded exactly once and no page has to skip
+        over previously read rows.
+        """
         assert self.days is not None
         assert self.dtfield is not None and self.dtfield == self.order_by
 
@@ -99,17 +155,25 @@ class BulkDeleteQuery(object):
 
                     if self.project_id:
                         where.append(("project_id = %s", [self.project_id]))
+                    if self.min_id is not None:
+                        where.append(("id >= %s", [self.min_id]))
+                    if self.max_id is not None:
+                        where.append(("id < %s", [self.max_id]))
 
                     if self.order_by[0] == "-":
                         direction = "desc"
                         order_field = self.order_by[1:]
                         if position is not None:
-                            where.append((u"{} <= %s".format(quote_name(order_field)), [position]))
+                            where.append(
+                                (u"({}, id) < (%s, %s)".format(quote_name(order_field)), position)
+                            )
                     else:
                         direction = "asc"
                         order_field = self.order_by
                         if position is not None:
-                            where.append((u"{} >= %s".format(quote_name(order_field)), [position]))
+                            where.append(
+                                (u"({}, id) > (%s, %s)".format(quote_name(order_field)), position)
+                            )
 
                     conditions, parameters = zip(*where)
                     parameters = list(itertools.chain.from_iterable(parameters))
@@ -118,7 +182,7 @@ class BulkDeleteQuery(object):
                         select id, {order_field}
                         from {table}
                         where {conditions}
-                        order by {order_field} {direction}
+                        order by {order_field} {direction}, id {direction}
                         limit {batch_size}
                     """.format(
                         table=self.model._meta.db_table,
@@ -132,7 +196,8 @@ class BulkDeleteQuery(object):
 
                     i = 0
                     for i, row in enumerate(cursor, 1):
-                        key, position = row
+                        key, value = row
+                        position = [value, key]
                         chunk.append(key)
                         if len(chunk) == chunk_size:
                             yield tuple(chunk)
@@ -23,7 +23,12 @@ as Event, so it can more efficiently bulk delete rows.
 
 from __future__ import absolute_import
 
-from .base import BulkModelDeletionTask, ModelDeletionTask, ModelRelation  # NOQA
+from .base import (  # NOQA
+    BulkModelDeletionTask,
+    FastModelDeletionTask,
+    ModelDeletionTask,
+    ModelRelation,
+)
 from .manager import DeletionTaskManager
 
 default_manager = DeletionTaskManager(default_task=ModelDeletionTask)
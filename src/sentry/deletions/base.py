@@ -2,13 +2,49 @@ from __future__ import absolute_import, print_function
 
 import logging
 import re
+import time
+
+from django.db.models import signals
+from django.db.models.deletion import DO_NOTHING, get_candidate_relations_to_delete
 
 from sentry.constants import ObjectStatus
-from sentry.utils.query import bulk_delete_objects
+from sentry.utils import metrics
+from sentry.utils.query import bulk_delete_objects, bulk_delete_objects_by_id
 
 _leaf_re = re.compile(r"^(UserReport|Event|Group)(.+)")
 
 
+# Labels of models whose ``post_delete`` receivers are either the no-op hooks
+# every ``BaseManager`` registers, or only clear caches which
+# ``FastModelDeletionTask.get_cache_cleanup`` takes care of. Skipping them with
+# raw SQL is safe.
+FAST_DELETE_MODELS = frozenset(["sentry.GroupMeta", "sentry.GroupResolution"])
+
+
+def can_fast_delete(model):
+    """
+    Returns whether rows of ``model`` can be deleted with raw SQL, i.e. there
+    are no Django level cascades and nothing listens for their deletion.
+
+    Every model using a ``BaseManager`` has ``post_delete`` listeners, so
+    those are only ignored for models listed in ``FAST_DELETE_MODELS``.
+    """
+    opts = model._meta
+    if opts.concrete_model._meta.parents:
+        return False
+
+    if signals.pre_delete.has_listeners(model) or signals.m2m_changed.has_listeners(model):
+        return False
+
+    if signals.post_delete.has_listeners(model) and opts.label not in FAST_DELETE_MODELS:
+        return False
+
+    return all(
+        related.field.remote_field.on_delete is DO_NOTHING
+        for related in get_candidate_relations_to_delete(opts)
+    )
+
+
 class BaseRelation(object):
     def __init__(self, params, task):
         self.task = task
@@ -281,3 +317,118 @@ class BulkModelDeletionTask(ModelDeletionTask):
                         **self.query
                     ),
                 )
+
+
+class FastModelDeletionTask(ModelDeletionTask):
+    """
+    Deletes leaf rows by primary key with raw ``DELETE ... WHERE id = ANY(...)``
+    statements, walking the matching rows in primary key order instead of
+    re-running the filter for every chunk.
+
+    This is only used if the model has no Django level cascades, no delete
+    signal receivers (see ``can_fast_delete``), and the task has no child
+    relations. Otherwise it falls back to the regular (per instance)
+    ``ModelDeletionTask`` behavior and chunk size.
+    """
+
+    # Only used for the raw SQL path, the per instance fallback keeps the
+    # ``ModelDeletionTask`` defaults.
+    FAST_CHUNK_SIZE = 10000
+    FAST_QUERY_LIMIT = 1000
+
+    def __init__(self, manager, model, query, query_limit=None, chunk_size=None, **kwargs):
+        super(FastModelDeletionTask, self).__init__(
+            manager, model, query, query_limit=query_limit, chunk_size=chunk_size, **kwargs
+        )
+        self.fast_chunk_size = chunk_size or self.FAST_CHUNK_SIZE
+        self.fast_query_limit = query_limit or self.FAST_QUERY_LIMIT
+        self.last_id = None
+        self._can_fast_delete = None
+
+    def can_fast_delete(self):
+        from sentry.deletions import default_manager
+
+        if self._can_fast_delete is None:
+            self._can_fast_delete = (
+                self.order_by is None
+                and type(self).get_child_relations is BaseDeletionTask.get_child_relations
+                and type(self).get_child_relations_bulk
+                is BaseDeletionTask.get_child_relations_bulk
+                and not default_manager.dependencies.get(self.model)
+                and not default_manager.bulk_dependencies.get(self.model)
+                and can_fast_delete(self.model)
+            )
+        return self._can_fast_delete
+
+    def get_cache_cleanup(self, ids):
+        """
+        Returns a callable clearing the caches the skipped ``post_delete``
+        receivers would have cleared for the rows in ``ids``, if any. It is
+        built before the rows are deleted and called afterwards.
+        """
+        from sentry.models import GroupResolution
+
+        if self.model is GroupResolution:
+            group_ids = list(
+                GroupResolution.objects.filter(id__in=ids).values_list("group_id", flat=True)
+            )
+            return lambda: GroupResolution.clear_cache(group_ids)
+
+        return None
+
+    def chunk(self, num_shards=None, shard_id=None):
+        if num_shards or not self.can_fast_delete():
+            return super(FastModelDeletionTask, self).chunk(
+                num_shards=num_shards, shard_id=shard_id
+            )
+
+        model_name = self.model.__name__
+        remaining = self.fast_chunk_size
+        deleted = 0
+        started = time.time()
+        has_more = True
+        try:
+            while remaining > 0:
+                queryset = getattr(self.model, self.manager_name).filter(**self.query)
+                if self.last_id is not None:
+                    queryset = queryset.filter(id__gt=self.last_id)
+                ids = list(
+                    queryset.order_by("id").values_list("id", flat=True)[
+                        : min(self.fast_query_limit, remaining)
+                    ]
+                )
+                if not ids:
+                    has_more = False
+                    break
+
+                cleanup = self.get_cache_cleanup(ids)
+                deleted += bulk_delete_objects_by_id(self.model, ids)
+                if cleanup is not None:
+                    cleanup()
+                self.last_id = ids[-1]
+                remaining -= len(ids)
+        finally:
+            duration = time.time() - started
+            metrics.incr("deletions.fast_delete.rows", amount=deleted, tags={"model": model_name})
+            if deleted and duration > 0:
+                metrics.timing(
+                    "deletions.fast_delete.rows_per_second",
+                    deleted / duration,
+                    tags={"model": model_name},
+                )
+
+            # Don't log Group and Event child object deletions.
+            if deleted and not _leaf_re.search(model_name):
+                self.logger.info(
+                    "object.delete.bulk_executed",
+                    extra=dict(
+                        {
+                            "transaction_id": self.transaction_id,
+                            "app_label": self.model._meta.app_label,
+                            "model": model_name,
+                            "count": deleted,
+                        },
+                        **self.query
+                    ),
+                )
+        return has_more
@@ -1,6 +1,6 @@
 from __future__ import absolute_import, print_function
 
-from ..base import BulkModelDeletionTask, ModelDeletionTask, ModelRelation
+from ..base import BulkModelDeletionTask, FastModelDeletionTask, ModelDeletionTask, ModelRelation
 
 
 class ProjectDeletionTask(ModelDeletionTask):
@@ -54,7 +54,7 @@ class ProjectDeletionTask(ModelDeletionTask):
         model_list = (models.GroupMeta, models.GroupResolution, models.GroupSnooze)
         relations.extend(
             [
-                ModelRelation(m, {"group__project": instance.id}, ModelDeletionTask)
+                ModelRelation(m, {"group__project": instance.id}, FastModelDeletionTask)
                 for m in model_list
             ]
         )
@@ -55,7 +55,16 @@ class Backend(Service):
     be transitioned to "waiting" instead.)
     """
 
-    __all__ = ("add", "delete", "digest", "enabled", "maintenance", "schedule", "validate")
+    __all__ = (
+        "add",
+        "delete",
+        "digest",
+        "digest_many",
+        "enabled",
+        "maintenance",
+        "schedule",
+        "validate",
+    )
 
     def __init__(self, **options):
         # The ``minimum_delay`` option defines the default minimum amount of
@@ -158,6 +167,26 @@ class Backend(Service):
         """
         raise NotImplementedError
 
+    def digest_many(self, keys, minimum_delay=None):
+        """
+        Extract records from several timelines for processing at once.
+
+        This method acts as a context manager, like ``digest``. The target of
+        the ``as`` clause is a mapping of timeline key to the records of its
+        digest. Timelines that are not in the "ready" state (or are locked by
+        another digest operation) are omitted from the mapping.
+
+        When the context manager successfully exits, every timeline that is
+        still present in the mapping is closed as with ``digest``. Timelines
+        that are removed from the mapping by the caller (for example, because
+        processing them failed) are left untouched, as are all of them if an
+        exception is raised.
+
+        The ``minimum_delay`` may either be a single value or a mapping of
+        timeline key to minimum delay.
+        """
+        raise NotImplementedError
+
     def schedule(self, deadline):
         """
         Identify timelines that are ready for processing.
@@ -4,11 +4,14 @@ import logging
 import six
 import time
 
+from collections import defaultdict
 from contextlib import contextmanager
 from redis.client import ResponseError
 
 from sentry.digests import Record, ScheduleEntry
 from sentry.digests.backends.base import Backend, InvalidState
+from sentry.utils import metrics
+from sentry.utils.locking import UnableToAcquireLock
 from sentry.utils.locking.backends.redis import RedisLockBackend
 from sentry.utils.locking.manager import LockManager
 from sentry.utils.redis import check_cluster_versions, get_cluster_from_options, load_script
@@ -131,21 +134,37 @@ class RedisBackend(Backend):
             )
         )
 
-    def __schedule_partition(self, host, deadline, timestamp):
-        return script(
-            self.cluster.get_local_client(host),
-            ["-"],
-            ["SCHEDULE", self.namespace, self.ttl, timestamp, deadline],
-        )
+    def __schedule_partition(self, host, deadline, timestamp, limit=None):
+        arguments = ["SCHEDULE", self.namespace, self.ttl, timestamp, deadline]
+        if limit is not None:
+            arguments.append(limit)
+        return script(self.cluster.get_local_client(host), ["-"], arguments)
 
-    def schedule(self, deadline, timestamp=None):
+    def schedule(self, deadline, timestamp=None, batch_size=1000):
+        """
+        Identify timelines that are ready for processing.
+
+        Each partition is drained in batches of at most ``batch_size``
+        timelines per script call, so that a single partition with a large
+        backlog does not block the server for an extended period of time.
+        """
         if timestamp is None:
             timestamp = time.time()
 
+        scheduled = 0
+        lag = 0.0
         for host in self.cluster.hosts:
             try:
-                for key, timestamp in self.__schedule_partition(host, deadline, timestamp):
-                    yield ScheduleEntry(key, float(timestamp))
+                while True:
+                    response = self.__schedule_partition(host, deadline, timestamp, batch_size)
+                    for key, score in response:
+                        score = float(score)
+                        lag = max(lag, timestamp - score)
+                        scheduled += 1
+                        yield ScheduleEntry(key, score)
+
+                    if batch_size is None or len(response) < batch_size:
+                        break
             except Exception as error:
                 logger.error(
                     "Failed to perform scheduling for partition %r due to error: %r",
@@ -154,6 +173,9 @@ class RedisBackend(Backend):
                     exc_info=True,
                 )
 
+        metrics.incr("digests.schedule.scheduled", amount=scheduled)
+        metrics.timing("digests.schedule.lag", lag)
+
     def __maintenance_partition(self, host, deadline, timestamp):
         return script(
             self.cluster.get_local_client(host),
@@ -188,16 +210,7 @@ class RedisBackend(Backend):
         with self._get_timeline_lock(key, duration=30).acquire():
             try:
                 response = script(
-                    connection,
-                    [key],
-                    [
-                        "DIGEST_OPEN",
-                        self.namespace,
-                        self.ttl,
-                        timestamp,
-                        key,
-                        self.capacity if self.capacity else -1,
-                    ],
+                    connection, [key], self.__get_digest_open_arguments(key, timestamp)
                 )
             except ResponseError as e:
                 if "err(invalid_state):" in six.text_type(e):
@@ -205,16 +218,7 @@ class RedisBackend(Backend):
                 else:
                     raise
 
-            records = map(
-                lambda key__value__timestamp: Record(
-                    key__value__timestamp[0],
-                    self.codec.decode(key__value__timestamp[1])
-                    if key__value__timestamp[1] is not None
-                    else None,
-                    float(key__value__timestamp[2]),
-                ),
-                response,
-            )
+            records = self.__decode_records(response)
 
             # If the record value is `None`, this means the record data was
             # missing (it was presumably evicted by Redis) so we don't need to
@@ -224,10 +228,104 @@ class RedisBackend(Backend):
             script(
                 connection,
                 [key],
-                ["DIGEST_CLOSE", self.namespace, self.ttl, timestamp, key, minimum_delay]
-                + [record.key for record in records],
+                self.__get_digest_close_arguments(key, timestamp, minimum_delay, records),
             )
 
+    @contextmanager
+    def digest_many(self, keys, minimum_delay=None, timestamp=None):
+        if not isinstance(minimum_delay, dict):
+            minimum_delay = dict.fromkeys(keys, minimum_delay)
+
+        if timestamp is None:
+            timestamp = time.time()
+
+        locks = []
+        try:
+            # Timelines that are locked by another digest operation are
+            # skipped, rather than failing the entire batch.
+            hosts = defaultdict(list)
+            for key in keys:
+                lock = self._get_timeline_lock(key, duration=30)
+                try:
+                    lock.acquire()
+                except UnableToAcquireLock as error:
+                    logger.info("Skipped digest for %r: %s", key, error)
+                    continue
+                locks.append(lock)
+                hosts[self.__get_host_for_key(key)].append(key)
+
+            records = {}
+            for host, host_keys in six.iteritems(hosts):
+                with self.cluster.get_local_client(host).pipeline(transaction=False) as pipeline:
+                    for key in host_keys:
+                        script(pipeline, [key], self.__get_digest_open_arguments(key, timestamp))
+                    responses = pipeline.execute(raise_on_error=False)
+
+                for key, response in zip(host_keys, responses):
+                    if isinstance(response, ResponseError):
+                        if "err(invalid_state):" in six.text_type(response):
+                            logger.info("Skipped digest for %r: timeline is not ready", key)
+                            continue
+                        raise response
+                    records[key] = self.__decode_records(response)
+
+            digests = {
+                key: [record for record in key_records if record.value is not None]
+                for key, key_records in six.iteritems(records)
+            }
+
+            yield digests
+
+            hosts = defaultdict(list)
+            for key in digests:
+                hosts[self.__get_host_for_key(key)].append(key)
+
+            for host, host_keys in six.iteritems(hosts):
+                with self.cluster.get_local_client(host).pipeline(transaction=False) as pipeline:
+                    for key in host_keys:
+                        delay = minimum_delay.get(key)
+                        if delay is None:
+                            delay = self.minimum_delay
+                        script(
+                            pipeline,
+                            [key],
+                            self.__get_digest_close_arguments(key, timestamp, delay, records[key]),
+                        )
+                    pipeline.execute()
+        finally:
+            for lock in locks:
+                lock.release()
+
+    def __get_host_for_key(self, key):
+        return self.cluster.get_router().get_host_for_key(u"{}:t:{}".format(self.namespace, key))
+
+    def __get_digest_open_arguments(self, key, timestamp):
+        return [
+            "DIGEST_OPEN",
+            self.namespace,
+            self.ttl,
+            timestamp,
+            key,
+            self.capacity if self.capacity else -1,
+        ]
+
+    def __get_digest_close_arguments(self, key, timestamp, minimum_delay, records):
+        return ["DIGEST_CLOSE", self.namespace, self.ttl, timestamp, key, minimum_delay] + [
+            record.key for record in records
+        ]
+
+    def __decode_records(self, response):
+        return map(
+            lambda key__value__timestamp: Record(
+                key__value__timestamp[0],
+                self.codec.decode(key__value__timestamp[1])
+                if key__value__timestamp[1] is not None
+                else None,
+                float(key__value__timestamp[2]),
+            ),
+            response,
+        )
+
     def delete(self, key, timestamp=None):
         if timestamp is None:
             timestamp = time.time()
@@ -1184,6 +1184,7 @@ def _handle_regression(group, event, release):
             # delete() API does not return affected rows
             cursor.execute("DELETE FROM sentry_groupresolution WHERE id = %s", [resolution.id])
             affected = cursor.rowcount > 0
+            GroupResolution.clear_cache([group.id])
 
         if affected:
             # if we had to remove the GroupResolution (i.e. we beat the
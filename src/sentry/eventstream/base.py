@@ -1,13 +1,19 @@
 from __future__ import absolute_import
 
 import logging
+import six
+
+from collections import OrderedDict
 
 from sentry.utils.services import Service
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 
 
 logger = logging.getLogger(__name__)
 
+# The maximum number of events passed to a single post_process_group_batch task.
+POST_PROCESS_BATCH_SIZE = 100
+
 
 class ForwarderNotRequired(NotImplementedError):
     """
@@ -39,18 +45,73 @@ class EventStream(Service):
         is_new_group_environment,
         primary_hash,
         skip_consume=False,
+        producer=None,
     ):
         if skip_consume:
             logger.info("post_process.skip.raw_event", extra={"event_id": event.event_id})
         else:
-            post_process_group.delay(
-                event=event,
-                is_new=is_new,
-                is_regression=is_regression,
-                is_new_group_environment=is_new_group_environment,
-                primary_hash=primary_hash,
+            post_process_group.apply_async(
+                kwargs={
+                    "event": event,
+                    "is_new": is_new,
+                    "is_regression": is_regression,
+                    "is_new_group_environment": is_new_group_environment,
+                    "primary_hash": primary_hash,
+                },
+                producer=producer,
             )
 
+    def _dispatch_post_process_group_tasks(self, tasks):
+        """
+        Dispatches a ``post_process_group`` task for each of the provided
+        keyword argument mappings, publishing all of them through the same
+        broker connection.
+
+        With the ``post-process.batch-tasks`` option enabled, the events are
+        instead dispatched in ``post_process_group_batch`` tasks of up to
+        ``POST_PROCESS_BATCH_SIZE`` events of the same project.
+        """
+        from sentry import options
+        from sentry.celery import app
+
+        with app.producer_or_acquire() as producer:
+            if options.get("post-process.batch-tasks"):
+                self._dispatch_post_process_group_batch_tasks(tasks, producer=producer)
+                return
+
+            for task_kwargs in tasks:
+                self._dispatch_post_process_group_task(producer=producer, **task_kwargs)
+
+    def _dispatch_post_process_group_batch_tasks(self, tasks, producer=None):
+        # Events are passed by id, the task loads their data from nodestore.
+        batches = OrderedDict()
+        for task_kwargs in tasks:
+            event = task_kwargs["event"]
+            if task_kwargs.get("skip_consume", False):
+                logger.info("post_process.skip.raw_event", extra={"event_id": event.event_id})
+                continue
+
+            batches.setdefault(event.project_id, []).append(
+                {
+                    "event_id": event.event_id,
+                    "group_id": event.group_id,
+                    "is_new": task_kwargs["is_new"],
+                    "is_regression": task_kwargs["is_regression"],
+                    "is_new_group_environment": task_kwargs["is_new_group_environment"],
+                    "primary_hash": task_kwargs["primary_hash"],
+                }
+            )
+
+        for project_id, events in six.iteritems(batches):
+            for i in range(0, len(events), POST_PROCESS_BATCH_SIZE):
+                post_process_group_batch.apply_async(
+                    kwargs={
+                        "project_id": project_id,
+                        "events": events[i : i + POST_PROCESS_BATCH_SIZE],
+                    },
+                    producer=producer,
+                )
+
     def insert(
         self,
         group,
@@ -100,6 +161,7 @@ class EventStream(Service):
         synchronize_commit_group,
         commit_batch_size=100,
         initial_offset_reset="latest",
+        dispatch_batch_size=1,
     ):
         assert not self.requires_post_process_forwarder()
         raise ForwarderNotRequired
@@ -80,6 +80,7 @@ class KafkaEventStream(SnubaProtocolEventStream):
         synchronize_commit_group,
         commit_batch_size=100,
         initial_offset_reset="latest",
+        dispatch_batch_size=1,
     ):
         logger.debug("Starting post-process forwarder...")
 
@@ -185,34 +186,51 @@ class KafkaEventStream(SnubaProtocolEventStream):
 
         try:
             i = 0
+            last_commit = 0
             while True:
-                message = consumer.poll(0.1)
-                if message is None:
+                messages = consumer.consume(dispatch_batch_size, 0.1)
+                if not messages:
                     continue
 
-                error = message.error()
-                if error is not None:
-                    raise Exception(error)
+                # Offsets are only advanced once all of the tasks in the batch
+                # have been published, so that a revocation (which can only
+                # happen during the next call to ``consume``) never commits
+                # past messages that have not been dispatched yet.
+                tasks = []
+                offsets = {}
+                for message in messages:
+                    error = message.error()
+                    if error is not None:
+                        raise Exception(error)
+
+                    key = (message.topic(), message.partition())
+                    if key not in owned_partition_offsets:
+                        logger.warning("Skipping message for unowned partition: %r", key)
+                        continue
+
+                    i = i + 1
+                    offsets[key] = message.offset() + 1
 
-                key = (message.topic(), message.partition())
-                if key not in owned_partition_offsets:
-                    logger.warning("Skipping message for unowned partition: %r", key)
-                    continue
-
-                i = i + 1
-                owned_partition_offsets[key] = message.offset() + 1
+                    with metrics.timer(
+                        "eventstream.duration", instance="get_task_kwargs_for_message"
+                    ):
+                        task_kwargs = get_task_kwargs_for_message(message.value())
 
-                with metrics.timer("eventstream.duration", instance="get_task_kwargs_for_message"):
-                    task_kwargs = get_task_kwargs_for_message(message.value())
+                    if task_kwargs is not None:
+                        tasks.append(task_kwargs)
 
-                if task_kwargs is not None:
+                if tasks:
                     with metrics.timer(
                         "eventstream.duration", instance="dispatch_post_process_group_task"
                     ):
-                        self._dispatch_post_process_group_task(**task_kwargs)
+                        self._dispatch_post_process_group_tasks(tasks)
+                    metrics.timing("eventstream.dispatch-batch-size", len(tasks))
+
+                owned_partition_offsets.update(offsets)
 
-                if i % commit_batch_size == 0:
+                if i - last_commit >= commit_batch_size:
                     commit_offsets()
+                    last_commit = i
         except KeyboardInterrupt:
             pass
 
@@ -16,6 +16,8 @@ from confluent_kafka import (
 )
 
 from sentry.eventstream.kafka.state import (
+    InvalidState,
+    MessageNotReady,
     SynchronizedPartitionState,
     SynchronizedPartitionStateManager,
 )
@@ -342,6 +344,53 @@ class SynchronizedConsumer(object):
 
         return message
 
+    def consume(self, num_messages, timeout):
+        """
+        Consume up to ``num_messages`` messages, waiting at most ``timeout``
+        seconds. Error messages are returned in the result list and must be
+        checked by the caller, as they are with ``poll``.
+
+        The fetched batch can contain messages that have not been committed
+        by the remote consumer yet. Those (and all later messages of the same
+        partition) are not returned, and the partition is rewound to the
+        first of them so they are fetched again once they are ready.
+        """
+        self.__check_commit_log_consumer_running()
+
+        messages = self.__consumer.consume(num_messages=num_messages, timeout=timeout)
+
+        result = []
+        rewound = {}
+        for message in messages:
+            if message.error() is not None:
+                result.append(message)
+                continue
+
+            key = (message.topic(), message.partition())
+            if key in rewound:
+                continue
+
+            try:
+                self.__partition_state_manager.validate_local_message(
+                    message.topic(), message.partition(), message.offset()
+                )
+            except (InvalidState, MessageNotReady):
+                # The partition caught up with the remote consumer (and was
+                # paused) within this batch.
+                rewound[key] = message.offset()
+                continue
+
+            self.__partition_state_manager.set_local_offset(
+                message.topic(), message.partition(), message.offset() + 1
+            )
+            self.__positions[key] = message.offset() + 1
+            result.append(message)
+
+        for (topic, partition), offset in rewound.items():
+            self.__consumer.seek(TopicPartition(topic, partition, offset))
+
+        return result
+
     def commit(self, *args, **kwargs):
         self.__check_commit_log_consumer_running()
 
@@ -125,4 +125,6 @@ requires_snuba = (
 add = default_manager.add
 get = default_manager.get
 has = default_manager.has
+batch_has = default_manager.batch_has
+cache_scope = default_manager.cache_scope
 all = default_manager.all
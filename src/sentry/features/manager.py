@@ -2,7 +2,12 @@ from __future__ import absolute_import
 
 __all__ = ["FeatureManager"]
 
+import six
+import threading
+
+from contextlib import contextmanager
 from django.conf import settings
+from django.db.models import Model
 
 from sentry.utils.safe import safe_execute
 
@@ -10,9 +15,36 @@ from .base import Feature
 from .exceptions import FeatureNotRegistered
 
 
+def _get_cache_key_value(value):
+    if isinstance(value, Model):
+        if value.pk is None:
+            raise TypeError("unsaved model instance")
+        return (value._meta.label, value.pk)
+    return value
+
+
+def _get_cache_key(name, args, kwargs, actor):
+    """
+    Returns the key of a feature check in the scoped cache, or ``None`` if the
+    arguments can't be used as a key.
+    """
+    try:
+        key = (
+            name,
+            tuple(_get_cache_key_value(arg) for arg in args),
+            tuple((k, _get_cache_key_value(v)) for k, v in sorted(six.iteritems(kwargs))),
+            _get_cache_key_value(actor),
+        )
+        hash(key)
+    except TypeError:
+        return None
+    return key
+
+
 class FeatureManager(object):
     def __init__(self):
         self._registry = {}
+        self._local = threading.local()
 
     def all(self, feature_type=Feature):
         """
@@ -67,10 +99,60 @@ class FeatureManager(object):
         >>> FeatureManager.has('organizations:feature', organization, actor=request.user)
         """
         actor = kwargs.pop("actor", None)
-        feature = self.get(name, *args, **kwargs)
+        return self._has(name, args, kwargs, actor)
+
+    def batch_has(self, feature_names, *args, **kwargs):
+        """
+        Determine which of the given features are enabled for the same
+        context, returning a mapping of feature name -> enabled.
+
+        The plugin feature handlers are only looked up once for all features.
+
+        >>> FeatureManager.batch_has(['organizations:a', 'organizations:b'], organization)
+        """
+        actor = kwargs.pop("actor", None)
+        handlers = self._get_feature_handlers()
+        return {
+            name: self._has(name, args, kwargs, actor, handlers=handlers) for name in feature_names
+        }
+
+    @contextmanager
+    def cache_scope(self):
+        """
+        Remember the results of feature checks until the end of the block,
+        e.g. while processing an event or running a task. Nested scopes share
+        the results of the outermost scope.
+
+        >>> with features.cache_scope():
+        >>>     features.has('organizations:feature', organization)
+        """
+        if getattr(self._local, "cache", None) is not None:
+            yield
+            return
+
+        self._local.cache = {}
+        self._local.handlers = None
+        try:
+            yield
+        finally:
+            self._local.cache = None
+            self._local.handlers = None
+
+    def _has(self, name, args, kwargs, actor, handlers=None):
+        cache = getattr(self._local, "cache", None)
+        key = _get_cache_key(name, args, kwargs, actor) if cache is not None else None
+        if key is None:
+            return self._get_value(self.get(name, *args, **kwargs), actor, handlers)
+
+        try:
+            return cache[key]
+        except KeyError:
+            rv = cache[key] = self._get_value(self.get(name, *args, **kwargs), actor, handlers)
+            return rv
 
+    def _get_value(self, feature, actor, handlers=None):
         # Check plugin feature handlers
-        rv = self._get_plugin_value(feature, actor)
+        rv = self._get_plugin_value(feature, actor, handlers)
         if rv is not None:
             return rv
 
@@ -81,13 +163,27 @@ class FeatureManager(object):
         # Features are by default disabled if no plugin or default enables them
         return False
 
-    def _get_plugin_value(self, feature, actor):
+    def _get_feature_handlers(self):
         from sentry.plugins.base import plugins
 
-        for plugin in plugins.all(version=2):
-            handlers = safe_execute(plugin.get_feature_hooks, _with_transaction=False)
-            for handler in handlers or ():
-                rv = handler(feature, actor)
-                if rv is not None:
-                    return rv
+        handlers = getattr(self._local, "handlers", None)
+        if handlers is None:
+            handlers = []
+            for plugin in plugins.all(version=2):
+                handlers.extend(
+                    safe_execute(plugin.get_feature_hooks, _with_transaction=False) or ()
+                )
+
+            if getattr(self._local, "cache", None) is not None:
+                self._local.handlers = handlers
+        return handlers
+
+    def _get_plugin_value(self, feature, actor, handlers=None):
+        if handlers is None:
+            handlers = self._get_feature_handlers()
+
+        for handler in handlers:
+            rv = handler(feature, actor)
+            if rv is not None:
+                return rv
         return None
@@ -17,7 +17,7 @@ from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.component import GroupingComponent
 from sentry.grouping.utils import get_rule_bool
 from sentry.utils.compat import implements_to_string
-from sentry.utils.glob import glob_match
+from sentry.utils.glob import compile_glob
 from sentry.utils.safe import get_path
 from sentry.utils.compat import zip
 
@@ -97,6 +97,12 @@ class Match(object):
     def __init__(self, key, pattern):
         self.key = key
         self.pattern = pattern
+        if key in ("path", "package"):
+            self._glob = compile_glob(
+                pattern, ignorecase=True, doublestar=True, path_normalize=True
+            )
+        else:
+            self._glob = compile_glob(pattern)
 
     @property
     def description(self):
@@ -112,13 +118,9 @@ class Match(object):
                 value = frame_data.get("package") or ""
             else:
                 value = frame_data.get("abs_path") or frame_data.get("filename") or ""
-            if glob_match(
-                value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
-            ):
+            if self._glob.match(value):
                 return True
-            if not value.startswith("/") and glob_match(
-                "/" + value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
-            ):
+            if not value.startswith("/") and self._glob.match("/" + value):
                 return True
             return False
 
@@ -145,7 +147,7 @@ class Match(object):
         else:
             # should not happen :)
             value = "<unknown>"
-        return glob_match(value, self.pattern)
+        return self._glob.match(value)
 
     def _to_config_structure(self):
         if self.key == "family":
@@ -9,7 +9,7 @@ from parsimonious.exceptions import ParseError
 from sentry.stacktraces.platform import get_behavior_family_for_platform
 from sentry.grouping.utils import get_rule_bool
 from sentry.utils.safe import get_path
-from sentry.utils.glob import glob_match
+from sentry.utils.glob import compile_glob
 
 
 VERSION = 1
@@ -193,6 +193,12 @@ class Match(object):
     def __init__(self, key, pattern):
         self.key = key
         self.pattern = pattern
+        if key in ("path", "package"):
+            self._glob = compile_glob(
+                pattern, ignorecase=True, doublestar=True, path_normalize=True
+            )
+        else:
+            self._glob = compile_glob(pattern, ignorecase=key in ("message", "value"))
 
     @property
     def interface(self):
@@ -206,13 +212,9 @@ class Match(object):
         if value is None:
             return False
         if self.key in ("path", "package"):
-            if glob_match(
-                value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
-            ):
+            if self._glob.match(value):
                 return True
-            if not value.startswith("/") and glob_match(
-                "/" + value, self.pattern, ignorecase=True, doublestar=True, path_normalize=True
-            ):
+            if not value.startswith("/") and self._glob.match("/" + value):
                 return True
         elif self.key == "family":
             flags = self.pattern.split(",")
@@ -222,7 +224,7 @@ class Match(object):
             ref_val = get_rule_bool(self.pattern)
             if ref_val is not None and ref_val == value:
                 return True
-        elif glob_match(value, self.pattern, ignorecase=self.key in ("message", "value")):
+        elif self._glob.match(value):
             return True
         return False
 
@@ -2,6 +2,8 @@ from __future__ import absolute_import
 
 import logging
 import operator
+import six
+import sys
 from copy import deepcopy
 from datetime import timedelta
 
@@ -51,7 +53,7 @@ class SubscriptionProcessor(object):
         AlertRuleThresholdType.BELOW: (operator.lt, operator.gt),
     }
 
-    def __init__(self, subscription):
+    def __init__(self, subscription, fetch_stats=True):
         self.subscription = subscription
         try:
             self.alert_rule = AlertRule.objects.get_for_subscription(subscription)
@@ -61,9 +63,20 @@ class SubscriptionProcessor(object):
         self.triggers = AlertRuleTrigger.objects.get_for_alert_rule(self.alert_rule)
         self.triggers.sort(key=lambda trigger: trigger.alert_threshold)
 
-        self.last_update, self.trigger_alert_counts, self.trigger_resolve_counts = get_alert_rule_stats(
-            self.alert_rule, self.subscription, self.triggers
-        )
+        if fetch_stats:
+            self.set_alert_rule_stats(
+                *get_alert_rule_stats(self.alert_rule, self.subscription, self.triggers)
+            )
+
+    def set_alert_rule_stats(self, last_update, trigger_alert_counts, trigger_resolve_counts):
+        """
+        Sets the stats for this alert rule and subscription. Used directly when
+        stats are fetched for many processors at once via
+        `get_alert_rule_stats_many`.
+        """
+        self.last_update = last_update
+        self.trigger_alert_counts = trigger_alert_counts
+        self.trigger_resolve_counts = trigger_resolve_counts
         self.orig_trigger_alert_counts = deepcopy(self.trigger_alert_counts)
         self.orig_trigger_resolve_counts = deepcopy(self.trigger_resolve_counts)
 
@@ -103,7 +116,7 @@ class SubscriptionProcessor(object):
         incident_trigger = self.incident_triggers.get(trigger.id)
         return incident_trigger is not None and incident_trigger.status == status.value
 
-    def process_update(self, subscription_update):
+    def process_update(self, subscription_update, write_stats=True):
         if not hasattr(self, "alert_rule"):
             # If the alert rule has been removed then just skip
             metrics.incr("incidents.alert_rules.no_alert_rule_for_subscription")
@@ -161,7 +174,8 @@ class SubscriptionProcessor(object):
         # is killed here. The trade-off is that we might process an update twice. Mostly
         # this will have no effect, but if someone manages to close a triggered incident
         # before the next one then we might alert twice.
-        self.update_alert_rule_stats()
+        if write_stats:
+            self.update_alert_rule_stats()
 
     def trigger_alert_threshold(self, trigger):
         """
@@ -286,6 +300,13 @@ class SubscriptionProcessor(object):
         Updates stats about the alert rule, if they're changed.
         :return:
         """
+        update_alert_rule_stats(*self.get_alert_rule_stats_update())
+
+    def get_alert_rule_stats_update(self):
+        """
+        Returns the arguments to pass to `update_alert_rule_stats` to persist
+        any changed stats for this processor.
+        """
         updated_trigger_alert_counts = {
             trigger_id: alert_count
             for trigger_id, alert_count in self.trigger_alert_counts.items()
@@ -297,7 +318,7 @@ class SubscriptionProcessor(object):
             if resolve_count != self.orig_trigger_resolve_counts[trigger_id]
         }
 
-        update_alert_rule_stats(
+        return (
             self.alert_rule,
             self.subscription,
             self.last_update,
@@ -306,6 +327,74 @@ class SubscriptionProcessor(object):
         )
 
 
+def process_subscription_updates(updates, executor=None):
+    """
+    Processes updates for many subscriptions at once. Stats for every alert
+    rule are fetched in a single Redis pipeline before processing, and the
+    changed stats are written back in a single pipeline afterwards, rather
+    than doing a round-trip for each update. If processing a subscription
+    fails, the remaining subscriptions are still processed, but only the
+    stats of the successful ones are written before the first error is
+    raised. The batch is then processed again, with the same trade-offs as
+    described in `SubscriptionProcessor.process_update`.
+    :param updates: A list of `(subscription, subscription_updates)` tuples,
+    where the updates for each subscription are in the order to process them.
+    :param executor: An optional executor used to process different
+    subscriptions concurrently.
+    """
+    processors = []
+    for subscription, subscription_updates in updates:
+        processor = SubscriptionProcessor(subscription, fetch_stats=False)
+        if hasattr(processor, "alert_rule"):
+            processors.append((processor, subscription_updates))
+        else:
+            for subscription_update in subscription_updates:
+                processor.process_update(subscription_update)
+
+    if not processors:
+        return
+
+    stats = get_alert_rule_stats_many(
+        [(p.alert_rule, p.subscription, p.triggers) for p, _ in processors]
+    )
+    for (processor, _), processor_stats in zip(processors, stats):
+        processor.set_alert_rule_stats(*processor_stats)
+
+    def process(processor, subscription_updates):
+        for subscription_update in subscription_updates:
+            processor.process_update(subscription_update, write_stats=False)
+
+    if executor is not None:
+        futures = [
+            executor.submit(process, processor, subscription_updates)
+            for processor, subscription_updates in processors
+        ]
+
+    completed = []
+    exc_info = None
+    for i, (processor, subscription_updates) in enumerate(processors):
+        try:
+            if executor is None:
+                process(processor, subscription_updates)
+            else:
+                futures[i].result()
+        except Exception:
+            if exc_info is None:
+                exc_info = sys.exc_info()
+        else:
+            completed.append(processor)
+
+    # Only persist stats of processors that handled all of their updates. A
+    # failed processor has already advanced `last_update` past the update it
+    # failed on, which would then be skipped when the batch is redelivered.
+    update_alert_rule_stats_many(
+        [processor.get_alert_rule_stats_update() for processor in completed]
+    )
+
+    if exc_info is not None:
+        six.reraise(*exc_info)
+
+
 def build_alert_rule_stat_keys(alert_rule, subscription):
     """
     Builds keys for fetching stats about alert rules
@@ -361,6 +450,36 @@ def get_alert_rule_stats(alert_rule, subscription, triggers):
     alert_rule_keys = build_alert_rule_stat_keys(alert_rule, subscription)
     trigger_keys = build_trigger_stat_keys(alert_rule, subscription, triggers)
     results = get_redis_client().mget(alert_rule_keys + trigger_keys)
+    return parse_alert_rule_stats(triggers, results)
+
+
+def get_alert_rule_stats_many(items):
+    """
+    Fetches stats for many alert rules at once, using a single pipeline.
+    :param items: A list of `(alert_rule, subscription, triggers)` tuples
+    :return: A list of stats tuples, in the same format as returned by
+    `get_alert_rule_stats`, in the same order as `items`.
+    """
+    pipeline = get_redis_client().pipeline()
+    key_counts = []
+    for alert_rule, subscription, triggers in items:
+        # `mget` isn't supported by cluster pipelines, so fetch each key
+        # individually. They're still sent in a single round-trip per node.
+        keys = build_alert_rule_stat_keys(alert_rule, subscription) + build_trigger_stat_keys(
+            alert_rule, subscription, triggers
+        )
+        for key in keys:
+            pipeline.get(key)
+        key_counts.append(len(keys))
+
+    results = iter(pipeline.execute())
+    return [
+        parse_alert_rule_stats(triggers, [next(results) for _ in range(key_count)])
+        for (_, _, triggers), key_count in zip(items, key_counts)
+    ]
+
+
+def parse_alert_rule_stats(triggers, results):
     results = tuple(0 if result is None else int(result) for result in results)
     last_update = to_datetime(results[0])
     trigger_results = results[1:]
@@ -379,21 +498,37 @@ def update_alert_rule_stats(alert_rule, subscription, last_update, alert_counts,
     """
     Updates stats about the alert rule, subscription and triggers if they've changed.
     """
+    update_alert_rule_stats_many(
+        [(alert_rule, subscription, last_update, alert_counts, resolve_counts)]
+    )
+
+
+def update_alert_rule_stats_many(updates):
+    """
+    Updates stats for many alert rules at once, using a single pipeline.
+    :param updates: A list of tuples containing the arguments to
+    `update_alert_rule_stats`
+    """
+    if not updates:
+        return
+
     pipeline = get_redis_client().pipeline()
 
-    counts_with_stat_keys = zip(ALERT_RULE_TRIGGER_STAT_KEYS, (alert_counts, resolve_counts))
-    for stat_key, trigger_counts in counts_with_stat_keys:
-        for trigger_id, alert_count in trigger_counts.items():
-            pipeline.set(
-                build_alert_rule_trigger_stat_key(
-                    alert_rule.id, subscription.project_id, trigger_id, stat_key
-                ),
-                alert_count,
-                ex=REDIS_TTL,
-            )
+    for alert_rule, subscription, last_update, alert_counts, resolve_counts in updates:
+        counts_with_stat_keys = zip(ALERT_RULE_TRIGGER_STAT_KEYS, (alert_counts, resolve_counts))
+        for stat_key, trigger_counts in counts_with_stat_keys:
+            for trigger_id, alert_count in trigger_counts.items():
+                pipeline.set(
+                    build_alert_rule_trigger_stat_key(
+                        alert_rule.id, subscription.project_id, trigger_id, stat_key
+                    ),
+                    alert_count,
+                    ex=REDIS_TTL,
+                )
+
+        last_update_key = build_alert_rule_stat_keys(alert_rule, subscription)[0]
+        pipeline.set(last_update_key, int(to_timestamp(last_update)), ex=REDIS_TTL)
 
-    last_update_key = build_alert_rule_stat_keys(alert_rule, subscription)[0]
-    pipeline.set(last_update_key, int(to_timestamp(last_update)), ex=REDIS_TTL)
     pipeline.execute()
 
 
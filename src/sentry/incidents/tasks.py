@@ -19,7 +19,10 @@ from sentry.incidents.models import (
     INCIDENT_STATUS,
 )
 from sentry.models import Project
-from sentry.snuba.query_subscription_consumer import register_subscriber
+from sentry.snuba.query_subscription_consumer import (
+    register_batch_subscriber,
+    register_subscriber,
+)
 from sentry.tasks.base import instrumented_task, retry
 from sentry.utils.email import MessageBuilder
 from sentry.utils.http import absolute_uri
@@ -152,6 +155,20 @@ def handle_snuba_query_update(subscription_update, subscription):
         SubscriptionProcessor(subscription).process_update(subscription_update)
 
 
+@register_batch_subscriber(INCIDENTS_SNUBA_SUBSCRIPTION_TYPE)
+def handle_snuba_query_updates(updates, executor=None):
+    """
+    Handles a batch of subscription updates for many `QuerySubscription`s,
+    reading and writing alert rule stats for the whole batch at once.
+    :param updates: A list of `(subscription, subscription_updates)` tuples
+    :param executor: Optional executor used to process subscriptions concurrently
+    """
+    from sentry.incidents.subscription_processor import process_subscription_updates
+
+    with metrics.timer("incidents.subscription_procesor.process_updates"):
+        process_subscription_updates(updates, executor=executor)
+
+
 @instrumented_task(
     name="sentry.incidents.tasks.handle_trigger_action",
     queue="incidents",
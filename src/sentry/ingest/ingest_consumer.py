@@ -14,7 +14,7 @@ from sentry import eventstore, features, options
 from sentry.cache import default_cache
 from sentry.models import Project, File, EventAttachment
 from sentry.signals import event_accepted
-from sentry.tasks.store import preprocess_event
+from sentry.tasks.store import preprocess_and_save_event, preprocess_event
 from sentry.utils import json, metrics
 from sentry.utils.dates import to_datetime
 from sentry.utils.cache import cache_key_for_event
@@ -71,12 +71,7 @@ class IngestConsumerWorker(AbstractBatchWorker):
         if attachment_chunks:
             # attachment_chunk messages need to be processed before attachment/event messages.
             with metrics.timer("ingest_consumer.process_attachment_chunk_batch"):
-                for _ in self.pool.imap_unordered(
-                    lambda msg: process_attachment_chunk(msg, projects=projects),
-                    attachment_chunks,
-                    chunksize=100,
-                ):
-                    pass
+                process_attachment_chunks_batch(attachment_chunks, projects, pool=self.pool)
 
         if other_messages:
             with metrics.timer("ingest_consumer.process_other_messages_batch"):
@@ -149,7 +144,12 @@ def process_event(message, projects):
     data = json.loads(payload)
 
     cache_key = cache_key_for_event(data)
-    default_cache.set(cache_key, data, CACHE_TIMEOUT)
+
+    # In fused mode the event is only written to the default cache if it needs
+    # to be processed by another worker.
+    fused = options.get("store.ingest-fused-save")
+    if not fused:
+        default_cache.set(cache_key, data, CACHE_TIMEOUT)
 
     if attachments:
         attachment_objects = [
@@ -159,12 +159,27 @@ def process_event(message, projects):
 
         attachment_cache.set(cache_key, attachments=attachment_objects, timeout=CACHE_TIMEOUT)
 
-    # Preprocess this event, which spawns either process_event or
-    # save_event. Pass data explicitly to avoid fetching it again from the
-    # cache.
-    preprocess_event(
-        cache_key=cache_key, data=data, start_time=start_time, event_id=event_id, project=project
-    )
+    if fused:
+        # Preprocess this event, which either spawns process_event or saves
+        # the event right away.
+        preprocess_and_save_event(
+            cache_key=cache_key,
+            data=data,
+            start_time=start_time,
+            event_id=event_id,
+            project=project,
+        )
+    else:
+        # Preprocess this event, which spawns either process_event or
+        # save_event. Pass data explicitly to avoid fetching it again from the
+        # cache.
+        preprocess_event(
+            cache_key=cache_key,
+            data=data,
+            start_time=start_time,
+            event_id=event_id,
+            project=project,
+        )
 
     # remember for an 1 hour that we saved this event (deduplication protection)
     cache.set(deduplication_key, "", CACHE_TIMEOUT)
@@ -173,19 +188,32 @@ def process_event(message, projects):
     event_accepted.send_robust(ip=remote_addr, data=data, project=project, sender=process_event)
 
 
+def _get_attachment_chunk(message):
+    cache_key = cache_key_for_event(
+        {"event_id": message["event_id"], "project": message["project_id"]}
+    )
+    return (cache_key, message["id"], message["chunk_index"], message["payload"])
+
+
 @metrics.wraps("ingest_consumer.process_attachment_chunk")
 def process_attachment_chunk(message, projects):
-    payload = message["payload"]
-    event_id = message["event_id"]
-    project_id = message["project_id"]
-    id = message["id"]
-    chunk_index = message["chunk_index"]
-    cache_key = cache_key_for_event({"event_id": event_id, "project": project_id})
+    cache_key, id, chunk_index, payload = _get_attachment_chunk(message)
     attachment_cache.set_chunk(
         key=cache_key, id=id, chunk_index=chunk_index, chunk_data=payload, timeout=CACHE_TIMEOUT
     )
 
 
+@metrics.wraps("ingest_consumer.process_attachment_chunks_batch")
+def process_attachment_chunks_batch(messages, projects, pool=None):
+    """
+    Writes all attachment chunks of a batch at once. Chunks are compressed
+    in parallel on ``pool`` and stored with one pipelined write per redis
+    node instead of one round-trip per chunk.
+    """
+    chunks = [_get_attachment_chunk(message) for message in messages]
+    attachment_cache.set_chunks(chunks, timeout=CACHE_TIMEOUT, pool=pool)
+
+
 @metrics.wraps("ingest_consumer.process_individual_attachment")
 def process_individual_attachment(message, projects):
     event_id = message["event_id"]
@@ -12,6 +12,7 @@ from ua_parser.user_agent_parser import Parse
 from sentry.api.fields.multiplechoice import MultipleChoiceField
 from sentry.models.projectoption import ProjectOption
 from sentry.signals import inbound_filter_toggled
+from sentry.utils.compat import functools
 from sentry.utils.data_filters import FilterStatKeys, get_filter_key
 from sentry.utils.safe import get_path
 
@@ -325,6 +326,13 @@ MIN_VERSIONS = {
 }
 
 
+@functools.lru_cache(maxsize=1000)
+def _parse_user_agent(value):
+    # Parsing a user agent runs a long list of regular expressions, while the
+    # same few user agents are seen over and over again.
+    return Parse(value)
+
+
 def _legacy_browsers_filter(project_config, data):
     def get_user_agent(data):
         try:
@@ -341,11 +349,12 @@ def _legacy_browsers_filter(project_config, data):
     if not value:
         return False
 
-    ua = Parse(value)
+    ua = _parse_user_agent(value)
     if not ua:
         return False
 
-    browser = ua["user_agent"]
+    # Copy the parsed browser, the parse result is shared across events
+    browser = dict(ua["user_agent"])
 
     if not browser["family"]:
         return False
@@ -0,0 +1,137 @@
+from __future__ import absolute_import
+
+__all__ = ["AggregatingMetricsBackend"]
+
+import atexit
+import logging
+import math
+import os
+import time
+
+from collections import defaultdict, deque
+from random import random
+from threading import Lock, Thread
+
+from sentry.utils.imports import import_string
+
+logger = logging.getLogger("sentry.errors")
+
+COUNTER = 0
+TIMING = 1
+
+# Timings are summarized into buckets that are 10% wide.
+TIMING_BUCKET_BASE = math.log(1.1)
+
+
+class AggregatingMetricsBackend(object):
+    """
+    Wraps another metrics backend, aggregating metrics in-process and sending
+    them from a background thread every ``flush_interval`` milliseconds.
+
+    Counters are summed and timings are summarized into histograms with
+    logarithmic buckets, which are reported as the mean value of each bucket
+    weighted by the number of observations. Everything that is flushed
+    together is sent within ``batch()`` of the wrapped backend, so backends
+    that support it send multiple metrics per packet.
+
+    Recording a metric only appends to a queue, so unlike the other backends
+    this one is shared by all threads. At most ``max_buffer_size`` metrics
+    are kept between flushes; the oldest are discarded beyond that. Tags are
+    not copied when recorded and must not be modified afterwards.
+
+    For example::
+
+        SENTRY_METRICS_BACKEND = "sentry.metrics.aggregating.AggregatingMetricsBackend"
+        SENTRY_METRICS_OPTIONS = {
+            "backend": "sentry.metrics.statsd.StatsdMetricsBackend",
+            "backend_options": {"host": "127.0.0.1", "port": 8125},
+        }
+    """
+
+    def __init__(
+        self, backend, backend_options=None, flush_interval=1000, max_buffer_size=100000
+    ):
+        self.backend = import_string(backend)(**(backend_options or {}))
+        self.flush_interval = flush_interval / 1000.0
+        self.max_buffer_size = max_buffer_size
+        self._buffer = deque(maxlen=max_buffer_size)
+        self._lock = Lock()
+        self._pid = None
+
+    def _start(self):
+        # The flusher thread does not survive a fork, so it is (re)started
+        # lazily in every process that records metrics.
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+
+            self._buffer.clear()
+
+            def worker():
+                while True:
+                    time.sleep(self.flush_interval)
+                    self.flush()
+
+            t = Thread(target=worker)
+            t.setDaemon(True)
+            t.start()
+
+            if self._pid is None:
+                atexit.register(self.flush)
+            self._pid = os.getpid()
+
+    def incr(self, key, instance=None, tags=None, amount=1, sample_rate=1):
+        if sample_rate < 1 and random() >= sample_rate:
+            return
+        if self._pid != os.getpid():
+            self._start()
+        self._buffer.append((COUNTER, key, instance, tags, amount, sample_rate))
+
+    def timing(self, key, value, instance=None, tags=None, sample_rate=1):
+        if sample_rate < 1 and random() >= sample_rate:
+            return
+        if self._pid != os.getpid():
+            self._start()
+        self._buffer.append((TIMING, key, instance, tags, value, sample_rate))
+
+    def flush(self):
+        # (key, instance, tags) -> amount
+        counters = defaultdict(float)
+        # (key, instance, tags) -> bucket -> [weight, weighted sum]
+        timings = defaultdict(lambda: defaultdict(lambda: [0.0, 0.0]))
+
+        buffer = self._buffer
+        for _ in range(len(buffer)):
+            try:
+                kind, key, instance, tags, value, sample_rate = buffer.popleft()
+            except IndexError:
+                break
+
+            metric = (key, instance, tuple(sorted(tags.items())) if tags else ())
+            weight = 1.0 / sample_rate
+            if kind == COUNTER:
+                counters[metric] += value * weight
+            else:
+                if value > 0:
+                    bucket = int(math.floor(math.log(value) / TIMING_BUCKET_BASE))
+                else:
+                    bucket = None
+                summary = timings[metric][bucket]
+                summary[0] += weight
+                summary[1] += value * weight
+
+        if not counters and not timings:
+            return
+
+        try:
+            with self.backend.batch():
+                for (key, instance, tags), amount in counters.items():
+                    self.backend.incr(key, instance, dict(tags), int(round(amount)), 1)
+
+                for (key, instance, tags), buckets in timings.items():
+                    for weight, total in buckets.values():
+                        self.backend.weighted_timing(
+                            key, total / weight, weight, instance, dict(tags)
+                        )
+        except Exception:
+            logger.exception("Unable to flush aggregated metrics")
@@ -2,6 +2,7 @@ from __future__ import absolute_import
 
 __all__ = ["MetricsBackend"]
 
+from contextlib import contextmanager
 from django.conf import settings
 from random import random
 from threading import local
@@ -26,3 +27,19 @@ class MetricsBackend(local):
 
     def timing(self, key, value, instance=None, tags=None, sample_rate=1):
         raise NotImplementedError
+
+    def weighted_timing(self, key, value, weight, instance=None, tags=None):
+        """
+        Records a timing ``value`` that stands for ``weight`` observations,
+        such as the mean of a histogram bucket. By default this is reported as
+        a single timing with a sample rate of ``1 / weight``.
+        """
+        self.timing(key, value, instance, tags, 1.0 / weight)
+
+    @contextmanager
+    def batch(self):
+        """
+        Metrics recorded within this context may be buffered by the backend
+        and sent together when it exits.
+        """
+        yield
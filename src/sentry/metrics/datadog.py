@@ -59,3 +59,9 @@ class DatadogMetricsBackend(MetricsBackend):
         self.stats.timing(
             self._get_key(key), value, sample_rate=sample_rate, tags=tags, host=self.host
         )
+
+    def weighted_timing(self, key, value, weight, instance=None, tags=None):
+        # ``ThreadStats`` aggregates in memory and discards samples when given
+        # a rate below 1, so the value is recorded once per observation.
+        for _ in range(int(round(weight))):
+            self.timing(key, value, instance, dict(tags) if tags else None)
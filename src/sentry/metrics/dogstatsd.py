@@ -2,11 +2,26 @@ from __future__ import absolute_import
 
 __all__ = ["DogStatsdMetricsBackend"]
 
+from contextlib import contextmanager
+
 from datadog import initialize, statsd
 
 from .base import MetricsBackend
 
 
+def _send_sampled_timing(metric, value, rate, tags):
+    """
+    Sends a timing with a sample rate, without sampling it on the client.
+
+    The ``datadog`` client (pinned below 0.31) has no public API for this:
+    ``timing`` discards samples at random for rates below 1. ``_report``
+    formats the packet as ``<metric>:<value>|<type>[|@<rate>][|#<tags>]`` and
+    only appends the rate if it isn't 1, so the rate is passed along with the
+    type instead.
+    """
+    statsd._report(metric, "ms|@%s" % rate, value, tags, 1)
+
+
 class DogStatsdMetricsBackend(MetricsBackend):
     def __init__(self, prefix=None, **kwargs):
         # TODO(dcramer): it'd be nice if the initialize call wasn't a global
@@ -35,3 +50,24 @@ class DogStatsdMetricsBackend(MetricsBackend):
         if tags:
             tags = [u"{}:{}".format(*i) for i in tags.items()]
         statsd.timing(self._get_key(key), value, sample_rate=sample_rate, tags=tags)
+
+    def weighted_timing(self, key, value, weight, instance=None, tags=None):
+        if tags is None:
+            tags = {}
+        if self.tags:
+            tags.update(self.tags)
+        if instance:
+            tags["instance"] = instance
+        if tags:
+            tags = [u"{}:{}".format(*i) for i in tags.items()]
+        _send_sampled_timing(self._get_key(key), value, 1.0 / weight, tags)
+
+    @contextmanager
+    def batch(self):
+        # Note that the ``statsd`` client is global, so metrics sent from
+        # other threads while the buffer is open are buffered as well.
+        statsd.open_buffer()
+        try:
+            yield
+        finally:
+            statsd.close_buffer()
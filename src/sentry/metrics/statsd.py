@@ -4,9 +4,24 @@ __all__ = ["StatsdMetricsBackend"]
 
 import statsd
 
+from contextlib import contextmanager
+
 from .base import MetricsBackend
 
 
+def _send_sampled_timing(client, stat, value, rate):
+    """
+    Sends a timing with a sample rate, without sampling it on the client.
+
+    The ``statsd`` client (pinned to 3.1) has no public API for this:
+    ``timing`` discards samples at random for rates below 1 and truncates the
+    value to an integer. ``_send_stat`` is what its public methods use on both
+    the client and pipelines, and it leaves the value untouched for a rate
+    of 1.
+    """
+    client._send_stat(stat, "%0.6f|ms|@%s" % (value, rate), 1)
+
+
 class StatsdMetricsBackend(MetricsBackend):
     def __init__(self, host="127.0.0.1", port=8125, **kwargs):
         self.client = statsd.StatsClient(host=host, port=port)
@@ -22,3 +37,18 @@ class StatsdMetricsBackend(MetricsBackend):
 
     def timing(self, key, value, instance=None, tags=None, sample_rate=1):
         self.client.timing(self._full_key(self._get_key(key)), value, sample_rate)
+
+    def weighted_timing(self, key, value, weight, instance=None, tags=None):
+        _send_sampled_timing(self.client, self._full_key(self._get_key(key)), value, 1.0 / weight)
+
+    @contextmanager
+    def batch(self):
+        # Backends are thread local, so swapping the client only affects the
+        # current thread.
+        client = self.client
+        with client.pipeline() as pipeline:
+            self.client = pipeline
+            try:
+                yield
+            finally:
+                self.client = client
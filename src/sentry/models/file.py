@@ -6,6 +6,8 @@ import mmap
 import tempfile
 import time
 
+from bisect import bisect_right
+
 from hashlib import sha1
 from uuid import uuid4
 from threading import Semaphore
@@ -33,7 +35,16 @@ UPLOAD_RETRY_TIME = getattr(settings, "SENTRY_UPLOAD_RETRY_TIME", 60)  # 1min
 DEFAULT_BLOB_SIZE = 1024 * 1024  # one mb
 CHUNK_STATE_HEADER = "__state"
 MULTI_BLOB_UPLOAD_CONCURRENCY = 8
+# Number of blobs `File.putfile` holds in memory at the same time. This
+# bounds the memory used by an upload to `PUTFILE_WINDOW * blob_size`,
+# independent of the size of the file.
+PUTFILE_WINDOW = MULTI_BLOB_UPLOAD_CONCURRENCY
 MAX_FILE_SIZE = 2 ** 31  # 2GB is the maximum offset supported by fileblob
+# Value for `File.getfile(prefetch=...)` that downloads blobs in the background
+# and serves reads as soon as the requested range is available.
+PREFETCH_RANGE = "range"
+RANGE_PREFETCH_READ_AHEAD = 4  # number of blobs fetched past the read position
+RANGE_PREFETCH_CONCURRENCY = 4
 
 
 class nooplogger(object):
@@ -227,6 +238,69 @@ class FileBlob(Model):
                     pass
             logger.debug("FileBlob.from_files.end")
 
+    @classmethod
+    def from_contents(cls, chunks, executor=None, logger=nooplogger):
+        """
+        Returns a `FileBlob` for every ``(contents, checksum)`` tuple in
+        ``chunks``, in the same order.
+
+        Existing blobs are looked up with a single query. The missing ones
+        are uploaded to the storage backend concurrently on ``executor`` and
+        saved once all uploads have finished.
+        """
+        logger.debug("FileBlob.from_contents.start")
+
+        checksums = set(checksum for _, checksum in chunks)
+        blobs = {blob.checksum: blob for blob in cls.objects.filter(checksum__in=checksums)}
+
+        def _upload(blob, contents):
+            storage = get_storage()
+            storage.save(blob.path, ContentFile(contents))
+
+        # Acquire the locks in a stable order, so concurrent uploads of
+        # overlapping files cannot deadlock.
+        pending = {}
+        for contents, checksum in chunks:
+            if checksum not in blobs:
+                pending.setdefault(checksum, contents)
+
+        locks = []
+        try:
+            futures = []
+            for checksum in sorted(pending):
+                lock = _locked_blob(checksum, logger=logger)
+                existing = lock.__enter__()
+                locks.append(lock)
+                if existing is not None:
+                    blobs[checksum] = existing
+                    continue
+
+                contents = pending[checksum]
+                blob = cls(size=len(contents), checksum=checksum)
+                blob.path = cls.generate_unique_path()
+                if executor is None:
+                    _upload(blob, contents)
+                else:
+                    futures.append(executor.submit(_upload, blob, contents))
+                blobs[checksum] = blob
+                metrics.timing("filestore.blob-size", blob.size, tags={"function": "from_contents"})
+
+            for future in futures:
+                future.result()
+
+            for checksum in pending:
+                if blobs[checksum].id is None:
+                    blobs[checksum].save()
+        finally:
+            for lock in locks:
+                try:
+                    lock.__exit__(None, None, None)
+                except Exception:
+                    pass
+
+        logger.debug("FileBlob.from_contents.end")
+        return [blobs[checksum] for _, checksum in chunks]
+
     @classmethod
     def from_file(cls, fileobj, logger=nooplogger):
         """
@@ -334,8 +408,17 @@ class File(Model):
         """Returns a file object.  By default the file is fetched on
         demand but if prefetch is enabled the file is fully prefetched
         into a tempfile before reading can happen.
+
+        With ``prefetch=PREFETCH_RANGE`` blobs are downloaded in parallel
+        into a sparse tempfile and reads are served as soon as the requested
+        range has arrived, with a bounded read-ahead after the read position.
         """
-        impl = self._get_chunked_blob(mode, prefetch)
+        if prefetch == PREFETCH_RANGE:
+            impl = RangePrefetchedFileBlobIndexWrapper(
+                FileBlobIndex.objects.filter(file=self).select_related("blob").order_by("offset")
+            )
+        else:
+            impl = self._get_chunked_blob(mode, prefetch)
         return FileObj(impl, self.name)
 
     def save_to(self, path):
@@ -378,17 +461,30 @@ class File(Model):
         offset = 0
         checksum = sha1(b"")
 
-        while True:
-            contents = fileobj.read(blob_size)
-            if not contents:
-                break
-            checksum.update(contents)
+        # The file is read in windows of `PUTFILE_WINDOW` blobs. The blobs of
+        # a window are uploaded concurrently, and the next window is only
+        # read once they are stored, which bounds the memory used.
+        with ThreadPoolExecutor(max_workers=MULTI_BLOB_UPLOAD_CONCURRENCY) as exe:
+            while True:
+                window = []
+                while len(window) < PUTFILE_WINDOW:
+                    contents = fileobj.read(blob_size)
+                    if not contents:
+                        break
+                    checksum.update(contents)
+                    window.append((contents, sha1(contents).hexdigest()))
+
+                if not window:
+                    break
 
-            blob_fileobj = ContentFile(contents)
-            blob = FileBlob.from_file(blob_fileobj, logger=logger)
+                blobs = FileBlob.from_contents(window, executor=exe, logger=logger)
+                del window
 
-            results.append(FileBlobIndex.objects.create(file=self, blob=blob, offset=offset))
-            offset += blob.size
+                indexes = []
+                for blob in blobs:
+                    indexes.append(FileBlobIndex(file=self, blob=blob, offset=offset))
+                    offset += blob.size
+                results.extend(FileBlobIndex.objects.bulk_create(indexes))
         self.size = offset
         self.checksum = checksum.hexdigest()
         metrics.timing("filestore.file-size", offset)
@@ -596,6 +692,113 @@ class ChunkedFileBlobIndexWrapper(object):
         return bytes(result)
 
 
+class RangePrefetchedFileBlobIndexWrapper(object):
+    """
+    Random access reader over the blobs of a file. Blobs are downloaded on
+    a thread pool into a sparse, memory mapped tempfile. A read only waits
+    for the blobs overlapping the requested range, and the following
+    ``read_ahead`` blobs are requested in the background.
+    """
+
+    def __init__(
+        self,
+        indexes,
+        read_ahead=RANGE_PREFETCH_READ_AHEAD,
+        concurrency=RANGE_PREFETCH_CONCURRENCY,
+        prefetch_to=None,
+    ):
+        self._indexes = list(indexes)
+        self._offsets = [idx.offset for idx in self._indexes]
+        self._read_ahead = read_ahead
+        self._futures = {}
+        self._pos = 0
+        self.size = sum(idx.blob.size for idx in self._indexes)
+
+        self._file = tempfile.NamedTemporaryFile(prefix="._prefetch-", dir=prefetch_to)
+        self._mem = None
+        self._executor = None
+        if self.size > 0:
+            # Truncating creates a sparse file, nothing is written up front
+            self._file.truncate(self.size)
+            self._mem = mmap.mmap(self._file.fileno(), self.size)
+            self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        self.close()
+
+    def _fetch(self, idx):
+        offset = idx.offset
+        with idx.blob.getfile() as sf:
+            while True:
+                chunk = sf.read(65535)
+                if not chunk:
+                    break
+                self._mem[offset : offset + len(chunk)] = chunk
+                offset += len(chunk)
+
+    def _request(self, i):
+        if i < len(self._indexes) and i not in self._futures:
+            self._futures[i] = self._executor.submit(self._fetch, self._indexes[i])
+
+    def _wait_for_range(self, start, end):
+        first = bisect_right(self._offsets, start) - 1
+        last = bisect_right(self._offsets, end - 1) - 1
+        for i in range(first, last + 1 + self._read_ahead):
+            self._request(i)
+
+        for i in range(first, last + 1):
+            self._futures[i].result()
+
+    def open(self):
+        pass
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        if self._executor is not None:
+            for future in six.itervalues(self._futures):
+                future.cancel()
+            # Running downloads write into the mapping, wait for them before
+            # it goes away.
+            self._executor.shutdown(wait=True)
+            self._mem.close()
+        self._file.close()
+
+    def seek(self, pos, whence=os.SEEK_SET):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        if whence == os.SEEK_CUR:
+            pos += self._pos
+        elif whence == os.SEEK_END:
+            pos += self.size
+        if pos < 0:
+            raise IOError("Invalid argument")
+        self._pos = pos
+
+    def tell(self):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        return self._pos
+
+    def read(self, n=-1):
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+
+        start = self._pos
+        end = self.size if n < 0 else min(self.size, start + n)
+        if start >= end:
+            return b""
+
+        self._wait_for_range(start, end)
+        self._pos = end
+        return self._mem[start:end]
+
+
 class FileBlobOwner(Model):
     __core__ = False
 
@@ -1,9 +1,11 @@
 from __future__ import absolute_import
 
-from django.db import models
+from django.db import models, router, transaction
+from django.db.models.signals import post_delete, post_save
 from django.utils import timezone
 from django.utils.translation import ugettext_lazy as _
 from sentry.db.models import BoundedPositiveIntegerField, Model, FlexibleForeignKey, sane_repr
+from sentry.utils.cache import cache
 
 
 class GroupResolution(Model):
@@ -42,6 +44,49 @@ class GroupResolution(Model):
 
     __repr__ = sane_repr("group_id", "release_id")
 
+    @classmethod
+    def get_cache_key(cls, group_id):
+        return "groupresolution_group_id:1:%s" % (group_id)
+
+    @classmethod
+    def get_resolution_for_group(cls, group):
+        """
+        Returns the ``(type, release_id, release_date_added)`` of the group's
+        resolution, or ``None`` if the group has no resolution.
+
+        Releases are ordered by ``date_added``, which is stored along with the
+        resolution so that checking events for regressions doesn't need a query
+        per event. The cache is cleared whenever a resolution is changed.
+        """
+        key = cls.get_cache_key(group.id)
+        resolution = cache.get(key)
+        if resolution is None:
+            try:
+                resolution = tuple(
+                    cls.objects.filter(group=group)
+                    .select_related("release")
+                    .values_list("type", "release__id", "release__date_added")[0]
+                )
+            except IndexError:
+                resolution = False
+            cache.set(key, resolution, 3600)
+        return resolution or None
+
+    @classmethod
+    def clear_cache(cls, group_ids):
+        """
+        Clears the cached resolutions of the given groups.
+
+        Inside a transaction the keys are cleared again once it commits, as
+        concurrent reads could have cached the uncommitted state meanwhile.
+        """
+        keys = [cls.get_cache_key(group_id) for group_id in group_ids]
+        cache.delete_many(keys)
+
+        using = router.db_for_write(cls)
+        if transaction.get_connection(using).in_atomic_block:
+            transaction.on_commit(lambda: cache.delete_many(keys), using=using)
+
     @classmethod
     def has_resolution(cls, group, release):
         """
@@ -49,15 +94,12 @@ class GroupResolution(Model):
 
         This is used to suggest if a regression has occurred.
         """
-        try:
-            res_type, res_release, res_release_datetime = (
-                cls.objects.filter(group=group)
-                .select_related("release")
-                .values_list("type", "release__id", "release__date_added")[0]
-            )
-        except IndexError:
+        resolution = cls.get_resolution_for_group(group)
+        if resolution is None:
             return False
 
+        res_type, res_release, res_release_datetime = resolution
+
         # if no release is present, we assume we've gone from "no release" to "some release"
         # in application configuration, and thus this must be older
         if not release:
@@ -77,3 +119,15 @@ class GroupResolution(Model):
             return True
         else:
             raise NotImplementedError
+
+
+post_save.connect(
+    lambda instance, **kwargs: GroupResolution.clear_cache([instance.group_id]),
+    sender=GroupResolution,
+    weak=False,
+)
+post_delete.connect(
+    lambda instance, **kwargs: GroupResolution.clear_cache([instance.group_id]),
+    sender=GroupResolution,
+    weak=False,
+)
@@ -1,7 +1,9 @@
 from __future__ import absolute_import
 
 import operator
+import threading
 
+from collections import OrderedDict
 
 from django.db import models
 from django.db.models import Q
@@ -10,12 +12,39 @@ from django.utils import timezone
 
 from sentry.db.models import Model, sane_repr
 from sentry.db.models.fields import FlexibleForeignKey, JSONField
-from sentry.ownership.grammar import load_schema
+from sentry.ownership.grammar import compile_schema
 from sentry.utils.cache import cache
+from sentry.utils.hashlib import hash_values
 from functools import reduce
 
 READ_CACHE_DURATION = 3600
 
+# The maximum number of compiled ownership schemas kept in memory per process.
+COMPILED_SCHEMA_CACHE_SIZE = 1000
+
+_compiled_schemas = OrderedDict()
+_compiled_schemas_lock = threading.Lock()
+
+
+def get_compiled_schema(project_id, schema):
+    """
+    Returns the compiled form of ``schema``, caching it per project and
+    schema contents in a bounded LRU.
+    """
+    key = (project_id, hash_values([schema]))
+    with _compiled_schemas_lock:
+        compiled = _compiled_schemas.pop(key, None)
+        if compiled is not None:
+            _compiled_schemas[key] = compiled
+            return compiled
+
+    compiled = compile_schema(schema)
+    with _compiled_schemas_lock:
+        _compiled_schemas[key] = compiled
+        while len(_compiled_schemas) > COMPILED_SCHEMA_CACHE_SIZE:
+            _compiled_schemas.popitem(last=False)
+    return compiled
+
 
 class ProjectOwnership(Model):
     __core__ = True
@@ -128,13 +157,10 @@ class ProjectOwnership(Model):
 
     @classmethod
     def _matching_ownership_rules(cls, ownership, project_id, data):
-        rules = []
-        if ownership.schema is not None:
-            for rule in load_schema(ownership.schema):
-                if rule.test(data):
-                    rules.append(rule)
+        if ownership.schema is None:
+            return []
 
-        return rules
+        return get_compiled_schema(project_id, ownership.schema).get_matching_rules(data)
 
 
 def resolve_actors(owners, project_id):
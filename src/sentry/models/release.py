@@ -248,6 +248,12 @@ class Release(Model):
             GroupResolution,
         )
         for release in from_releases:
+            resolved_group_ids = list(
+                GroupResolution.objects.filter(release_id=release.id).values_list(
+                    "group_id", flat=True
+                )
+            )
+
             for model in model_list:
                 if hasattr(model, "release"):
                     update_kwargs = {"release": to_release}
@@ -266,6 +272,9 @@ class Release(Model):
 
             Group.objects.filter(first_release=release).update(first_release=to_release)
 
+            # Cached resolutions include the date of their release
+            GroupResolution.clear_cache(resolved_group_ids)
+
             release.delete()
 
     def add_dist(self, name, date_added=None):
@@ -611,6 +620,7 @@ class Release(Model):
                         "actor_id": actor.id if actor else None,
                     },
                 )
+                GroupResolution.clear_cache([group_id])
                 group = Group.objects.get(id=group_id)
                 group.update(status=GroupStatus.RESOLVED)
                 metrics.incr("group.resolved", instance="in_commit", skip_internal=True)
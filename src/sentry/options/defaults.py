@@ -178,6 +178,11 @@ register("store.lie-about-filter-status", default=False)
 # (``False``) and spawning a save_event task (``True``).
 register("store.transactions-celery", default=False)
 
+# Toggles saving events that need no processing directly in the ingest
+# consumer (``True``) instead of passing them to a save_event task through the
+# default cache (``False``).
+register("store.ingest-fused-save", default=False)
+
 # Symbolicator refactors
 # - Disabling minidump stackwalking in endpoints
 register("symbolicator.minidump-refactor-projects-opt-in", type=Sequence, default=[])  # unused
@@ -197,6 +202,10 @@ register("store.use-rust-data-scrubber", default=False)  # unused
 register("post-process.use-error-hook-sampling", default=False)  # unused
 # From 0.0 to 1.0: Randomly enqueue process_resource_change task
 register("post-process.error-hook-sample-rate", default=0.0)  # unused
+# Toggles dispatching one post_process_group_batch task per project for the
+# events of a post-process forwarder batch (``True``) instead of one
+# post_process_group task per event (``False``).
+register("post-process.batch-tasks", default=False)
 
 # Transaction events
 # True => kill switch to disable ingestion of transaction events for internal project.
@@ -1,12 +1,12 @@
 from __future__ import absolute_import
 
-from collections import namedtuple
+from collections import namedtuple, OrderedDict
 from parsimonious.grammar import Grammar, NodeVisitor
 from parsimonious.exceptions import ParseError  # noqa
 from sentry.utils.safe import get_path
-from sentry.utils.glob import glob_match
+from sentry.utils.glob import compile_glob
 
-__all__ = ("parse_rules", "dump_schema", "load_schema")
+__all__ = ("parse_rules", "dump_schema", "load_schema", "compile_schema")
 
 VERSION = 1
 
@@ -90,16 +90,15 @@ class Matcher(namedtuple("Matcher", "type pattern")):
             url = data["request"]["url"]
         except KeyError:
             return False
-        return url and glob_match(url, self.pattern, ignorecase=True)
+        return url and compile_glob(self.pattern, ignorecase=True).match(url)
 
     def test_path(self, data):
-        for frame in _iter_frames(data):
-            filename = frame.get("filename") or frame.get("abs_path")
+        return self.test_filenames(_iter_frame_filenames(data))
 
-            if not filename:
-                continue
-
-            if glob_match(filename, self.pattern, ignorecase=True, path_normalize=True):
+    def test_filenames(self, filenames):
+        glob = compile_glob(self.pattern, ignorecase=True, path_normalize=True)
+        for filename in filenames:
+            if glob.match(filename):
                 return True
 
         return False
@@ -124,6 +123,39 @@ class Owner(namedtuple("Owner", "type identifier")):
         return cls(data["type"], data["identifier"])
 
 
+class CompiledSchema(object):
+    """
+    A loaded ownership schema, ready to be tested against many events.
+
+    Testing path rules one by one walks all frames of the event for every
+    rule. Instead, the distinct frame filenames of an event are extracted once
+    and every distinct matcher is tested only once per event.
+    """
+
+    def __init__(self, rules):
+        self.rules = rules
+
+    def get_matching_rules(self, data):
+        filenames = None
+        results = {}
+        rules = []
+
+        for rule in self.rules:
+            matcher = rule.matcher
+            if matcher not in results:
+                if matcher.type == "path":
+                    if filenames is None:
+                        filenames = list(OrderedDict.fromkeys(_iter_frame_filenames(data)))
+                    results[matcher] = matcher.test_filenames(filenames)
+                else:
+                    results[matcher] = matcher.test(data)
+
+            if results[matcher]:
+                rules.append(rule)
+
+        return rules
+
+
 class OwnershipVisitor(NodeVisitor):
     visit_comment = visit_empty = lambda *a: None
 
@@ -194,6 +226,13 @@ def _iter_frames(data):
             continue
 
 
+def _iter_frame_filenames(data):
+    for frame in _iter_frames(data):
+        filename = frame.get("filename") or frame.get("abs_path")
+        if filename:
+            yield filename
+
+
 def parse_rules(data):
     """Convert a raw text input into a Rule tree"""
     tree = ownership_grammar.parse(data)
@@ -210,3 +249,8 @@ def load_schema(schema):
     if schema["$version"] != VERSION:
         raise RuntimeError("Invalid schema $version: %r" % schema["$version"])
     return [Rule.load(r) for r in schema["rules"]]
+
+
+def compile_schema(schema):
+    """Convert a JSON schema into a CompiledSchema"""
+    return CompiledSchema(load_schema(schema))
@@ -10,6 +10,7 @@ COUNTER_TASKS = set(["sentry.tasks.process_buffer.process_incr"])
 TRIGGER_TASKS = set(
     [
         "sentry.tasks.post_process.post_process_group",
+        "sentry.tasks.post_process.post_process_group_batch",
         "sentry.tasks.post_process.plugin_post_process_group",
     ]
 )
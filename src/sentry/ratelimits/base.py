@@ -1,12 +1,49 @@
 from __future__ import absolute_import
 
+from collections import namedtuple
+
 from sentry.utils.services import Service
 
 
+class RateLimit(namedtuple("RateLimit", ["key", "limit", "project", "window"])):
+    """
+    A single rate limit to check, as accepted by ``RateLimiter.check_many``.
+    """
+
+    __slots__ = ()
+
+    def __new__(cls, key, limit, project=None, window=None):
+        return super(RateLimit, cls).__new__(cls, key, limit, project, window)
+
+
+#: The outcome of checking a ``RateLimit``. ``remaining`` is the number of
+#: requests that are still allowed for the key and ``reset`` is the UNIX
+#: timestamp at which all currently counted requests have left the window
+#: (``None`` if unknown).
+RateLimitResult = namedtuple("RateLimitResult", ["is_limited", "remaining", "reset"])
+
+
 class RateLimiter(Service):
-    __all__ = ("is_limited", "validate")
+    __all__ = ("is_limited", "check_many", "validate")
 
     window = 60
 
     def is_limited(self, key, limit, project=None, window=None):
         return False
+
+    def check_many(self, limits):
+        """
+        Checks several ``RateLimit``s at once, counting the request against
+        all of them only if none of them are exceeded. Returns a list of
+        ``RateLimitResult``, in the same order as ``limits``.
+        """
+        return [
+            RateLimitResult(
+                is_limited=self.is_limited(
+                    limit.key, limit.limit, project=limit.project, window=limit.window
+                ),
+                remaining=None,
+                reset=None,
+            )
+            for limit in limits
+        ]
@@ -2,15 +2,25 @@ from __future__ import absolute_import
 
 import six
 
+from collections import defaultdict
 from time import time
 
 from sentry.exceptions import InvalidConfiguration
-from sentry.ratelimits.base import RateLimiter
+from sentry.ratelimits.base import RateLimit, RateLimiter, RateLimitResult
 from sentry.utils.hashlib import md5_text
-from sentry.utils.redis import get_cluster_from_options
+from sentry.utils.redis import get_cluster_from_options, load_script
+
+sliding_window = load_script("ratelimits/sliding_window.lua")
 
 
 class RedisRateLimiter(RateLimiter):
+    """
+    A sliding window rate limiter. Requests are counted in fixed windows and
+    the count for the sliding window is estimated from the current and the
+    previous fixed window, which avoids bursts of twice the limit around
+    window boundaries. Requests that are rejected are not counted.
+    """
+
     window = 60
 
     def __init__(self, **options):
@@ -23,20 +33,60 @@ class RedisRateLimiter(RateLimiter):
         except Exception as e:
             raise InvalidConfiguration(six.text_type(e))
 
+    def _get_routing_key(self, key, project=None):
+        key_hex = md5_text(key).hexdigest()
+        if project:
+            return "rl:%s:%s" % (key_hex, project.id)
+        return "rl:%s" % (key_hex,)
+
     def is_limited(self, key, limit, project=None, window=None):
-        if window is None:
-            window = self.window
+        result = self.check_many([RateLimit(key, limit, project=project, window=window)])[0]
+        return result.is_limited
 
-        key_hex = md5_text(key).hexdigest()
-        bucket = int(time() / window)
+    def check_many(self, limits):
+        """
+        Checks several rate limits in one round-trip per Redis host. Limits
+        that are stored on the same host are checked and incremented
+        atomically: the request is only counted if none of them are exceeded.
+        """
+        now = time()
+        router = self.cluster.get_router()
 
-        if project:
-            key = "rl:%s:%s:%s" % (key_hex, project.id, bucket)
-        else:
-            key = "rl:%s:%s" % (key_hex, bucket)
+        # host id -> [(index, limit, window, bucket, routing key)]
+        checks = defaultdict(list)
+        for index, limit in enumerate(limits):
+            window = limit.window or self.window
+            routing_key = self._get_routing_key(limit.key, limit.project)
+            checks[router.get_host_for_key(routing_key)].append(
+                (index, limit.limit, window, int(now / window), routing_key)
+            )
+
+        results = [None] * len(limits)
+        for host_id, host_checks in six.iteritems(checks):
+            keys = []
+            args = []
+            for index, limit, window, bucket, routing_key in host_checks:
+                keys.extend(["%s:%s" % (routing_key, bucket), "%s:%s" % (routing_key, bucket - 1)])
+                args.extend(
+                    [
+                        limit,
+                        # weight of the previous window in the sliding window
+                        1 - (now - bucket * window) / float(window),
+                        # the counter is needed until the next window ends
+                        int((bucket + 2) * window - now) + 1,
+                    ]
+                )
 
-        with self.cluster.map() as client:
-            result = client.incr(key)
-            client.expire(key, window)
+            response = sliding_window(self.cluster.get_local_client(host_id), keys, args)
+            rejected = int(response[0]) == 1
+            for (index, limit, window, bucket, routing_key), count in zip(
+                host_checks, response[1:]
+            ):
+                count = float(count)
+                results[index] = RateLimitResult(
+                    is_limited=count + 1 > limit,
+                    remaining=max(0, int(limit - count - (0 if rejected else 1))),
+                    reset=(bucket + 2) * window,
+                )
 
-        return result.value > limit
+        return results
@@ -6,5 +6,10 @@ from sentry.rules.base import RuleBase
 class EventCondition(RuleBase):
     rule_type = "condition/event"
 
+    # The relative cost of evaluating the condition. The conditions of a rule
+    # are evaluated from the cheapest to the most expensive one, so that
+    # checks of the event state can skip the queries of other conditions.
+    cost = 1
+
     def passes(self, event, state):
         raise NotImplementedError
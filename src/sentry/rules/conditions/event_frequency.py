@@ -33,6 +33,8 @@ class EventFrequencyForm(forms.Form):
 
 
 class BaseEventFrequencyCondition(EventCondition):
+    # Frequencies are queried from TSDB for every event
+    cost = 10
     form_cls = EventFrequencyForm
     form_fields = {
         "value": {"type": "number", "placeholder": 100},
@@ -5,6 +5,7 @@ from sentry.rules.conditions.base import EventCondition
 
 class EveryEventCondition(EventCondition):
     label = "An event is seen"
+    cost = 0
 
     def passes(self, event, state):
         return True
@@ -5,6 +5,7 @@ from sentry.rules.conditions.base import EventCondition
 
 class FirstSeenEventCondition(EventCondition):
     label = "An issue is first seen"
+    cost = 0
 
     def passes(self, event, state):
         if self.rule.environment_id is None:
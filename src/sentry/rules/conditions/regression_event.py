@@ -5,6 +5,7 @@ from sentry.rules.conditions.base import EventCondition
 
 class RegressionEventCondition(EventCondition):
     label = "An issue changes state from resolved to unresolved"
+    cost = 0
 
     def passes(self, event, state):
         return state.is_regression
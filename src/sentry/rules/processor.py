@@ -12,6 +12,8 @@ from random import randrange
 from sentry import analytics
 from sentry.models import GroupRuleStatus, Rule
 from sentry.rules import EventState, rules
+from sentry.rules.conditions.base import EventCondition
+from sentry.utils import metrics
 from sentry.utils.hashlib import hash_values
 from sentry.utils.safe import safe_execute
 
@@ -21,7 +23,16 @@ RuleFuture = namedtuple("RuleFuture", ["rule", "kwargs"])
 class RuleProcessor(object):
     logger = logging.getLogger("sentry.rules")
 
-    def __init__(self, event, is_new, is_regression, is_new_group_environment, has_reappeared):
+    def __init__(
+        self,
+        event,
+        is_new,
+        is_regression,
+        is_new_group_environment,
+        has_reappeared,
+        rules=None,
+        rule_statuses=None,
+    ):
         self.event = event
         self.group = event.group
         self.project = event.project
@@ -31,20 +42,73 @@ class RuleProcessor(object):
         self.is_new_group_environment = is_new_group_environment
         self.has_reappeared = has_reappeared
 
+        # Processors of events of the same project may share the list of rules
+        # and a mapping of ``(group_id, rule_id)`` to rule statuses, so that a
+        # rule activated by an event is not evaluated again for the following
+        # events of the group.
+        self.rules = rules
+        self.rule_statuses = rule_statuses
+
         self.grouped_futures = {}
+        self.conditions_evaluated = 0
 
     def get_rules(self):
+        if self.rules is not None:
+            return self.rules
         return Rule.get_for_project(self.project.id)
 
+    def get_rule_status_cache_key(self, rule_id):
+        return "grouprulestatus:1:%s" % hash_values([self.group.id, rule_id])
+
     def get_rule_status(self, rule):
-        key = "grouprulestatus:1:%s" % hash_values([self.group.id, rule.id])
-        rule_status = cache.get(key)
-        if rule_status is None:
-            rule_status, _ = GroupRuleStatus.objects.get_or_create(
-                rule=rule, group=self.group, defaults={"project": self.project}
+        return self.get_rule_statuses([rule])[rule.id]
+
+    def get_rule_statuses(self, rule_list):
+        """
+        Returns the statuses of the group for the given rules, by rule id.
+
+        Statuses that are not cached are loaded with a single query, and only
+        the statuses that don't exist yet are created one by one.
+        """
+        statuses = {}
+        if self.rule_statuses is not None:
+            for rule in rule_list:
+                rule_status = self.rule_statuses.get((self.group.id, rule.id))
+                if rule_status is not None:
+                    statuses[rule.id] = rule_status
+
+        missing = [rule for rule in rule_list if rule.id not in statuses]
+        if missing:
+            keys = {self.get_rule_status_cache_key(rule.id): rule.id for rule in missing}
+            for key, rule_status in six.iteritems(cache.get_many(list(keys))):
+                statuses[keys[key]] = rule_status
+
+        missing = [rule for rule in missing if rule.id not in statuses]
+        if missing:
+            for rule_status in GroupRuleStatus.objects.filter(
+                group=self.group, rule__in=[rule.id for rule in missing]
+            ):
+                statuses[rule_status.rule_id] = rule_status
+
+            for rule in missing:
+                if rule.id not in statuses:
+                    statuses[rule.id], _ = GroupRuleStatus.objects.get_or_create(
+                        rule=rule, group=self.group, defaults={"project": self.project}
+                    )
+
+            cache.set_many(
+                {self.get_rule_status_cache_key(rule.id): statuses[rule.id] for rule in missing},
+                300,
             )
-            cache.set(key, rule_status, 300)
-        return rule_status
+
+        if self.rule_statuses is not None:
+            for rule_id, rule_status in six.iteritems(statuses):
+                self.rule_statuses[(self.group.id, rule_id)] = rule_status
+        return statuses
+
+    def get_condition_cost(self, condition):
+        condition_cls = rules.get(condition["id"])
+        return getattr(condition_cls, "cost", EventCondition.cost)
 
     def condition_matches(self, condition, state, rule):
         condition_cls = rules.get(condition["id"])
@@ -52,6 +116,7 @@ class RuleProcessor(object):
             self.logger.warn("Unregistered condition %r", condition["id"])
             return
 
+        self.conditions_evaluated += 1
         condition_inst = condition_cls(self.project, data=condition, rule=rule)
         return safe_execute(condition_inst.passes, self.event, state, _with_transaction=False)
 
@@ -63,23 +128,25 @@ class RuleProcessor(object):
             has_reappeared=self.has_reappeared,
         )
 
-    def apply_rule(self, rule):
-        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
-        condition_list = rule.data.get("conditions", ())
-        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
-
+    def is_rule_applicable(self, rule):
         # XXX(dcramer): if theres no condition should we really skip it,
         # or should we just apply it blindly?
-        if not condition_list:
-            return
+        if not rule.data.get("conditions"):
+            return False
 
-        if (
-            rule.environment_id is not None
-            and self.event.get_environment().id != rule.environment_id
-        ):
+        return (
+            rule.environment_id is None or self.event.get_environment().id == rule.environment_id
+        )
+
+    def apply_rule(self, rule, status=None):
+        if not self.is_rule_applicable(rule):
             return
 
-        status = self.get_rule_status(rule)
+        match = rule.data.get("action_match") or Rule.DEFAULT_ACTION_MATCH
+        frequency = rule.data.get("frequency") or Rule.DEFAULT_FREQUENCY
+
+        if status is None:
+            status = self.get_rule_status(rule)
 
         now = timezone.now()
         freq_offset = now - timedelta(minutes=frequency)
@@ -89,6 +156,9 @@ class RuleProcessor(object):
 
         state = self.get_state()
 
+        # The result doesn't depend on the order of the conditions, evaluate
+        # the cheap ones first to short-circuit the expensive ones.
+        condition_list = sorted(rule.data["conditions"], key=self.get_condition_cost)
         condition_iter = (self.condition_matches(c, state, rule) for c in condition_list)
 
         if match == "all":
@@ -111,6 +181,8 @@ class RuleProcessor(object):
         if not passed:
             return
 
+        status.last_active = now
+
         if randrange(10) == 0:
             analytics.record(
                 "issue_alert.fired",
@@ -145,6 +217,12 @@ class RuleProcessor(object):
 
     def apply(self):
         self.grouped_futures.clear()
-        for rule in self.get_rules():
-            self.apply_rule(rule)
+        self.conditions_evaluated = 0
+
+        rule_list = [rule for rule in self.get_rules() if self.is_rule_applicable(rule)]
+        statuses = self.get_rule_statuses(rule_list)
+        for rule in rule_list:
+            self.apply_rule(rule, statuses[rule.id])
+
+        metrics.timing("rules.conditions.evaluated", self.conditions_evaluated)
         return six.itervalues(self.grouped_futures)
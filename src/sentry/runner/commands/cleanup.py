@@ -35,10 +35,14 @@ def get_project(value):
 # and child proc
 _STOP_WORKER = "91650ec271ae4b3e8a67cdc909d80f8c"
 
+# Marks a job that runs a `BulkDeleteQuery` over one id range of a model,
+# rather than deleting a chunk of ids through the deletions code path.
+_BULK_DELETE_JOB = "0d6b1b8a0e4e4b9c9c4c5e3c2f0e6a1b"
+
 API_TOKEN_TTL_IN_DAYS = 30
 
 
-def multiprocess_worker(task_queue):
+def multiprocess_worker(task_queue, result_queue=None):
     # Configure within each Process
     import logging
     from sentry.utils.imports import import_string
@@ -76,6 +80,23 @@ def multiprocess_worker(task_queue):
 
             configured = True
 
+        if j[0] == _BULK_DELETE_JOB:
+            _, model, query_kwargs, chunk_size = j
+            deleted = None
+            try:
+                from sentry.db.deletion import BulkDeleteQuery
+
+                deleted = BulkDeleteQuery(model=import_string(model), **query_kwargs).execute(
+                    chunk_size=chunk_size
+                )
+            except Exception as e:
+                logger.exception(e)
+            finally:
+                if result_queue is not None:
+                    result_queue.put((model, deleted))
+                task_queue.task_done()
+            continue
+
         model, chunk = j
         model = import_string(model)
 
@@ -136,12 +157,13 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
 
     # Make sure we fork off multiprocessing pool
     # before we import or configure the app
-    from multiprocessing import Process, JoinableQueue as Queue
+    from multiprocessing import Process, Queue as ResultQueue, JoinableQueue as Queue
 
     pool = []
     task_queue = Queue(1000)
+    result_queue = ResultQueue()
     for _ in xrange(concurrency):
-        p = Process(target=multiprocess_worker, args=(task_queue,))
+        p = Process(target=multiprocess_worker, args=(task_queue, result_queue))
         p.daemon = True
         p.start()
         pool.append(p)
@@ -254,6 +276,10 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
         except NotImplementedError:
             click.echo("NodeStore backend does not support cleanup operation", err=True)
 
+    # Bulk deletes are split into id range shards which are processed by the
+    # worker pool, so that several tables (and several ranges of the same
+    # table) are deleted from concurrently.
+    pending_shards = 0
     for bqd in BULK_QUERY_DELETES:
         if len(bqd) == 4:
             model, dtfield, order_by, chunk_size = bqd
@@ -270,10 +296,30 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
         if is_filtered(model):
             if not silent:
                 click.echo(">> Skipping %s" % model.__name__)
-        else:
-            BulkDeleteQuery(
-                model=model, dtfield=dtfield, days=days, project_id=project_id, order_by=order_by
-            ).execute(chunk_size=chunk_size)
+            continue
+
+        query_kwargs = {
+            "dtfield": dtfield,
+            "days": days,
+            "project_id": project_id,
+            "order_by": order_by,
+        }
+
+        if concurrency == 1:
+            BulkDeleteQuery(model=model, **query_kwargs).execute(chunk_size=chunk_size)
+            continue
+
+        imp = ".".join((model.__module__, model.__name__))
+        for min_id, max_id in BulkDeleteQuery(model=model, **query_kwargs).get_id_ranges(
+            concurrency
+        ):
+            shard_kwargs = dict(query_kwargs, min_id=min_id, max_id=max_id)
+            task_queue.put((_BULK_DELETE_JOB, imp, shard_kwargs, chunk_size))
+            pending_shards += 1
+
+    if pending_shards:
+        wait_for_bulk_deletes(result_queue, pending_shards, silent)
+        task_queue.join()
 
     for model, dtfield, order_by in DELETES:
         if not silent:
@@ -322,6 +368,36 @@ def cleanup(days, project, concurrency, silent, model, router, timed):
         click.echo("Clean up took %s second(s)." % duration)
 
 
+def wait_for_bulk_deletes(result_queue, total, silent=False):
+    """
+    Collects the results of ``total`` bulk delete shards from the workers,
+    reporting progress and an estimate of the remaining time.
+    """
+    import time
+
+    start = time.time()
+    rows = 0
+    for done in xrange(1, total + 1):
+        model, deleted = result_queue.get()
+        rows += deleted or 0
+        if silent:
+            continue
+
+        elapsed = time.time() - start
+        eta = elapsed / done * (total - done)
+        click.echo(
+            u">> [{done}/{total}] {model}: {deleted} rows removed "
+            u"({rows} total, ETA {eta}s)".format(
+                done=done,
+                total=total,
+                model=model.rsplit(".", 1)[-1],
+                deleted="?" if deleted is None else deleted,
+                rows=rows,
+                eta=int(eta),
+            )
+        )
+
+
 def cleanup_unused_files(quiet=False):
     """
     Remove FileBlob's (and thus the actual files) if they are no longer
@@ -304,6 +304,12 @@ def cron(**options):
     type=click.Choice(["earliest", "latest"]),
     help="Position in the commit log topic to begin reading from when no prior offset has been recorded.",
 )
+@click.option(
+    "--dispatch-batch-size",
+    default=1,
+    type=int,
+    help="How many messages to consume at once, publishing their tasks through a single broker connection.",
+)
 @log_options()
 @configuration
 def post_process_forwarder(**options):
@@ -317,6 +323,7 @@ def post_process_forwarder(**options):
             synchronize_commit_group=options["synchronize_commit_group"],
             commit_batch_size=options["commit_batch_size"],
             initial_offset_reset=options["initial_offset_reset"],
+            dispatch_batch_size=options["dispatch_batch_size"],
         )
     except ForwarderNotRequired:
         sys.stdout.write(
@@ -345,6 +352,18 @@ def post_process_forwarder(**options):
     type=click.Choice(["earliest", "latest"]),
     help="Position in the commit log topic to begin reading from when no prior offset has been recorded.",
 )
+@click.option(
+    "--batch-size",
+    default=1,
+    type=int,
+    help="How many messages to consume and handle at once. Offsets are committed after each batch.",
+)
+@click.option(
+    "--max-workers",
+    default=1,
+    type=int,
+    help="How many subscriptions to process concurrently when handling batches.",
+)
 @log_options()
 @configuration
 def query_subscription_consumer(**options):
@@ -355,6 +374,8 @@ def query_subscription_consumer(**options):
         topic=options["topic"],
         commit_batch_size=options["commit_batch_size"],
         initial_offset_reset=options["initial_offset_reset"],
+        batch_size=options["batch_size"],
+        max_workers=options["max_workers"],
     )
 
     def handler(signum, frame):
@@ -0,0 +1,45 @@
+-- Check and record a request against a collection of sliding window rate
+-- limits. Each limit is backed by two fixed window counters: the counter for
+-- the current window and the counter for the previous window. The number of
+-- requests in the sliding window is estimated by weighting the previous
+-- counter by the fraction of the previous window that still overlaps with the
+-- sliding window.
+--
+-- Values provided as ``KEYS`` are pairs of counter keys (current, previous)
+-- and values provided as ``ARGV`` are triples of limit, the weight of the
+-- previous counter, and the TTL (in seconds) of the current counter. For
+-- example, checking a limit ``foo`` of 10 requests and a limit ``bar`` of 20
+-- requests 15 seconds into a 60 second window:
+--
+--   KEYS = {"foo:1", "foo:0", "bar:1", "bar:0"}
+--   ARGV = {10, 0.75, 105, 20, 0.75, 105}
+--
+-- If all checks pass (the request is accepted), the current counter of every
+-- limit is incremented. If any check fails, no counters are modified. The
+-- result is a Redis multi bulk reply where the first value is 1 if the
+-- request was rejected (0 otherwise) followed by the estimated number of
+-- requests in each sliding window prior to this request.
+assert(#KEYS % 2 == 0, "there must be an even number of keys")
+assert(#KEYS / 2 * 3 == #ARGV, "incorrect number of keys and arguments provided")
+
+local results = {0}
+for i = 1, #KEYS / 2 do
+    local current = tonumber(redis.call('GET', KEYS[i * 2 - 1]) or 0)
+    local previous = tonumber(redis.call('GET', KEYS[i * 2]) or 0)
+    local count = previous * tonumber(ARGV[i * 3 - 1]) + current
+    if count + 1 > tonumber(ARGV[i * 3 - 2]) then
+        results[1] = 1
+    end
+    -- Lua numbers are truncated to integers when they are converted to Redis
+    -- replies, so the count is returned as a string.
+    results[i + 1] = tostring(count)
+end
+
+if results[1] == 0 then
+    for i = 1, #KEYS / 2 do
+        redis.call('INCR', KEYS[i * 2 - 1])
+        redis.call('EXPIRE', KEYS[i * 2 - 1], ARGV[i * 3])
+    end
+end
+
+return results
@@ -1,7 +1,10 @@
 from __future__ import absolute_import
 import logging
+from collections import OrderedDict
 from json import loads
 
+from concurrent.futures import ThreadPoolExecutor
+
 import jsonschema
 import pytz
 import sentry_sdk
@@ -19,6 +22,7 @@ logger = logging.getLogger(__name__)
 
 
 subscriber_registry = {}
+batch_subscriber_registry = {}
 
 
 def register_subscriber(subscriber_key):
@@ -31,6 +35,23 @@ def register_subscriber(subscriber_key):
     return inner
 
 
+def register_batch_subscriber(subscriber_key):
+    """
+    Registers a handler used when the consumer handles messages in batches.
+    It's called once per batch with a list of `(subscription, updates)` tuples
+    and an executor (or None) that can be used to process subscriptions
+    concurrently. A regular subscriber must also be registered for the key.
+    """
+
+    def inner(func):
+        if subscriber_key in batch_subscriber_registry:
+            raise Exception("Batch handler already registered for %s" % subscriber_key)
+        batch_subscriber_registry[subscriber_key] = func
+        return func
+
+    return inner
+
+
 class InvalidMessageError(Exception):
     pass
 
@@ -49,7 +70,13 @@ class QuerySubscriptionConsumer(object):
     topic_to_dataset = {settings.KAFKA_EVENTS_SUBSCRIPTIONS_RESULTS: QueryDatasets.EVENTS}
 
     def __init__(
-        self, group_id, topic=None, commit_batch_size=100, initial_offset_reset="earliest"
+        self,
+        group_id,
+        topic=None,
+        commit_batch_size=100,
+        initial_offset_reset="earliest",
+        batch_size=1,
+        max_workers=1,
     ):
         self.group_id = group_id
         if not topic:
@@ -59,6 +86,12 @@ class QuerySubscriptionConsumer(object):
         self.bootstrap_servers = settings.KAFKA_CLUSTERS[cluster_name]["bootstrap.servers"]
         self.commit_batch_size = commit_batch_size
         self.initial_offset_reset = initial_offset_reset
+        # When ``batch_size`` is greater than 1, messages are consumed and
+        # handled in batches, with updates for different subscriptions
+        # processed concurrently on up to ``max_workers`` threads.
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.executor = None
         self.offsets = {}
         self.consumer = None
 
@@ -83,6 +116,16 @@ class QuerySubscriptionConsumer(object):
         self.consumer = Consumer(conf)
         self.consumer.subscribe([self.topic], on_revoke=on_revoke)
 
+        if self.batch_size > 1:
+            if self.max_workers > 1:
+                self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            try:
+                self.run_batched()
+            except KeyboardInterrupt:
+                pass
+            self.shutdown()
+            return
+
         try:
             i = 0
             while True:
@@ -116,6 +159,32 @@ class QuerySubscriptionConsumer(object):
 
         self.shutdown()
 
+    def run_batched(self):
+        while True:
+            messages = self.consumer.consume(self.batch_size, 0.1)
+            if not messages:
+                continue
+
+            for message in messages:
+                error = message.error()
+                if error is not None:
+                    raise KafkaException(error)
+
+            with sentry_sdk.start_span(
+                Span(
+                    op="handle_messages",
+                    transaction="query_subscription_consumer_process_messages",
+                    sampled=True,
+                )
+            ), metrics.timer("snuba_query_subscriber.handle_messages"):
+                self.handle_messages(messages)
+
+            # Offsets are only tracked once the whole batch has been handled,
+            # and are committed once per batch.
+            for message in messages:
+                self.offsets[message.partition()] = message.offset() + 1
+            self.commit_offsets()
+
     def commit_offsets(self):
         if self.offsets and self.consumer:
             to_commit = [
@@ -129,6 +198,9 @@ class QuerySubscriptionConsumer(object):
         logger.debug("Committing offsets and closing consumer")
         self.commit_offsets()
         self.consumer.close()
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
 
     def handle_message(self, message):
         """
@@ -139,79 +211,175 @@ class QuerySubscriptionConsumer(object):
         :return:
         """
         with sentry_sdk.push_scope() as scope:
-            try:
-                with metrics.timer("snuba_query_subscriber.parse_message_value"):
-                    contents = self.parse_message_value(message.value())
-            except InvalidMessageError:
-                # If the message is in an invalid format, just log the error
-                # and continue
-                logger.exception(
-                    "Subscription update could not be parsed",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
-                )
+            contents = self._parse_message(message)
+            if contents is None:
                 return
             scope.set_tag("query_subscription_id", contents["subscription_id"])
 
-            try:
-                with metrics.timer("snuba_query_subscriber.fetch_subscription"):
+            with metrics.timer("snuba_query_subscriber.fetch_subscription"):
+                try:
                     subscription = QuerySubscription.objects.get_from_cache(
                         subscription_id=contents["subscription_id"]
                     )
-                    if subscription.status != QuerySubscription.Status.ACTIVE.value:
-                        metrics.incr("snuba_query_subscriber.subscription_inactive")
-                        return
-            except QuerySubscription.DoesNotExist:
-                metrics.incr("snuba_query_subscriber.subscription_doesnt_exist")
-                logger.error(
-                    "Received subscription update, but subscription does not exist",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
+                except QuerySubscription.DoesNotExist:
+                    subscription = None
+
+            if self._validate_subscription(message, contents, subscription):
+                self._run_callback(message, contents, subscription)
+
+    def handle_messages(self, messages):
+        """
+        Handles a batch of messages. Subscriptions for the whole batch are
+        fetched at once, and updates are grouped by subscription so that each
+        subscription sees its updates in order while different subscriptions
+        are processed concurrently (when ``max_workers`` is greater than 1).
+        :param messages: A list of Kafka messages
+        """
+        parsed = []
+        for message in messages:
+            contents = self._parse_message(message)
+            if contents is not None:
+                parsed.append((message, contents))
+
+        if not parsed:
+            return
+
+        with metrics.timer("snuba_query_subscriber.fetch_subscriptions"):
+            subscriptions = {
+                subscription.subscription_id: subscription
+                for subscription in QuerySubscription.objects.get_many_from_cache(
+                    set(contents["subscription_id"] for _, contents in parsed),
+                    key="subscription_id",
                 )
-                try:
-                    _delete_from_snuba(
-                        self.topic_to_dataset[message.topic()], contents["subscription_id"]
-                    )
-                except Exception:
-                    logger.exception("Failed to delete unused subscription from snuba.")
-                return
+            }
+
+        groups = OrderedDict()
+        for message, contents in parsed:
+            subscription = subscriptions.get(contents["subscription_id"])
+            if self._validate_subscription(message, contents, subscription):
+                groups.setdefault(subscription.id, (subscription, []))[1].append(
+                    (message, contents)
+                )
+
+        metrics.timing("snuba_query_subscriber.batch_size", len(parsed))
+        metrics.timing("snuba_query_subscriber.batch_subscriptions", len(groups))
 
-            if subscription.type not in subscriber_registry:
-                metrics.incr("snuba_query_subscriber.subscription_type_not_registered")
-                logger.error(
-                    "Received subscription update, but no subscription handler registered",
-                    extra={
-                        "offset": message.offset(),
-                        "partition": message.partition(),
-                        "value": message.value(),
-                    },
+        single_groups = []
+        batch_groups = OrderedDict()
+        for subscription, updates in groups.values():
+            if subscription.type in batch_subscriber_registry:
+                batch_groups.setdefault(subscription.type, []).append(
+                    (subscription, [contents for _, contents in updates])
                 )
-                return
+            else:
+                single_groups.append((subscription, updates))
 
-            logger.info(
-                "query-subscription-consumer.handle_message",
+        for subscription_type, updates in batch_groups.items():
+            with metrics.timer(
+                "snuba_query_subscriber.batch_callback.duration", instance=subscription_type
+            ):
+                batch_subscriber_registry[subscription_type](updates, self.executor)
+
+        if self.executor is None:
+            for subscription, updates in single_groups:
+                self._run_callbacks(subscription, updates)
+            return
+
+        futures = [
+            self.executor.submit(self._run_callbacks, subscription, updates)
+            for subscription, updates in single_groups
+        ]
+        # Re-raise any failure, so that the offsets for this batch are not
+        # committed.
+        for future in futures:
+            future.result()
+
+    def _run_callbacks(self, subscription, updates):
+        for message, contents in updates:
+            with sentry_sdk.push_scope() as scope:
+                scope.set_tag("query_subscription_id", contents["subscription_id"])
+                self._run_callback(message, contents, subscription)
+
+    def _parse_message(self, message):
+        """
+        Parses the message value, logging and returning None if it's invalid.
+        """
+        try:
+            with metrics.timer("snuba_query_subscriber.parse_message_value"):
+                return self.parse_message_value(message.value())
+        except InvalidMessageError:
+            # If the message is in an invalid format, just log the error
+            # and continue
+            logger.exception(
+                "Subscription update could not be parsed",
                 extra={
-                    "timestamp": contents["timestamp"],
-                    "query_subscription_id": contents["subscription_id"],
-                    "contents": contents,
                     "offset": message.offset(),
                     "partition": message.partition(),
                     "value": message.value(),
                 },
             )
 
-            callback = subscriber_registry[subscription.type]
-            with sentry_sdk.start_span(op="process_message") as span, metrics.timer(
-                "snuba_query_subscriber.callback.duration", instance=subscription.type
-            ):
-                span.set_data("payload", contents)
-                callback(contents, subscription)
+    def _validate_subscription(self, message, contents, subscription):
+        """
+        Checks that the subscription for an update exists, is active and has a
+        registered callback, recording metrics and cleaning up as needed.
+        :return: True if the update should be passed to the callback
+        """
+        if subscription is None:
+            metrics.incr("snuba_query_subscriber.subscription_doesnt_exist")
+            logger.error(
+                "Received subscription update, but subscription does not exist",
+                extra={
+                    "offset": message.offset(),
+                    "partition": message.partition(),
+                    "value": message.value(),
+                },
+            )
+            try:
+                _delete_from_snuba(
+                    self.topic_to_dataset[message.topic()], contents["subscription_id"]
+                )
+            except Exception:
+                logger.exception("Failed to delete unused subscription from snuba.")
+            return False
+
+        if subscription.status != QuerySubscription.Status.ACTIVE.value:
+            metrics.incr("snuba_query_subscriber.subscription_inactive")
+            return False
+
+        if subscription.type not in subscriber_registry:
+            metrics.incr("snuba_query_subscriber.subscription_type_not_registered")
+            logger.error(
+                "Received subscription update, but no subscription handler registered",
+                extra={
+                    "offset": message.offset(),
+                    "partition": message.partition(),
+                    "value": message.value(),
+                },
+            )
+            return False
+
+        return True
+
+    def _run_callback(self, message, contents, subscription):
+        logger.info(
+            "query-subscription-consumer.handle_message",
+            extra={
+                "timestamp": contents["timestamp"],
+                "query_subscription_id": contents["subscription_id"],
+                "contents": contents,
+                "offset": message.offset(),
+                "partition": message.partition(),
+                "value": message.value(),
+            },
+        )
+
+        callback = subscriber_registry[subscription.type]
+        with sentry_sdk.start_span(op="process_message") as span, metrics.timer(
+            "snuba_query_subscriber.callback.duration", instance=subscription.type
+        ):
+            span.set_data("payload", contents)
+            callback(contents, subscription)
 
     def parse_message_value(self, value):
         """
@@ -212,9 +212,21 @@ class TagStorage(Service):
         raise NotImplementedError
 
     def get_group_tag_value_iter(
-        self, project_id, group_id, environment_id, key, callbacks=(), offset=0
+        self,
+        project_id,
+        group_id,
+        environment_id,
+        key,
+        callbacks=(),
+        offset=0,
+        orderby="-first_seen",
+        after_value=None,
+        limit=1000,
     ):
         """
+        Passing ``after_value`` (together with ``orderby="tags_value"``) only
+        returns values sorting after it, which allows keyset pagination.
+
         >>> get_group_tag_value_iter(1, 2, 3, 'environment')
         """
         raise NotImplementedError
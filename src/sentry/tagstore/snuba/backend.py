@@ -759,7 +759,16 @@ class SnubaTagStorage(TagStorage):
         )
 
     def get_group_tag_value_iter(
-        self, project_id, group_id, environment_id, key, callbacks=(), offset=0
+        self,
+        project_id,
+        group_id,
+        environment_id,
+        key,
+        callbacks=(),
+        offset=0,
+        orderby="-first_seen",  # Closest thing to pre-existing `-id` order
+        after_value=None,
+        limit=1000,
     ):
         filters = {
             "project_id": get_project_list(project_id),
@@ -768,16 +777,20 @@ class SnubaTagStorage(TagStorage):
         }
         if environment_id:
             filters["environment"] = [environment_id]
+        conditions = []
+        if after_value is not None:
+            conditions.append(["tags_value", ">", after_value])
         results = snuba.query(
             groupby=["tags_value"],
             filter_keys=filters,
+            conditions=conditions,
             aggregations=[
                 ["count()", "", "times_seen"],
                 ["min", "timestamp", "first_seen"],
                 ["max", "timestamp", "last_seen"],
             ],
-            orderby="-first_seen",  # Closest thing to pre-existing `-id` order
-            limit=1000,
+            orderby=orderby,
+            limit=limit,
             referrer="tagstore.get_group_tag_value_iter",
             offset=offset,
         )
@@ -37,6 +37,7 @@ def clear_expired_resolutions(release_id):
         type=GroupResolution.Type.in_release,
         status=GroupResolution.Status.resolved,
     )
+    GroupResolution.clear_cache([r.group_id for r in resolution_list])
 
     for resolution in resolution_list:
         try:
@@ -3,18 +3,37 @@ from __future__ import absolute_import
 import csv
 import logging
 import six
-import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
-from django.db import transaction, IntegrityError
+from hashlib import sha1
+
+from django.core.files.base import ContentFile
+from django.db import connections, transaction, IntegrityError
 
 from sentry import tagstore
 from sentry.constants import ExportQueryType
-from sentry.models import EventUser, ExportedData, File, Group, Project, get_group_with_redirect
+from sentry.models import (
+    EventUser,
+    ExportedData,
+    File,
+    FileBlob,
+    FileBlobIndex,
+    Group,
+    Project,
+    get_group_with_redirect,
+)
+from sentry.models.file import DEFAULT_BLOB_SIZE
 from sentry.tasks.base import instrumented_task
 from sentry.utils import metrics, snuba
 from sentry.utils.sdk import capture_exception
 
 SNUBA_MAX_RESULTS = 1000
+# Number of result pages written by a single task run. After that the
+# progress is checkpointed and the export continues in a new task.
+EXPORT_PAGES_PER_TASK = 50
+# Number of times an export that failed unexpectedly after a checkpoint is
+# resumed from that checkpoint before giving up.
+MAX_CHECKPOINT_RETRIES = 3
 
 logger = logging.getLogger(__name__)
 
@@ -24,43 +43,86 @@ class DataExportError(Exception):
 
 
 @instrumented_task(name="sentry.tasks.data_export.assemble_download", queue="data_export")
-def assemble_download(data_export_id):
+def assemble_download(
+    data_export_id, file_id=None, cursor=None, bytes_written=0, retries=0, **kwargs
+):
+    """
+    Streams the export into a `File`, uploading a `FileBlob` whenever
+    ``DEFAULT_BLOB_SIZE`` bytes are buffered. Every ``EXPORT_PAGES_PER_TASK``
+    pages the written blobs and the pagination cursor are checkpointed by
+    handing them to a fresh task. If a task fails unexpectedly after a
+    checkpoint, the export is retried from that checkpoint instead of
+    restarting it (up to ``MAX_CHECKPOINT_RETRIES`` times).
+    """
     # Extract the ExportedData object
     try:
-        logger.info("dataexport.start", extra={"data_export_id": data_export_id})
+        logger.info(
+            "dataexport.start", extra={"data_export_id": data_export_id, "cursor": cursor}
+        )
         data_export = ExportedData.objects.get(id=data_export_id)
     except ExportedData.DoesNotExist as error:
         capture_exception(error)
         return
 
-    # Create a temporary file
+    file = None
     try:
-        with tempfile.TemporaryFile() as tf:
-            # Process the query based on its type
-            if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
-                file_name = process_issue_by_tag(data_export, tf)
-            elif data_export.query_type == ExportQueryType.DISCOVER:
-                file_name = process_discover(data_export, tf)
-            # Create a new File object and attach it to the ExportedData
-            tf.seek(0)
-            try:
-                with transaction.atomic():
-                    file = File.objects.create(
-                        name=file_name, type="export.csv", headers={"Content-Type": "text/csv"}
-                    )
-                    file.putfile(tf, logger=logger)
-                    data_export.finalize_upload(file=file)
-                    logger.info("dataexport.end", extra={"data_export_id": data_export_id})
-            except IntegrityError as error:
-                metrics.incr("dataexport.error", instance=six.text_type(error))
-                logger.error(
-                    "dataexport.error: {}".format(six.text_type(error)),
-                    extra={"query": data_export.payload, "org": data_export.organization_id},
-                )
-                raise DataExportError("Failed to save the assembled file")
+        # Process the query based on its type
+        if data_export.query_type == ExportQueryType.ISSUES_BY_TAG:
+            processor = IssuesByTagProcessor(data_export)
+        elif data_export.query_type == ExportQueryType.DISCOVER:
+            processor = process_discover(data_export)
+
+        if file_id is None:
+            file = File.objects.create(
+                name=processor.file_name, type="export.csv", headers={"Content-Type": "text/csv"}
+            )
+        else:
+            file = File.objects.get(id=file_id)
+            # Drop whatever a previous, interrupted run wrote past the checkpoint
+            FileBlobIndex.objects.filter(file=file, offset__gte=bytes_written).delete()
+
+        writer = ExportFileWriter(file, offset=bytes_written, logger=logger)
+        csv_writer = csv.DictWriter(writer, processor.fields)
+        if bytes_written == 0:
+            csv_writer.writeheader()
+
+        next_cursor = None
+        pages = 0
+        with snuba_error_handler():
+            for rows, next_cursor in processor.iter_pages(cursor, max_pages=EXPORT_PAGES_PER_TASK):
+                csv_writer.writerows(rows)
+                pages += 1
+        writer.flush()
+        metrics.incr("dataexport.pages", amount=pages)
+
+        if next_cursor is not None:
+            # Checkpoint: everything up to `writer.offset` is stored as blobs
+            assemble_download.delay(
+                data_export_id=data_export_id,
+                file_id=file.id,
+                cursor=next_cursor,
+                bytes_written=writer.offset,
+            )
+            return
+
+        # Finalize the File object and attach it to the ExportedData
+        try:
+            with transaction.atomic():
+                writer.finalize()
+                data_export.finalize_upload(file=file)
+                logger.info("dataexport.end", extra={"data_export_id": data_export_id})
+        except IntegrityError as error:
+            metrics.incr("dataexport.error", instance=six.text_type(error))
+            logger.error(
+                "dataexport.error: {}".format(six.text_type(error)),
+                extra={"query": data_export.payload, "org": data_export.organization_id},
+            )
+            raise DataExportError("Failed to save the assembled file")
     except DataExportError as error:
+        delete_partial_file(file)
         return data_export.email_failure(message=error)
     except NotImplementedError as error:
+        delete_partial_file(file)
         return data_export.email_failure(message=error)
     except BaseException as error:
         metrics.incr("dataexport.error", instance=six.text_type(error))
@@ -68,102 +130,200 @@ def assemble_download(data_export_id):
             "dataexport.error: {}".format(six.text_type(error)),
             extra={"query": data_export.payload, "org": data_export.organization_id},
         )
+        if file_id is not None and retries < MAX_CHECKPOINT_RETRIES:
+            # Keep the file and resume from the checkpoint this task started at
+            assemble_download.delay(
+                data_export_id=data_export_id,
+                file_id=file_id,
+                cursor=cursor,
+                bytes_written=bytes_written,
+                retries=retries + 1,
+            )
+            return
+        delete_partial_file(file)
         return data_export.email_failure(message="Internal processing failure")
 
 
-def process_issue_by_tag(data_export, file, limit=None):
+def delete_partial_file(file):
+    if file is not None and file.id is not None:
+        file.delete()
+
+
+class ExportFileWriter(object):
     """
-    Convert the tag query to a CSV, writing it to the provided file.
-    Returns the suggested file name.
+    File-like object that appends everything written to it to ``file`` as a
+    sequence of `FileBlob` objects, uploading each blob as soon as it fills
+    up. Memory use is bounded by ``blob_size``.
+    """
+
+    def __init__(self, file, offset=0, blob_size=DEFAULT_BLOB_SIZE, logger=None):
+        self.file = file
+        self.offset = offset
+        self.blob_size = blob_size
+        self.logger = logger
+        self._buffer = []
+        self._buffered = 0
+        # The checksum can only be computed on the fly if this writer sees
+        # the whole file, otherwise it is computed from the blobs at the end.
+        self._checksum = sha1(b"") if offset == 0 else None
+
+    def write(self, data):
+        if isinstance(data, six.text_type):
+            data = data.encode("utf-8")
+        self._buffer.append(data)
+        self._buffered += len(data)
+        if self._buffered >= self.blob_size:
+            self.flush()
+
+    def flush(self):
+        if not self._buffered:
+            return
+        contents = b"".join(self._buffer)
+        self._buffer = []
+        self._buffered = 0
+
+        for start in six.moves.xrange(0, len(contents), self.blob_size):
+            chunk = contents[start : start + self.blob_size]
+            blob = FileBlob.from_file(ContentFile(chunk), logger=self.logger)
+            FileBlobIndex.objects.create(file=self.file, blob=blob, offset=self.offset)
+            if self._checksum is not None:
+                self._checksum.update(chunk)
+            self.offset += len(chunk)
+        metrics.timing("dataexport.bytes-written", self.offset)
+
+    def finalize(self):
+        self.flush()
+        if self._checksum is not None:
+            checksum = self._checksum.hexdigest()
+        else:
+            checksum = sha1(b"")
+            with self.file.getfile() as f:
+                for chunk in f.chunks():
+                    checksum.update(chunk)
+            checksum = checksum.hexdigest()
+
+        self.file.size = self.offset
+        self.file.checksum = checksum
+        self.file.save()
+        metrics.timing("filestore.file-size", self.offset)
+
+
+class IssuesByTagProcessor(object):
+    """
+    Processor for exports of issues by tag, writes the values of a tag for an
+    issue as CSV rows.
     (Adapted from 'src/sentry/web/frontend/group_tag_export.py')
     """
-    # Get the pertaining project
-    try:
-        payload = data_export.query_info
-        project = Project.objects.get(id=payload["project_id"])
-    except Project.DoesNotExist as error:
-        metrics.incr("dataexport.error", instance=six.text_type(error))
-        logger.error("dataexport.error: {}".format(six.text_type(error)))
-        raise DataExportError("Requested project does not exist")
 
-    # Get the pertaining issue
-    try:
-        group, _ = get_group_with_redirect(
-            payload["group_id"], queryset=Group.objects.filter(project=project)
+    def __init__(self, data_export):
+        # Get the pertaining project
+        try:
+            payload = data_export.query_info
+            project = Project.objects.get(id=payload["project_id"])
+        except Project.DoesNotExist as error:
+            metrics.incr("dataexport.error", instance=six.text_type(error))
+            logger.error("dataexport.error: {}".format(six.text_type(error)))
+            raise DataExportError("Requested project does not exist")
+
+        # Get the pertaining issue
+        try:
+            group, _ = get_group_with_redirect(
+                payload["group_id"], queryset=Group.objects.filter(project=project)
+            )
+        except Group.DoesNotExist as error:
+            metrics.incr("dataexport.error", instance=six.text_type(error))
+            logger.error("dataexport.error: {}".format(six.text_type(error)))
+            raise DataExportError("Requested issue does not exist")
+
+        self.group = group
+
+        # Get the pertaining key
+        self.key = key = payload["key"]
+        self.lookup_key = (
+            six.text_type("sentry:{}").format(key) if tagstore.is_reserved_key(key) else key
         )
-    except Group.DoesNotExist as error:
-        metrics.incr("dataexport.error", instance=six.text_type(error))
-        logger.error("dataexport.error: {}".format(six.text_type(error)))
-        raise DataExportError("Requested issue does not exist")
 
-    # Get the pertaining key
-    key = payload["key"]
-    lookup_key = six.text_type("sentry:{}").format(key) if tagstore.is_reserved_key(key) else key
+        # Create the fields/callback lists
+        if key == "user":
+            self.callbacks = [self.attach_eventuser]
+            self.fields = [
+                "value",
+                "id",
+                "email",
+                "username",
+                "ip_address",
+                "times_seen",
+                "last_seen",
+                "first_seen",
+            ]
+        else:
+            self.callbacks = []
+            self.fields = ["value", "times_seen", "last_seen", "first_seen"]
+
+        # Example file name: Issues-by-Tag-project10-user__721.csv
+        file_details = six.text_type("{}-{}__{}").format(project.slug, key, data_export.id)
+        self.file_name = get_file_name(ExportQueryType.ISSUES_BY_TAG_STR, file_details)
 
-    # If the key is the 'user' tag, attach the event user
-    def attach_eventuser(items):
-        users = EventUser.for_tags(group.project_id, [i.value for i in items])
+    def attach_eventuser(self, items):
+        # If the key is the 'user' tag, attach the event user
+        users = EventUser.for_tags(self.group.project_id, [i.value for i in items])
         for item in items:
             item._eventuser = users.get(item.value)
 
-    # Create the fields/callback lists
-    if key == "user":
-        callbacks = [attach_eventuser]
-        fields = [
-            "value",
-            "id",
-            "email",
-            "username",
-            "ip_address",
-            "times_seen",
-            "last_seen",
-            "first_seen",
-        ]
-    else:
-        callbacks = []
-        fields = ["value", "times_seen", "last_seen", "first_seen"]
-
-    # Example file name: Issues-by-Tag-project10-user__721.csv
-    file_details = six.text_type("{}-{}__{}").format(project.slug, key, data_export.id)
-    file_name = get_file_name(ExportQueryType.ISSUES_BY_TAG_STR, file_details)
-
-    # Iterate through all the GroupTagValues
-    writer = create_writer(file, fields)
-    iteration = 0
-    with snuba_error_handler():
-        while True:
-            offset = SNUBA_MAX_RESULTS * iteration
-            next_offset = SNUBA_MAX_RESULTS * (iteration + 1)
-            gtv_list = tagstore.get_group_tag_value_iter(
-                project_id=group.project_id,
-                group_id=group.id,
-                environment_id=None,
-                key=lookup_key,
-                callbacks=callbacks,
-                offset=offset,
-            )
-            if len(gtv_list) == 0:
-                break
-            gtv_list_raw = [serialize_issue_by_tag(key, item) for item in gtv_list]
-            if limit and limit < next_offset:
-                # Since the next offset will pass the limit, write the remainder and quit
-                writer.writerows(gtv_list_raw[: limit % SNUBA_MAX_RESULTS])
-                break
-            else:
-                writer.writerows(gtv_list_raw)
-                iteration += 1
-    return file_name
+    def fetch_page(self, cursor):
+        # Keyset pagination on the tag value, so that deeper pages don't have
+        # to re-scan everything before them like an offset would. This means
+        # rows are ordered by tag value rather than by first seen.
+        return tagstore.get_group_tag_value_iter(
+            project_id=self.group.project_id,
+            group_id=self.group.id,
+            environment_id=None,
+            key=self.lookup_key,
+            orderby="tags_value",
+            after_value=cursor,
+            limit=SNUBA_MAX_RESULTS,
+        )
 
+    def prefetch_page(self, cursor):
+        # Runs on the prefetch thread. The snuba query may look up projects,
+        # which opens database connections for this thread; close them since
+        # the thread is discarded with the executor.
+        try:
+            return self.fetch_page(cursor)
+        finally:
+            connections.close_all()
 
-def process_discover(data_export, file):
-    # TODO(Leander): Implement processing for Discover
-    raise NotImplementedError("Discover processing has not been implemented yet")
+    def iter_pages(self, cursor=None, max_pages=None):
+        """
+        Yields ``(rows, next_cursor)`` for every page of results, starting
+        after ``cursor``. The following page is fetched in the background
+        while the current one is processed. ``next_cursor`` is ``None`` on
+        the last page.
+        """
+        pages = 0
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self.prefetch_page, cursor)
+            while future is not None:
+                gtv_list = future.result()
+                pages += 1
 
+                next_cursor = None
+                future = None
+                if len(gtv_list) >= SNUBA_MAX_RESULTS:
+                    next_cursor = gtv_list[-1].value
+                    if max_pages is None or pages < max_pages:
+                        future = executor.submit(self.prefetch_page, next_cursor)
 
-def create_writer(file, fields):
-    writer = csv.DictWriter(file, fields)
-    writer.writeheader()
-    return writer
+                # Callbacks may hit the database, so they run on this thread.
+                for callback in self.callbacks:
+                    callback(gtv_list)
+
+                yield [serialize_issue_by_tag(self.key, item) for item in gtv_list], next_cursor
+
+
+def process_discover(data_export):
+    # TODO(Leander): Implement processing for Discover
+    raise NotImplementedError("Discover processing has not been implemented yet")
 
 
 def get_file_name(export_type, custom_string, extension="csv"):
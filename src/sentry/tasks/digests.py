@@ -12,6 +12,11 @@ from sentry.utils import snuba
 
 logger = logging.getLogger(__name__)
 
+# The number of timelines that are delivered by a single ``deliver_digests``
+# task, allowing the backend to fetch their contents in as few round trips as
+# possible.
+DIGEST_DELIVERY_BATCH_SIZE = 20
+
 
 @instrumented_task(name="sentry.tasks.digests.schedule_digests", queue="digests.scheduling")
 def schedule_digests():
@@ -30,8 +35,15 @@ def schedule_digests():
     timeout = 300
     digests.maintenance(deadline - timeout)
 
+    batch = []
     for entry in digests.schedule(deadline):
-        deliver_digest.delay(entry.key, entry.timestamp)
+        batch.append(entry.key)
+        if len(batch) >= DIGEST_DELIVERY_BATCH_SIZE:
+            deliver_digests.delay(batch)
+            batch = []
+
+    if batch:
+        deliver_digests.delay(batch)
 
 
 @instrumented_task(name="sentry.tasks.digests.deliver_digest", queue="digests.delivery")
@@ -59,3 +71,53 @@ def deliver_digest(key, schedule_timestamp=None):
 
         if digest:
             plugin.notify_digest(project, digest)
+
+
+@instrumented_task(name="sentry.tasks.digests.deliver_digests", queue="digests.delivery")
+def deliver_digests(keys):
+    from sentry import digests
+
+    targets = {}
+    minimum_delays = {}
+    for key in keys:
+        try:
+            plugin, project = split_key(key)
+        except Project.DoesNotExist as error:
+            logger.info("Cannot deliver digest %r due to error: %s", key, error)
+            digests.delete(key)
+            continue
+
+        targets[key] = (plugin, project)
+        minimum_delays[key] = ProjectOption.objects.get_value(
+            project, get_option_key(plugin.get_conf_key(), "minimum_delay")
+        )
+
+    if not targets:
+        return
+
+    with snuba.options_override({"consistent": True}):
+        digests_to_deliver = []
+        with digests.digest_many(list(targets), minimum_delay=minimum_delays) as records:
+            for key, key_records in list(records.items()):
+                plugin, project = targets[key]
+                try:
+                    digest = build_digest(project, key_records)
+                except Exception:
+                    # Leave the timeline in the ready state so that it will be
+                    # picked up again by maintenance, rather than discarding
+                    # the records that could not be delivered.
+                    logger.exception("Failed to build digest %r", key)
+                    del records[key]
+                    continue
+
+                if digest:
+                    digests_to_deliver.append((key, plugin, project, digest))
+
+        # Notifications are sent after the timelines have been closed, as
+        # ``deliver_digest`` does, so that the locks aren't held while
+        # talking to external services.
+        for key, plugin, project, digest in digests_to_deliver:
+            try:
+                plugin.notify_digest(project, digest)
+            except Exception:
+                logger.exception("Failed to deliver digest %r", key)
@@ -2,13 +2,15 @@ from __future__ import absolute_import
 
 import logging
 
-from django.db import DataError, IntegrityError, router, transaction
+from django.db import DataError, IntegrityError, connections, router, transaction
 from django.db.models import F
 
 from sentry import eventstream
 from sentry.app import tsdb
+from sentry.cache import default_cache
 from sentry.similarity import features
 from sentry.tasks.base import instrumented_task
+from sentry.utils import metrics
 
 logger = logging.getLogger("sentry.merge")
 delete_logger = logging.getLogger("sentry.deletions.async")
@@ -31,7 +33,6 @@ def merge_groups(
     eventstream_state=None,
     **kwargs
 ):
-    # TODO(mattrobenolt): Write tests for all of this
     from sentry.models import (
         Activity,
         Group,
@@ -40,7 +41,6 @@ def merge_groups(
         GroupHash,
         GroupRuleStatus,
         GroupSubscription,
-        Environment,
         EventAttachment,
         UserReport,
         GroupRedirect,
@@ -52,10 +52,6 @@ def merge_groups(
         logger.error("group.malformed.missing_params", extra={"transaction_id": transaction_id})
         return
 
-    # Operate on one "from" group per task iteration. The task is recursed
-    # until each group has been merged.
-    from_object_id = from_object_ids[0]
-
     try:
         new_group, _ = get_group_with_redirect(to_object_id)
     except Group.DoesNotExist:
@@ -72,24 +68,20 @@ def merge_groups(
                 "transaction_id": transaction_id,
                 "new_group_id": new_group.id,
                 "old_group_ids": from_object_ids,
-                # TODO(jtcunning): figure out why these are full seq scans and/or alternative solution
-                # 'new_event_id': getattr(new_group.event_set.order_by('-id').first(), 'id', None),
-                # 'old_event_id': getattr(group.event_set.order_by('-id').first(), 'id', None),
-                # 'new_hash_id': getattr(new_group.grouphash_set.order_by('-id').first(), 'id', None),
-                # 'old_hash_id': getattr(group.grouphash_set.order_by('-id').first(), 'id', None),
             },
         )
 
-    try:
-        group = Group.objects.select_related("project").get(id=from_object_id)
-    except Group.DoesNotExist:
-        from_object_ids.remove(from_object_id)
-
+    # All "from" groups are merged in this task run. Relations are moved with
+    # one set-based update per model, and the progress is checkpointed so
+    # that a retried task skips the models that were already moved.
+    groups = list(Group.objects.select_related("project").filter(id__in=from_object_ids))
+    for from_object_id in set(from_object_ids) - set(group.id for group in groups):
         logger.warn(
             "group.malformed.invalid_id",
             extra={"transaction_id": transaction_id, "old_object_id": from_object_id},
         )
-    else:
+
+    if groups:
         model_list = tuple(EXTRA_MERGE_MODELS) + (
             Activity,
             GroupAssignee,
@@ -103,177 +95,238 @@ def merge_groups(
             GroupMeta,
         )
 
-        has_more = merge_objects(
-            model_list, group, new_group, logger=logger, transaction_id=transaction_id
-        )
+        checkpoint = MergeCheckpoint(transaction_id)
+        for model in model_list:
+            if checkpoint.is_done(model):
+                continue
+            with metrics.timer("tasks.merge.merge_objects", tags={"model": model.__name__}):
+                merge_objects_bulk(
+                    model, groups, new_group, logger=logger, transaction_id=transaction_id
+                )
+            checkpoint.mark_done(model)
 
-        if not has_more:
-            # There are no more objects to merge for *this* "from" group, remove it
-            # from the list of "from" groups that are being merged, and finish the
-            # work for this group.
-            from_object_ids.remove(from_object_id)
+        for group in groups:
+            finalize_merged_group(group, new_group, transaction_id=transaction_id)
 
-            features.merge(new_group, [group], allow_unsafe=True)
+        checkpoint.clear()
 
-            environment_ids = list(
-                Environment.objects.filter(projects=group.project).values_list("id", flat=True)
-            )
+    # All `from_object_ids` have been merged!
+    if eventstream_state:
+        eventstream.end_merge(eventstream_state)
 
-            for model in [tsdb.models.group]:
-                tsdb.merge(
-                    model,
-                    new_group.id,
-                    [group.id],
-                    environment_ids=environment_ids
-                    if model in tsdb.models_with_environment_support
-                    else None,
-                )
 
-            for model in [tsdb.models.users_affected_by_group]:
-                tsdb.merge_distinct_counts(
-                    model,
-                    new_group.id,
-                    [group.id],
-                    environment_ids=environment_ids
-                    if model in tsdb.models_with_environment_support
-                    else None,
-                )
+class MergeCheckpoint(object):
+    """
+    Records which models were already moved over by a merge, keyed by the
+    merge transaction id.
+    """
 
-            for model in [
-                tsdb.models.frequent_releases_by_group,
-                tsdb.models.frequent_environments_by_group,
-            ]:
-                tsdb.merge_frequencies(
-                    model,
-                    new_group.id,
-                    [group.id],
-                    environment_ids=environment_ids
-                    if model in tsdb.models_with_environment_support
-                    else None,
-                )
+    ttl = 60 * 60 * 24
 
-            previous_group_id = group.id
+    def __init__(self, transaction_id):
+        self.key = u"merge:progress:{}".format(transaction_id) if transaction_id else None
+        self.done = set()
+        if self.key is not None:
+            self.done.update(default_cache.get(self.key) or ())
 
-            with transaction.atomic():
-                GroupRedirect.create_for_group(group, new_group)
-                group.delete()
+    def is_done(self, model):
+        return model.__name__ in self.done
 
-            delete_logger.info(
-                "object.delete.executed",
-                extra={
-                    "object_id": previous_group_id,
-                    "transaction_id": transaction_id,
-                    "model": Group.__name__,
-                },
-            )
+    def mark_done(self, model):
+        self.done.add(model.__name__)
+        if self.key is not None:
+            default_cache.set(self.key, sorted(self.done), self.ttl)
 
-            new_group.update(
-                # TODO(dcramer): ideally these would be SQL clauses
-                first_seen=min(group.first_seen, new_group.first_seen),
-                last_seen=max(group.last_seen, new_group.last_seen),
-            )
-            try:
-                # it's possible to hit an out of range value for counters
-                new_group.update(
-                    times_seen=F("times_seen") + group.times_seen,
-                    num_comments=F("num_comments") + group.num_comments,
-                )
-            except DataError:
-                pass
-
-    if from_object_ids:
-        # This task is recursed until `from_object_ids` is empty and all
-        # "from" groups have merged into the `to_group_id`.
-        merge_groups.delay(
-            from_object_ids=from_object_ids,
-            to_object_id=to_object_id,
-            transaction_id=transaction_id,
-            recursed=True,
-            eventstream_state=eventstream_state,
+    def clear(self):
+        if self.key is not None:
+            default_cache.delete(self.key)
+
+
+def finalize_merged_group(group, new_group, transaction_id=None):
+    from sentry.models import Environment, Group, GroupRedirect
+
+    features.merge(new_group, [group], allow_unsafe=True)
+
+    environment_ids = list(
+        Environment.objects.filter(projects=group.project).values_list("id", flat=True)
+    )
+
+    for model in [tsdb.models.group]:
+        tsdb.merge(
+            model,
+            new_group.id,
+            [group.id],
+            environment_ids=environment_ids
+            if model in tsdb.models_with_environment_support
+            else None,
         )
-        return
 
-    # All `from_object_ids` have been merged!
-    if eventstream_state:
-        eventstream.end_merge(eventstream_state)
+    for model in [tsdb.models.users_affected_by_group]:
+        tsdb.merge_distinct_counts(
+            model,
+            new_group.id,
+            [group.id],
+            environment_ids=environment_ids
+            if model in tsdb.models_with_environment_support
+            else None,
+        )
 
+    for model in [
+        tsdb.models.frequent_releases_by_group,
+        tsdb.models.frequent_environments_by_group,
+    ]:
+        tsdb.merge_frequencies(
+            model,
+            new_group.id,
+            [group.id],
+            environment_ids=environment_ids
+            if model in tsdb.models_with_environment_support
+            else None,
+        )
 
-def _get_event_environment(event, project, cache):
-    from sentry.models import Environment
+    previous_group_id = group.id
 
-    environment_name = event.get_tag("environment")
+    with transaction.atomic():
+        GroupRedirect.create_for_group(group, new_group)
+        group.delete()
 
-    if environment_name not in cache:
-        try:
-            environment = Environment.get_for_organization_id(
-                project.organization_id, environment_name
-            )
-        except Environment.DoesNotExist:
-            logger.warn(
-                "event.environment.does_not_exist",
-                extra={"project_id": project.id, "environment_name": environment_name},
+    delete_logger.info(
+        "object.delete.executed",
+        extra={
+            "object_id": previous_group_id,
+            "transaction_id": transaction_id,
+            "model": Group.__name__,
+        },
+    )
+
+    new_group.update(
+        # TODO(dcramer): ideally these would be SQL clauses
+        first_seen=min(group.first_seen, new_group.first_seen),
+        last_seen=max(group.last_seen, new_group.last_seen),
+    )
+    try:
+        # it's possible to hit an out of range value for counters
+        new_group.update(
+            times_seen=F("times_seen") + group.times_seen,
+            num_comments=F("num_comments") + group.num_comments,
+        )
+    except DataError:
+        pass
+
+
+MERGE_CONFLICT_RETRIES = 3
+
+
+def get_group_unique_constraints(model, group_field):
+    """
+    Returns the columns, besides the group column, of every unique constraint
+    on ``model`` that includes the group column.
+    """
+    opts = model._meta
+    constraints = []
+    for fields in opts.unique_together:
+        if group_field in fields:
+            constraints.append([opts.get_field(f).column for f in fields if f != group_field])
+    if opts.get_field(group_field).unique:
+        constraints.append([])
+    return constraints
+
+
+def get_conflicting_ids(model, group_column, constraints, group_ids, new_group_id, project_ids):
+    """
+    Returns the ids of rows of the "from" groups that would violate a unique
+    constraint once moved to the new group. Rows of the new group always win,
+    between "from" groups the row with the lowest id is kept.
+    """
+    using = router.db_for_write(model)
+    qn = connections[using].ops.quote_name
+    table = qn(model._meta.db_table)
+    group_column = qn(group_column)
+    group_ids = tuple(group_ids)
+
+    clauses = []
+    params = []
+    for columns in constraints:
+        match = "".join(
+            " AND other.{column} = source.{column}".format(column=qn(column)) for column in columns
+        )
+        clauses.append(
+            "EXISTS (SELECT 1 FROM {table} other WHERE (other.{group} = %s OR "
+            "(other.{group} IN %s AND other.id < source.id)){match})".format(
+                table=table, group=group_column, match=match
             )
-            environment = Environment.get_or_create(project, environment_name)
-
-        cache[environment_name] = environment
-
-    return cache[environment_name]
-
-
-def merge_objects(models, group, new_group, limit=1000, logger=None, transaction_id=None):
-    has_more = False
-    for model in models:
-        all_fields = [f.name for f in model._meta.get_fields()]
-
-        # Not all models have a 'project' or 'project_id' field, but we make a best effort
-        # to filter on one if it is available.
-        # Also note that all_fields doesn't contain f.attname
-        # (django ForeignKeys have only attribute "attname" where "_id" is implicitly appended)
-        # but we still want to check for "project_id" because some models define a project_id bigint.
-        has_project = "project_id" in all_fields or "project" in all_fields
-
-        if has_project:
-            project_qs = model.objects.filter(project_id=group.project_id)
-        else:
-            project_qs = model.objects.all()
-
-        has_group = "group" in all_fields
-        if has_group:
-            queryset = project_qs.filter(group=group)
-        else:
-            queryset = project_qs.filter(group_id=group.id)
-
-        for obj in queryset[:limit]:
-            try:
-                with transaction.atomic(using=router.db_for_write(model)):
-                    if has_group:
-                        project_qs.filter(id=obj.id).update(group=new_group)
-                    else:
-                        project_qs.filter(id=obj.id).update(group_id=new_group.id)
-            except IntegrityError:
-                delete = True
-            else:
-                delete = False
-
-            if delete:
-                # Before deleting, we want to merge in counts
-                if hasattr(model, "merge_counts"):
-                    obj.merge_counts(new_group)
-
-                obj_id = obj.id
-                obj.delete()
-
-                if logger is not None:
-                    delete_logger.debug(
-                        "object.delete.executed",
-                        extra={
-                            "object_id": obj_id,
-                            "transaction_id": transaction_id,
-                            "model": model.__name__,
-                        },
+        )
+        params.extend([new_group_id, group_ids])
+
+    project_clause = ""
+    if project_ids is not None:
+        project_clause = " AND source.project_id IN %s"
+        params.append(tuple(project_ids))
+
+    sql = "SELECT source.id FROM {table} source WHERE source.{group} IN %s{project} AND ({clauses})".format(
+        table=table, group=group_column, project=project_clause, clauses=" OR ".join(clauses)
+    )
+
+    cursor = connections[using].cursor()
+    cursor.execute(sql, [group_ids] + params)
+    return [row[0] for row in cursor.fetchall()]
+
+
+def merge_objects_bulk(model, groups, new_group, logger=None, transaction_id=None):
+    """
+    Moves all rows of ``model`` that belong to any of ``groups`` over to
+    ``new_group`` with one ``UPDATE``. Rows that would violate a unique
+    constraint are merged (if the model supports it) and deleted first.
+    """
+    all_fields = [f.name for f in model._meta.get_fields()]
+    group_ids = [group.id for group in groups]
+
+    # Not all models have a 'project' or 'project_id' field, but we make a best effort
+    # to filter on one if it is available.
+    # Also note that all_fields doesn't contain f.attname
+    # (django ForeignKeys have only attribute "attname" where "_id" is implicitly appended)
+    # but we still want to check for "project_id" because some models define a project_id bigint.
+    has_project = "project_id" in all_fields or "project" in all_fields
+    project_ids = set(group.project_id for group in groups) if has_project else None
+
+    queryset = model.objects.all()
+    if has_project:
+        queryset = queryset.filter(project_id__in=project_ids)
+
+    has_group = "group" in all_fields
+    group_field = "group" if has_group else "group_id"
+    group_column = model._meta.get_field(group_field).column
+    constraints = get_group_unique_constraints(model, group_field)
+
+    for attempt in range(MERGE_CONFLICT_RETRIES):
+        try:
+            with transaction.atomic(using=router.db_for_write(model)):
+                conflicting_ids = []
+                if constraints:
+                    conflicting_ids = get_conflicting_ids(
+                        model, group_column, constraints, group_ids, new_group.id, project_ids
                     )
-            has_more = True
 
-        if has_more:
-            return True
-    return has_more
+                if conflicting_ids:
+                    if hasattr(model, "merge_counts"):
+                        for obj in model.objects.filter(id__in=conflicting_ids):
+                            obj.merge_counts(new_group)
+                    model.objects.filter(id__in=conflicting_ids).delete()
+
+                    if logger is not None:
+                        delete_logger.debug(
+                            "object.delete.executed",
+                            extra={
+                                "object_ids": conflicting_ids,
+                                "transaction_id": transaction_id,
+                                "model": model.__name__,
+                            },
+                        )
+
+                return queryset.filter(**{group_field + "__in": group_ids}).update(
+                    **{group_field: new_group if has_group else new_group.id}
+                )
+        except IntegrityError:
+            # Conflicting rows were written concurrently, find them again.
+            if attempt == MERGE_CONFLICT_RETRIES - 1:
+                raise
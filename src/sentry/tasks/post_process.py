@@ -6,7 +6,7 @@ import time
 from django.conf import settings
 
 from sentry import features
-from sentry.utils.cache import cache
+from sentry.utils.cache import cache, memoize
 from sentry.exceptions import PluginError
 from sentry.signals import event_processed
 from sentry.tasks.base import instrumented_task
@@ -114,6 +114,147 @@ def handle_owner_assignment(project, group, event):
         GroupAssignee.objects.assign(group, owner)
 
 
+class PostProcessContext(object):
+    """
+    Project level state for post processing events of one project.
+
+    The lookups are done once and shared by all events that are processed with
+    the same context, which is what makes ``post_process_group_batch`` cheaper
+    than a ``post_process_group`` task per event.
+    """
+
+    def __init__(self, project_id, batch=False):
+        from sentry.models import Project, Organization
+
+        self.project = Project.objects.get_from_cache(id=project_id)
+        self.project._organization_cache = Organization.objects.get_from_cache(
+            id=self.project.organization_id
+        )
+        self.batch = batch
+        self._groups = {}
+        self._processed_snoozes = set()
+        self._rule_statuses = {}
+
+    def get_group(self, group_id):
+        from sentry.models.group import get_group_with_redirect
+
+        group = self._groups.get(group_id)
+        if group is None:
+            group, _ = get_group_with_redirect(group_id)
+            self._groups[group_id] = group
+        return group
+
+    def process_snoozes(self, group, is_new):
+        # Snoozes are only processed for the first event of a group that is
+        # not new. If the group reappeared, later events of the batch should
+        # not report it again, and a valid snooze stays valid for the batch.
+        if is_new or group.id in self._processed_snoozes:
+            return False
+        self._processed_snoozes.add(group.id)
+        return process_snoozes(group)
+
+    def get_rule_processor(self, *args):
+        from sentry.rules.processor import RuleProcessor
+
+        if not self.batch:
+            return RuleProcessor(*args)
+        return RuleProcessor(*args, rules=self.rules, rule_statuses=self._rule_statuses)
+
+    @memoize
+    def rules(self):
+        from sentry.models import Rule
+
+        return Rule.get_for_project(self.project.id)
+
+    @memoize
+    def has_service_hooks(self):
+        return features.has("projects:servicehooks", project=self.project)
+
+    @memoize
+    def service_hooks(self):
+        return _get_service_hooks(project_id=self.project.id)
+
+    @memoize
+    def should_send_error_created_hooks(self):
+        return _should_send_error_created_hooks(self.project)
+
+    @memoize
+    def plugins(self):
+        from sentry.plugins.base import plugins
+
+        return list(plugins.for_project(self.project))
+
+
+def _post_process_event(
+    context, event, is_new, is_regression, is_new_group_environment, primary_hash=None
+):
+    from sentry.models import EventDict
+    from sentry.tasks.servicehooks import process_service_hook
+
+    # Re-bind node data to avoid renormalization. We only want to
+    # renormalize when loading old data from the database.
+    event.data = EventDict(event.data, skip_renormalization=True)
+
+    if event.group_id:
+        # Re-bind Group since we're pickling the whole Event object
+        # which may contain a stale Project.
+        event.group = context.get_group(event.group_id)
+        event.group_id = event.group.id
+
+    # Re-bind Project and Org since we're pickling the whole Event object
+    # which may contain stale parent models.
+    event.project = context.project
+
+    _capture_stats(event, is_new)
+
+    if event.group_id:
+        # we process snoozes before rules as it might create a regression
+        # but not if it's new because you can't immediately snooze a new group
+        has_reappeared = context.process_snoozes(event.group, is_new)
+
+        handle_owner_assignment(event.project, event.group, event)
+
+        rp = context.get_rule_processor(
+            event, is_new, is_regression, is_new_group_environment, has_reappeared
+        )
+        has_alert = False
+        # TODO(dcramer): ideally this would fanout, but serializing giant
+        # objects back and forth isn't super efficient
+        for callback, futures in rp.apply():
+            has_alert = True
+            safe_execute(callback, event, futures)
+
+        if context.has_service_hooks:
+            allowed_events = set(["event.created"])
+            if has_alert:
+                allowed_events.add("event.alert")
+
+            if allowed_events:
+                for servicehook_id, events in context.service_hooks:
+                    if any(e in allowed_events for e in events):
+                        process_service_hook.delay(servicehook_id=servicehook_id, event=event)
+
+        from sentry.tasks.sentry_apps import process_resource_change_bound
+
+        if event.get_event_type() == "error" and context.should_send_error_created_hooks:
+            process_resource_change_bound.delay(
+                action="created", sender="Error", instance_id=event.event_id, instance=event
+            )
+        if is_new:
+            process_resource_change_bound.delay(
+                action="created", sender="Group", instance_id=event.group_id
+            )
+
+        for plugin in context.plugins:
+            plugin_post_process_group(
+                plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
+            )
+
+    event_processed.send_robust(
+        sender=post_process_group, project=event.project, event=event, primary_hash=primary_hash
+    )
+
+
 @instrumented_task(name="sentry.tasks.post_process.post_process_group")
 def post_process_group(event, is_new, is_regression, is_new_group_environment, **kwargs):
     """
@@ -121,7 +262,7 @@ def post_process_group(event, is_new, is_regression, is_new_group_environment, *
     """
     from sentry.utils import snuba
 
-    with snuba.options_override({"consistent": True}):
+    with snuba.options_override({"consistent": True}), features.cache_scope():
         if check_event_already_post_processed(event):
             logger.info(
                 "post_process.skipped",
@@ -136,86 +277,88 @@ def post_process_group(event, is_new, is_regression, is_new_group_environment, *
         # NOTE: we must pass through the full Event object, and not an
         # event_id since the Event object may not actually have been stored
         # in the database due to sampling.
-        from sentry.models import Project, Organization, EventDict
-        from sentry.models.group import get_group_with_redirect
-        from sentry.rules.processor import RuleProcessor
-        from sentry.tasks.servicehooks import process_service_hook
-
-        # Re-bind node data to avoid renormalization. We only want to
-        # renormalize when loading old data from the database.
-        event.data = EventDict(event.data, skip_renormalization=True)
-
-        if event.group_id:
-            # Re-bind Group since we're pickling the whole Event object
-            # which may contain a stale Project.
-            event.group, _ = get_group_with_redirect(event.group_id)
-            event.group_id = event.group.id
-
         with configure_scope() as scope:
             scope.set_tag("project", event.project_id)
 
-        # Re-bind Project and Org since we're pickling the whole Event object
-        # which may contain stale parent models.
-        event.project = Project.objects.get_from_cache(id=event.project_id)
-        event.project._organization_cache = Organization.objects.get_from_cache(
-            id=event.project.organization_id
+        _post_process_event(
+            PostProcessContext(event.project_id),
+            event,
+            is_new,
+            is_regression,
+            is_new_group_environment,
+            primary_hash=kwargs.get("primary_hash"),
         )
 
-        _capture_stats(event, is_new)
 
-        if event.group_id:
-            # we process snoozes before rules as it might create a regression
-            # but not if it's new because you can't immediately snooze a new group
-            has_reappeared = False if is_new else process_snoozes(event.group)
+@instrumented_task(name="sentry.tasks.post_process.post_process_group_batch")
+def post_process_group_batch(project_id, events, **kwargs):
+    """
+    Fires post processing hooks for a batch of events of the same project.
 
-            handle_owner_assignment(event.project, event.group, event)
+    ``events`` is a list of dictionaries with the ``event_id`` and
+    ``group_id`` of each event along with the keyword arguments of
+    ``post_process_group``. Event payloads are not part of the task, they are
+    loaded from nodestore with a single request.
+    """
+    from sentry import eventstore
+    from sentry.eventstore.models import Event
+    from sentry.utils import snuba
 
-            rp = RuleProcessor(
-                event, is_new, is_regression, is_new_group_environment, has_reappeared
+    with snuba.options_override({"consistent": True}), features.cache_scope():
+        with configure_scope() as scope:
+            scope.set_tag("project", project_id)
+
+        tasks = []
+        for task_kwargs in events:
+            event = Event(
+                project_id=project_id,
+                event_id=task_kwargs["event_id"],
+                group_id=task_kwargs["group_id"],
             )
-            has_alert = False
-            # TODO(dcramer): ideally this would fanout, but serializing giant
-            # objects back and forth isn't super efficient
-            for callback, futures in rp.apply():
-                has_alert = True
-                safe_execute(callback, event, futures)
-
-            if features.has("projects:servicehooks", project=event.project):
-                allowed_events = set(["event.created"])
-                if has_alert:
-                    allowed_events.add("event.alert")
-
-                if allowed_events:
-                    for servicehook_id, events in _get_service_hooks(project_id=event.project_id):
-                        if any(e in allowed_events for e in events):
-                            process_service_hook.delay(servicehook_id=servicehook_id, event=event)
-
-            from sentry.tasks.sentry_apps import process_resource_change_bound
-
-            if event.get_event_type() == "error" and _should_send_error_created_hooks(
-                event.project
-            ):
-                process_resource_change_bound.delay(
-                    action="created", sender="Error", instance_id=event.event_id, instance=event
-                )
-            if is_new:
-                process_resource_change_bound.delay(
-                    action="created", sender="Group", instance_id=event.group_id
+            if check_event_already_post_processed(event):
+                logger.info(
+                    "post_process.skipped",
+                    extra={
+                        "project_id": project_id,
+                        "event_id": event.event_id,
+                        "reason": "duplicate",
+                    },
                 )
+                continue
+            tasks.append((event, task_kwargs))
+
+        if not tasks:
+            return
 
-            from sentry.plugins.base import plugins
+        eventstore.bind_nodes([e for e, _ in tasks], "data")
 
-            for plugin in plugins.for_project(event.project):
-                plugin_post_process_group(
-                    plugin_slug=plugin.slug, event=event, is_new=is_new, is_regresion=is_regression
-                )
+        context = PostProcessContext(project_id, batch=True)
+        metrics.timing("events.post_process.batch_size", len(tasks))
 
-        event_processed.send_robust(
-            sender=post_process_group,
-            project=event.project,
-            event=event,
-            primary_hash=kwargs.get("primary_hash"),
-        )
+        for event, task_kwargs in tasks:
+            if not event.data:
+                logger.error(
+                    "post_process.missing_event",
+                    extra={"project_id": project_id, "event_id": event.event_id},
+                )
+                continue
+
+            try:
+                _post_process_event(
+                    context,
+                    event,
+                    task_kwargs["is_new"],
+                    task_kwargs["is_regression"],
+                    task_kwargs["is_new_group_environment"],
+                    primary_hash=task_kwargs.get("primary_hash"),
+                )
+            except Exception:
+                # One broken event must not keep the rest of the batch from
+                # being processed.
+                logger.exception(
+                    "post_process.batch.failed",
+                    extra={"project_id": project_id, "event_id": event.event_id},
+                )
 
 
 def process_snoozes(group):
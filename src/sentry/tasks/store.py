@@ -21,7 +21,7 @@ from sentry.utils.safe import safe_execute
 from sentry.stacktraces.processing import process_stacktraces, should_process_for_stacktraces
 from sentry.utils.canonical import CanonicalKeyDict, CANONICAL_TYPES
 from sentry.utils.dates import to_datetime
-from sentry.utils.sdk import configure_scope
+from sentry.utils.sdk import capture_exception, configure_scope
 from sentry.models import ProjectOption, Activity, Project
 
 error_logger = logging.getLogger("sentry.errors.events")
@@ -83,7 +83,9 @@ def submit_save_event(project, cache_key, event_id, start_time, data):
     )
 
 
-def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, project):
+def _do_preprocess_event(
+    cache_key, data, start_time, event_id, process_task, project, fused=False
+):
     if cache_key and data is None:
         data = default_cache.get(cache_key)
 
@@ -105,13 +107,63 @@ def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, pr
         assert project.id == project_id, (project.id, project_id)
 
     if should_process(data):
+        if fused:
+            # The event is handed over to another worker after all, which
+            # reads it from the cache.
+            default_cache.set(cache_key, original_data, 3600)
         from_reprocessing = process_task is process_event_from_reprocessing
         submit_process(project, from_reprocessing, cache_key, event_id, start_time, original_data)
         return
 
+    if fused:
+        _do_save_event(
+            cache_key=cache_key,
+            data=original_data,
+            start_time=start_time,
+            event_id=event_id,
+            project_id=project.id,
+            fused=True,
+        )
+        return
+
     submit_save_event(project, cache_key, event_id, start_time, original_data)
 
 
+def preprocess_and_save_event(cache_key, data, start_time, event_id, project):
+    """
+    Preprocesses an event and, if it does not need to be processed, saves it
+    in the current process instead of spawning ``save_event``.
+
+    Unlike ``preprocess_event``, this expects the event data to *not* be in
+    the default cache yet: it is only written there if the event is passed on
+    to ``process_event``. Attachments are still read from the attachment cache
+    by ``cache_key``.
+
+    Errors are logged and reported instead of raised, since there is no task
+    boundary in between: a single broken event must not stop the caller.
+    """
+    assert data is not None
+    try:
+        with features.cache_scope():
+            _do_preprocess_event(
+                cache_key=cache_key,
+                data=data,
+                start_time=start_time,
+                event_id=event_id,
+                process_task=process_event,
+                project=project,
+                fused=True,
+            )
+    except Exception:
+        metrics.incr(
+            "events.failed", tags={"reason": "exception", "stage": "fused"}, skip_internal=False
+        )
+        error_logger.exception(
+            "preprocess_and_save.failed", extra={"cache_key": cache_key, "event_id": event_id}
+        )
+        capture_exception()
+
+
 @instrumented_task(
     name="sentry.tasks.store.preprocess_event",
     queue="events.preprocess_event",
@@ -121,14 +173,15 @@ def _do_preprocess_event(cache_key, data, start_time, event_id, process_task, pr
 def preprocess_event(
     cache_key=None, data=None, start_time=None, event_id=None, project=None, **kwargs
 ):
-    return _do_preprocess_event(
-        cache_key=cache_key,
-        data=data,
-        start_time=start_time,
-        event_id=event_id,
-        process_task=process_event,
-        project=project,
-    )
+    with features.cache_scope():
+        return _do_preprocess_event(
+            cache_key=cache_key,
+            data=data,
+            start_time=start_time,
+            event_id=event_id,
+            process_task=process_event,
+            project=project,
+        )
 
 
 @instrumented_task(
@@ -140,14 +193,15 @@ def preprocess_event(
 def preprocess_event_from_reprocessing(
     cache_key=None, data=None, start_time=None, event_id=None, project=None, **kwargs
 ):
-    return _do_preprocess_event(
-        cache_key=cache_key,
-        data=data,
-        start_time=start_time,
-        event_id=event_id,
-        process_task=process_event,
-        project=project,
-    )
+    with features.cache_scope():
+        return _do_preprocess_event(
+            cache_key=cache_key,
+            data=data,
+            start_time=start_time,
+            event_id=event_id,
+            process_task=process_event,
+            project=project,
+        )
 
 
 @instrumented_task(
@@ -336,9 +390,13 @@ def _do_process_event(cache_key, start_time, event_id, process_task, data=None):
     soft_time_limit=60,
 )
 def process_event(cache_key, start_time=None, event_id=None, **kwargs):
-    return _do_process_event(
-        cache_key=cache_key, start_time=start_time, event_id=event_id, process_task=process_event
-    )
+    with features.cache_scope():
+        return _do_process_event(
+            cache_key=cache_key,
+            start_time=start_time,
+            event_id=event_id,
+            process_task=process_event,
+        )
 
 
 @instrumented_task(
@@ -348,12 +406,13 @@ def process_event(cache_key, start_time=None, event_id=None, **kwargs):
     soft_time_limit=60,
 )
 def process_event_from_reprocessing(cache_key, start_time=None, event_id=None, **kwargs):
-    return _do_process_event(
-        cache_key=cache_key,
-        start_time=start_time,
-        event_id=event_id,
-        process_task=process_event_from_reprocessing,
-    )
+    with features.cache_scope():
+        return _do_process_event(
+            cache_key=cache_key,
+            start_time=start_time,
+            event_id=event_id,
+            process_task=process_event_from_reprocessing,
+        )
 
 
 def delete_raw_event(project_id, event_id, allow_hint_clear=False):
@@ -461,10 +520,19 @@ def create_failed_event(
 
 
 def _do_save_event(
-    cache_key=None, data=None, start_time=None, event_id=None, project_id=None, **kwargs
+    cache_key=None,
+    data=None,
+    start_time=None,
+    event_id=None,
+    project_id=None,
+    fused=False,
+    **kwargs
 ):
     """
     Saves an event to the database.
+
+    If ``fused`` is set, the event was preprocessed in the same process and
+    was never written to the default cache.
     """
 
     from sentry.event_manager import EventManager, HashDiscarded
@@ -476,6 +544,8 @@ def _do_save_event(
             data = default_cache.get(cache_key)
             if data is not None:
                 metric_tags["event_type"] = event_type = data.get("type") or "none"
+    elif data is not None:
+        event_type = data.get("type") or "none"
 
     with metrics.global_tags(event_type=event_type):
         if data is not None:
@@ -529,8 +599,9 @@ def _do_save_event(
 
         finally:
             if cache_key:
-                with metrics.timer("tasks.store.do_save_event.delete_cache"):
-                    default_cache.delete(cache_key)
+                if not fused:
+                    with metrics.timer("tasks.store.do_save_event.delete_cache"):
+                        default_cache.delete(cache_key)
 
                 with metrics.timer("tasks.store.do_save_event.delete_attachment_cache"):
                     # For the unlikely case that we did not manage to persist the
@@ -542,7 +613,10 @@ def _do_save_event(
 
             if start_time:
                 metrics.timing(
-                    "events.time-to-process", time() - start_time, instance=data["platform"]
+                    "events.time-to-process",
+                    time() - start_time,
+                    instance=data["platform"],
+                    tags={"pipeline": "fused" if fused else "staged"},
                 )
 
 
@@ -555,4 +629,5 @@ def _do_save_event(
 def save_event(
     cache_key=None, data=None, start_time=None, event_id=None, project_id=None, **kwargs
 ):
-    _do_save_event(cache_key, data, start_time, event_id, project_id, **kwargs)
+    with features.cache_scope():
+        _do_save_event(cache_key, data, start_time, event_id, project_id, **kwargs)
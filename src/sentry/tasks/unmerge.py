@@ -1,9 +1,10 @@
 from __future__ import absolute_import
 
 import logging
+import time
 from collections import defaultdict, OrderedDict
 
-from django.db import transaction
+from django.db import IntegrityError, transaction
 
 from sentry import eventstore, eventstream
 from sentry.app import tsdb
@@ -24,6 +25,8 @@ from sentry.models import (
 )
 from sentry.similarity import features
 from sentry.tasks.base import instrumented_task
+from sentry.utils import metrics
+from sentry.utils.dates import to_datetime
 from six.moves import reduce
 
 
@@ -47,6 +50,10 @@ def cache(function):
         else:
             raise result
 
+    def prime(key, value):
+        results[key] = (True, value)
+
+    fetch.prime = prime
     return fetch
 
 
@@ -71,6 +78,28 @@ def get_caches():
     }
 
 
+def prefetch_caches(caches, project, events):
+    """\
+    Load all environments and releases referenced by ``events`` into
+    ``caches`` with one query per model, instead of one query per key.
+    """
+    organization_id = project.organization_id
+
+    environment_names = set(get_environment_name(event) for event in events)
+    for environment in Environment.objects.filter(
+        organization_id=organization_id, name__in=environment_names
+    ):
+        caches["Environment"].prime((organization_id, environment.name), environment)
+
+    versions = set(event.get_tag("sentry:release") for event in events)
+    versions.discard(None)
+    if versions:
+        for release in Release.objects.filter(
+            organization_id=organization_id, version__in=versions
+        ):
+            caches["Release"].prime((organization_id, release.version), release)
+
+
 def merge_mappings(values):
     result = {}
     for value in values:
@@ -271,18 +300,60 @@ def collect_group_environment_data(events):
 
 
 def repair_group_environment_data(caches, project, events):
+    attributes = OrderedDict()
     for (group_id, env_name), first_release in collect_group_environment_data(events).items():
-        fields = {}
-        if first_release:
-            fields["first_release"] = caches["Release"](project.organization_id, first_release)
-
-        GroupEnvironment.objects.create_or_update(
-            environment_id=caches["Environment"](project.organization_id, env_name).id,
-            group_id=group_id,
-            defaults=fields,
-            values=fields,
+        environment_id = caches["Environment"](project.organization_id, env_name).id
+        attributes[(group_id, environment_id)] = (
+            caches["Release"](project.organization_id, first_release) if first_release else None
         )
 
+    if not attributes:
+        return
+
+    instances = {
+        (instance.group_id, instance.environment_id): instance
+        for instance in GroupEnvironment.objects.filter(
+            group_id__in=set(group_id for group_id, _ in attributes),
+            environment_id__in=set(environment_id for _, environment_id in attributes),
+        )
+    }
+
+    missing = []
+    updates = defaultdict(list)
+    for key, release in attributes.items():
+        instance = instances.get(key)
+        if instance is None:
+            group_id, environment_id = key
+            missing.append(
+                GroupEnvironment(
+                    group_id=group_id, environment_id=environment_id, first_release=release
+                )
+            )
+        elif release is not None and instance.first_release_id != release.id:
+            updates[release].append(instance.id)
+
+    if missing:
+        try:
+            with transaction.atomic():
+                GroupEnvironment.objects.bulk_create(missing)
+        except IntegrityError:
+            # Rows were created concurrently (e.g. by new events), so fall
+            # back to writing them one by one.
+            for pending in missing:
+                fields = {}
+                if pending.first_release is not None:
+                    fields["first_release"] = pending.first_release
+
+                GroupEnvironment.objects.create_or_update(
+                    environment_id=pending.environment_id,
+                    group_id=pending.group_id,
+                    defaults=fields,
+                    values=fields,
+                )
+
+    for release, ids in updates.items():
+        GroupEnvironment.objects.filter(id__in=ids).update(first_release=release)
+
 
 def collect_tag_data(events):
     results = OrderedDict()
@@ -332,18 +403,67 @@ def collect_release_data(caches, project, events):
 
 
 def repair_group_release_data(caches, project, events):
-    attributes = collect_release_data(caches, project, events).items()
-    for (group_id, environment, release_id), (first_seen, last_seen) in attributes:
-        instance, created = GroupRelease.objects.get_or_create(
+    attributes = collect_release_data(caches, project, events)
+    if not attributes:
+        return
+
+    instances = {
+        (instance.group_id, instance.environment, instance.release_id): instance
+        for instance in GroupRelease.objects.filter(
             project_id=project.id,
-            group_id=group_id,
-            environment=environment,
-            release_id=release_id,
-            defaults={"first_seen": first_seen, "last_seen": last_seen},
+            group_id__in=set(group_id for group_id, _, _ in attributes),
+            release_id__in=set(release_id for _, _, release_id in attributes),
         )
+    }
+
+    missing = []
+    updates = defaultdict(list)
+    for key, (first_seen, last_seen) in attributes.items():
+        instance = instances.get(key)
+        if instance is None:
+            group_id, environment, release_id = key
+            missing.append(
+                GroupRelease(
+                    project_id=project.id,
+                    group_id=group_id,
+                    environment=environment,
+                    release_id=release_id,
+                    first_seen=first_seen,
+                    last_seen=last_seen,
+                )
+            )
+        elif instance.first_seen != first_seen:
+            instance.first_seen = first_seen
+            updates[first_seen].append(instance.id)
+
+    if missing:
+        try:
+            with transaction.atomic():
+                GroupRelease.objects.bulk_create(missing)
+        except IntegrityError:
+            # Rows were created concurrently (e.g. by new events), so fall
+            # back to creating them one by one.
+            for pending in missing:
+                instance, created = GroupRelease.objects.get_or_create(
+                    project_id=project.id,
+                    group_id=pending.group_id,
+                    environment=pending.environment,
+                    release_id=pending.release_id,
+                    defaults={"first_seen": pending.first_seen, "last_seen": pending.last_seen},
+                )
+                if not created:
+                    instance.update(first_seen=pending.first_seen)
+                instances[(pending.group_id, pending.environment, pending.release_id)] = instance
+        else:
+            for instance in missing:
+                instances[(instance.group_id, instance.environment, instance.release_id)] = instance
 
-        if not created:
-            instance.update(first_seen=first_seen)
+    for first_seen, ids in updates.items():
+        GroupRelease.objects.filter(id__in=ids).update(first_seen=first_seen)
+
+    # Make the rows available to ``collect_tsdb_data`` without refetching them.
+    for key in attributes:
+        caches["GroupRelease"].prime(key, instances[key])
 
 
 def get_event_user_from_interface(value):
@@ -355,6 +475,15 @@ def get_event_user_from_interface(value):
     )
 
 
+def get_tsdb_timestamp(timestamp):
+    """\
+    Round ``timestamp`` down to the start of the smallest TSDB rollup. All
+    timestamps within the same interval address the same TSDB keys, so their
+    writes can be combined into one.
+    """
+    return to_datetime(tsdb.normalize_to_epoch(timestamp, min(tsdb.get_rollups())))
+
+
 def collect_tsdb_data(caches, project, events):
     counters = defaultdict(lambda: defaultdict(lambda: defaultdict(int)))
 
@@ -364,16 +493,17 @@ def collect_tsdb_data(caches, project, events):
 
     for event in events:
         environment = caches["Environment"](project.organization_id, get_environment_name(event))
+        timestamp = get_tsdb_timestamp(event.datetime)
 
-        counters[event.datetime][tsdb.models.group][(event.group_id, environment.id)] += 1
+        counters[timestamp][tsdb.models.group][(event.group_id, environment.id)] += 1
 
         user = event.data.get("user")
         if user:
-            sets[event.datetime][tsdb.models.users_affected_by_group][
+            sets[timestamp][tsdb.models.users_affected_by_group][
                 (event.group_id, environment.id)
             ].add(get_event_user_from_interface(user).tag_value)
 
-        frequencies[event.datetime][tsdb.models.frequent_environments_by_group][event.group_id][
+        frequencies[timestamp][tsdb.models.frequent_environments_by_group][event.group_id][
             environment.id
         ] += 1
 
@@ -387,7 +517,7 @@ def collect_tsdb_data(caches, project, events):
                 caches["Release"](project.organization_id, release).id,
             )
 
-            frequencies[event.datetime][tsdb.models.frequent_releases_by_group][event.group_id][
+            frequencies[timestamp][tsdb.models.frequent_releases_by_group][event.group_id][
                 grouprelease.id
             ] += 1
 
@@ -397,16 +527,27 @@ def collect_tsdb_data(caches, project, events):
 def repair_tsdb_data(caches, project, events):
     counters, sets, frequencies = collect_tsdb_data(caches, project, events)
 
+    # ``incr_multi`` accepts a timestamp and count per item, so all counters
+    # of an environment are written at once.
+    counter_items = defaultdict(list)
     for timestamp, data in counters.items():
         for model, keys in data.items():
             for (key, environment_id), value in keys.items():
-                tsdb.incr(model, key, timestamp, value, environment_id=environment_id)
+                counter_items[environment_id].append(
+                    (model, key, {"timestamp": timestamp, "count": value})
+                )
 
+    for environment_id, items in counter_items.items():
+        tsdb.incr_multi(items, environment_id=environment_id)
+
+    set_items = defaultdict(list)
     for timestamp, data in sets.items():
         for model, keys in data.items():
             for (key, environment_id), values in keys.items():
-                # TODO: This should use `record_multi` rather than `record`.
-                tsdb.record(model, key, values, timestamp, environment_id=environment_id)
+                set_items[(timestamp, environment_id)].append((model, key, values))
+
+    for (timestamp, environment_id), items in set_items.items():
+        tsdb.record_multi(items, timestamp, environment_id=environment_id)
 
     for timestamp, data in frequencies.items():
         tsdb.record_frequency_multi(data.items(), timestamp)
@@ -417,8 +558,13 @@ def repair_denormalizations(caches, project, events):
     repair_group_release_data(caches, project, events)
     repair_tsdb_data(caches, project, events)
 
+    # ``features.record`` requires all events to belong to the same group.
+    events_by_group = OrderedDict()
     for event in events:
-        features.record([event])
+        events_by_group.setdefault(event.group_id, []).append(event)
+
+    for group_events in events_by_group.values():
+        features.record(group_events)
 
 
 def lock_hashes(project_id, source_id, fingerprints):
@@ -518,6 +664,9 @@ def unmerge(
 
         return destination_id
 
+    started = time.time()
+    prefetch_caches(caches, project, events)
+
     source_events = []
     destination_events = []
 
@@ -546,6 +695,11 @@ def unmerge(
 
     repair_denormalizations(caches, project, events)
 
+    duration = time.time() - started
+    metrics.timing("unmerge.batch.events", len(events))
+    if duration > 0:
+        metrics.timing("unmerge.batch.events-per-second", len(events) / duration)
+
     unmerge.delay(
         project_id,
         source_id,
@@ -1,15 +1,22 @@
 from __future__ import absolute_import
 
+import bisect
 import fnmatch
 import ipaddress
+import re
 import six
 
 from django.utils.encoding import force_text
 
 from sentry import tsdb
+from sentry.utils.compat import functools
 from sentry.utils.safe import get_path
 from sentry.relay.utils import to_camel_case_name
 
+# The number of distinct filter settings kept compiled per process. Filter
+# settings are compiled once and reused until they change.
+COMPILED_FILTERS_CACHE_SIZE = 1000
+
 
 class FilterStatKeys(object):
     """
@@ -48,32 +55,109 @@ class FilterTypes(object):
     RELEASES = "releases"
 
 
-def is_valid_ip(project_config, ip_address):
+class _IpBlacklist(object):
     """
-    Verify that an IP address is not being blacklisted
-    for the given project.
+    A compiled list of blacklisted IP addresses and networks.
+
+    Networks are stored as merged, sorted ``(first, last)`` address intervals
+    per IP version, so that a lookup is a binary search instead of a check
+    against every network.
     """
-    blacklist = get_path(project_config.config, "filterSettings", "clientIps", "blacklistedIps")
-    if not blacklist:
-        return True
 
-    for addr in blacklist:
+    def __init__(self, blacklist):
+        self.addresses = frozenset(blacklist)
+
+        intervals = {4: [], 6: []}
+        for addr in blacklist:
+            # Check to make sure it's actually a range before
+            if "/" not in addr:
+                continue
+            try:
+                network = ipaddress.ip_network(six.text_type(addr), strict=False)
+            except ValueError:
+                # Ignore invalid values here
+                continue
+            intervals[network.version].append(
+                (int(network.network_address), int(network.broadcast_address))
+            )
+
+        self.starts = {}
+        self.ends = {}
+        for version, version_intervals in six.iteritems(intervals):
+            merged = []
+            for first, last in sorted(version_intervals):
+                if merged and first <= merged[-1][1] + 1:
+                    merged[-1][1] = max(merged[-1][1], last)
+                else:
+                    merged.append([first, last])
+            self.starts[version] = [first for first, _ in merged]
+            self.ends[version] = [last for _, last in merged]
+
+    def contains(self, ip_address):
         # We want to error fast if it's an exact match
-        if ip_address == addr:
+        if ip_address in self.addresses:
+            return True
+
+        if not self.starts[4] and not self.starts[6]:
             return False
 
-        # Check to make sure it's actually a range before
         try:
-            if "/" in addr and (
-                ipaddress.ip_address(six.text_type(ip_address))
-                in ipaddress.ip_network(six.text_type(addr), strict=False)
-            ):
-                return False
+            ip = ipaddress.ip_address(six.text_type(ip_address))
         except ValueError:
-            # Ignore invalid values here
-            pass
+            return False
+
+        value = int(ip)
+        index = bisect.bisect_right(self.starts[ip.version], value) - 1
+        return index >= 0 and value <= self.ends[ip.version][index]
+
+
+@functools.lru_cache(maxsize=COMPILED_FILTERS_CACHE_SIZE)
+def _compile_ip_blacklist(blacklist):
+    return _IpBlacklist(blacklist)
+
+
+@functools.lru_cache(maxsize=COMPILED_FILTERS_CACHE_SIZE)
+def _compile_glob_patterns(patterns):
+    """
+    Compiles case insensitive ``fnmatch`` patterns into a single regular
+    expression that matches if any of the patterns match.
+    """
+    translated = [fnmatch.translate(pattern.lower()) for pattern in patterns]
+    try:
+        return re.compile("|".join("(?:%s)" % pattern for pattern in translated))
+    except re.error:
+        pass
+
+    # Patterns come from end users and can be full of mistakes. Skip the
+    # patterns that can't be compiled, rather than all of them.
+    valid = []
+    for pattern in translated:
+        try:
+            re.compile(pattern)
+        except re.error:
+            continue
+        valid.append("(?:%s)" % pattern)
 
-    return True
+    if not valid:
+        return None
+    return re.compile("|".join(valid))
+
+
+def _matches_glob_patterns(patterns, value):
+    regex = _compile_glob_patterns(tuple(patterns))
+    return regex is not None and regex.match(force_text(value).lower()) is not None
+
+
+def is_valid_ip(project_config, ip_address):
+    """
+    Verify that an IP address is not being blacklisted
+    for the given project.
+    """
+    blacklist = get_path(project_config.config, "filterSettings", "clientIps", "blacklistedIps")
+    if not blacklist:
+        return True
+
+    return not _compile_ip_blacklist(tuple(blacklist)).contains(ip_address)
 
 
 def is_valid_release(project_config, release):
@@ -86,13 +170,7 @@ def is_valid_release(project_config, release):
     if not invalid_versions:
         return True
 
-    release = force_text(release).lower()
-
-    for version in invalid_versions:
-        if fnmatch.fnmatch(release, version.lower()):
-            return False
-
-    return True
+    return not _matches_glob_patterns(invalid_versions, release)
 
 
 def is_valid_error_message(project_config, message):
@@ -105,18 +183,7 @@ def is_valid_error_message(project_config, message):
     if not filtered_errors:
         return True
 
-    message = force_text(message).lower()
-
-    for error in filtered_errors:
-        try:
-            if fnmatch.fnmatch(message, error.lower()):
-                return False
-        except Exception:
-            # fnmatch raises a string when the pattern is bad.
-            # Patterns come from end users and can be full of mistakes.
-            pass
-
-    return True
+    return not _matches_glob_patterns(filtered_errors, message)
 
 
 def get_filter_key(flt):
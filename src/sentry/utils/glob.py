@@ -2,16 +2,153 @@ from __future__ import absolute_import
 
 import sentry_relay
 
+# The number of patterns kept by ``compile_glob`` (per cache generation).
+COMPILED_GLOB_CACHE_SIZE = 1000
+
+# The number of (pattern, value) match results remembered across all compiled
+# patterns (per cache generation). Only values up to ``MAX_CACHED_VALUE_LENGTH``
+# characters are remembered so that long values (such as messages) can't bloat
+# the cache.
+MATCH_CACHE_SIZE = 50000
+MAX_CACHED_VALUE_LENGTH = 256
+
+
+class _LRUCache(object):
+    """
+    An approximate LRU cache. Entries are added to the current generation,
+    which replaces the previous one once it is full; entries that are read
+    from the previous generation are moved to the current one.
+
+    Reads need no lock or bookkeeping, which matters as a cache lookup has to
+    be a lot cheaper than the relay call it saves. Concurrent writers may lose
+    entries, which only costs another call.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self._current = {}
+        self._previous = {}
+
+    def get(self, key):
+        rv = self._current.get(key)
+        if rv is None:
+            rv = self._previous.get(key)
+            if rv is not None:
+                self.set(key, rv)
+        return rv
+
+    def set(self, key, value):
+        current = self._current
+        if len(current) >= self.size:
+            self._previous = current
+            self._current = current = {}
+        current[key] = value
+
+    def clear(self):
+        self._current = {}
+        self._previous = {}
+
+
+_compiled_globs = _LRUCache(COMPILED_GLOB_CACHE_SIZE)
+_match_results = _LRUCache(MATCH_CACHE_SIZE)
+
+
+class CompiledGlob(object):
+    """
+    A glob pattern bound to its matching options, see ``glob_match``.
+
+    Case folding of the pattern is done once, and match results are
+    remembered in a bounded LRU since the same values (paths, modules,
+    functions) are tested against the same patterns over and over again.
+    """
+
+    __slots__ = ("pattern", "doublestar", "ignorecase", "path_normalize", "allow_newline", "_key")
+
+    def __init__(
+        self, pattern, doublestar=False, ignorecase=False, path_normalize=False, allow_newline=True
+    ):
+        self.pattern = pattern.lower() if ignorecase else pattern
+        self.doublestar = doublestar
+        self.ignorecase = ignorecase
+        self.path_normalize = path_normalize
+        self.allow_newline = allow_newline
+        self._key = (self.pattern, doublestar, ignorecase, path_normalize, allow_newline)
+
+    def __repr__(self):
+        return "<CompiledGlob %r>" % (self._key,)
+
+    def match(self, value):
+        if self.ignorecase:
+            value = value.lower()
+
+        if len(value) > MAX_CACHED_VALUE_LENGTH:
+            return self._match(value)
+
+        key = (self._key, value)
+        rv = _match_results.get(key)
+        if rv is None:
+            rv = self._match(value)
+            _match_results.set(key, rv)
+        return rv
+
+    def match_many(self, values):
+        """Matches each of ``values`` against this pattern."""
+        return [self.match(value) for value in values]
+
+    def _match(self, value):
+        return bool(
+            sentry_relay.is_glob_match(
+                value,
+                self.pattern,
+                double_star=self.doublestar,
+                case_insensitive=self.ignorecase,
+                path_normalize=self.path_normalize,
+                allow_newline=self.allow_newline,
+            )
+        )
+
+
+def compile_glob(pat, doublestar=False, ignorecase=False, path_normalize=False, allow_newline=True):
+    """Returns a (cached) ``CompiledGlob`` for the pattern and options."""
+    key = (pat, doublestar, ignorecase, path_normalize, allow_newline)
+    rv = _compiled_globs.get(key)
+    if rv is None:
+        rv = CompiledGlob(
+            pat,
+            doublestar=doublestar,
+            ignorecase=ignorecase,
+            path_normalize=path_normalize,
+            allow_newline=allow_newline,
+        )
+        _compiled_globs.set(key, rv)
+    return rv
+
 
 def glob_match(
     value, pat, doublestar=False, ignorecase=False, path_normalize=False, allow_newline=True
 ):
     """A beefed up version of fnmatch.fnmatch"""
-    return sentry_relay.is_glob_match(
-        value,
+    return compile_glob(
         pat,
-        double_star=doublestar,
-        case_insensitive=ignorecase,
+        doublestar=doublestar,
+        ignorecase=ignorecase,
         path_normalize=path_normalize,
         allow_newline=allow_newline,
-    )
+    ).match(value)
+
+
+def glob_match_many(
+    value, pats, doublestar=False, ignorecase=False, path_normalize=False, allow_newline=True
+):
+    """Matches ``value`` against each of the patterns ``pats``."""
+    return [
+        glob_match(
+            value,
+            pat,
+            doublestar=doublestar,
+            ignorecase=ignorecase,
+            path_normalize=path_normalize,
+            allow_newline=allow_newline,
+        )
+        for pat in pats
+    ]
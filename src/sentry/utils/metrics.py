@@ -5,12 +5,13 @@ __all__ = ["timing", "incr"]
 import logging
 
 import functools
+from collections import defaultdict
 from contextlib import contextmanager
 from django.conf import settings
 from random import random
 from time import time
 from threading import Thread, local
-from six.moves.queue import Queue
+from six.moves.queue import Empty, Full, Queue
 
 
 metrics_skip_all_internal = getattr(settings, "SENTRY_METRICS_SKIP_ALL_INTERNAL", False)
@@ -78,29 +79,46 @@ def _sampled_value(value, sample_rate):
 
 
 class InternalMetrics(object):
+    """
+    Records metrics in the internal TSDB model from a background thread.
+    Increments are summed per key for ``flush_interval`` seconds and then
+    written with a single ``tsdb.incr_multi`` call.
+    """
+
+    #: How long (in seconds) increments are aggregated before being written.
+    flush_interval = 1.0
+
+    #: The maximum number of increments waiting to be aggregated. Increments
+    #: beyond this are dropped, and the number of drops is reported as the
+    #: ``internal_metrics.dropped`` metric.
+    max_queue_size = 10000
+
     def __init__(self):
         self._started = False
+        self._dropped = 0
 
     def _start(self):
-        self.q = q = Queue()
+        self.q = q = Queue(maxsize=self.max_queue_size)
 
         def worker():
-            from sentry import tsdb
+            pending = defaultdict(int)
+            deadline = time() + self.flush_interval
 
             while True:
-                key, instance, tags, amount, sample_rate = q.get()
-                amount = _sampled_value(amount, sample_rate)
-                if instance:
-                    full_key = u"{}.{}".format(key, instance)
-                else:
-                    full_key = key
-                try:
-                    tsdb.incr(tsdb.models.internal, full_key, count=amount)
-                except Exception:
-                    logger = logging.getLogger("sentry.errors")
-                    logger.exception("Unable to incr internal metric")
-                finally:
-                    q.task_done()
+                timeout = deadline - time()
+                if timeout > 0:
+                    try:
+                        key, instance, tags, amount, sample_rate = q.get(timeout=timeout)
+                    except Empty:
+                        pass
+                    else:
+                        self._aggregate(pending, key, instance, amount, sample_rate)
+                        q.task_done()
+                        continue
+
+                self._flush(pending)
+                pending = defaultdict(int)
+                deadline = time() + self.flush_interval
 
         t = Thread(target=worker)
         t.setDaemon(True)
@@ -108,6 +126,36 @@ class InternalMetrics(object):
 
         self._started = True
 
+    def _aggregate(self, pending, key, instance, amount, sample_rate):
+        if instance:
+            full_key = u"{}.{}".format(key, instance)
+        else:
+            full_key = key
+        pending[full_key] += _sampled_value(amount, sample_rate)
+
+    def _flush(self, pending):
+        from sentry import tsdb
+
+        if pending:
+            try:
+                tsdb.incr_multi(
+                    [
+                        (tsdb.models.internal, full_key, {"count": amount})
+                        for full_key, amount in pending.items()
+                    ]
+                )
+            except Exception:
+                logger = logging.getLogger("sentry.errors")
+                logger.exception("Unable to incr internal metric")
+
+        dropped, self._dropped = self._dropped, 0
+        if dropped:
+            try:
+                backend.incr("internal_metrics.dropped", None, None, dropped, 1.0)
+            except Exception:
+                logger = logging.getLogger("sentry.errors")
+                logger.exception("Unable to record backend metric")
+
     def incr(
         self,
         key,
@@ -118,7 +166,10 @@ class InternalMetrics(object):
     ):
         if not self._started:
             self._start()
-        self.q.put((key, instance, tags, amount, sample_rate))
+        try:
+            self.q.put_nowait((key, instance, tags, amount, sample_rate))
+        except Full:
+            self._dropped += 1
 
 
 internal = InternalMetrics()
@@ -192,3 +192,22 @@ def bulk_delete_objects(
         )
 
     return has_more
+
+
+def bulk_delete_objects_by_id(model, ids):
+    """
+    Deletes the rows of ``model`` with the given primary keys in a single
+    statement. No Django cascades or signals are run.
+
+    Returns the number of deleted rows.
+    """
+    if not ids:
+        return 0
+
+    connection = connections[router.db_for_write(model)]
+    cursor = connection.cursor()
+    cursor.execute(
+        "delete from %s where id = any(%%s)" % (connection.ops.quote_name(model._meta.db_table),),
+        [list(ids)],
+    )
+    return cursor.rowcount
@@ -15,6 +15,7 @@ from sentry import newsletter, options
 from sentry.auth import password_validation
 from sentry.app import ratelimiter
 from sentry.constants import LANGUAGES
+from sentry.ratelimits.base import RateLimit
 from sentry.models import Organization, OrganizationStatus, User, UserOption, UserOptionValue
 from sentry.security import capture_security_activity
 from sentry.utils.auth import find_users, logger
@@ -90,30 +91,23 @@ class AuthenticationForm(forms.Form):
         return value.lower()
 
     def is_rate_limited(self):
-        if self._is_ip_rate_limited():
-            return True
-        if self._is_user_rate_limited():
-            return True
-        return False
+        limits = []
 
-    def _is_ip_rate_limited(self):
         limit = options.get("auth.ip-rate-limit")
-        if not limit:
-            return False
-
-        ip_address = self.request.META["REMOTE_ADDR"]
-        return ratelimiter.is_limited(u"auth:ip:{}".format(ip_address), limit)
+        if limit:
+            ip_address = self.request.META["REMOTE_ADDR"]
+            limits.append(RateLimit(u"auth:ip:{}".format(ip_address), limit))
 
-    def _is_user_rate_limited(self):
         limit = options.get("auth.user-rate-limit")
-        if not limit:
-            return False
-
         username = self.cleaned_data.get("username")
-        if not username:
+        if limit and username:
+            limits.append(RateLimit(u"auth:username:{}".format(username), limit))
+
+        if not limits:
             return False
 
-        return ratelimiter.is_limited(u"auth:username:{}".format(username), limit)
+        # Check both limits in a single round-trip
+        return any(result.is_limited for result in ratelimiter.check_many(limits))
 
     def clean(self):
         username = self.cleaned_data.get("username")
@@ -27,9 +27,20 @@ class InMemoryCache(object):
         assert key not in self.raw_map or raw == self.raw_map[key]
         self.data[key] = value
 
+    def set_many(self, items, timeout=None, raw=False):
+        for key, value in items:
+            self.set(key, value, timeout, raw=raw)
+
+    def get_many(self, keys, raw=False):
+        return [self.get(key, raw=raw) for key in keys]
+
     def delete(self, key):
         del self.data[key]
 
+    def delete_many(self, keys):
+        for key in keys:
+            self.delete(key)
+
 
 def test_basic_chunked():
     data = InMemoryCache()
@@ -51,6 +62,21 @@ def test_basic_chunked():
     assert not list(cache.get("c:foo"))
 
 
+def test_set_chunks():
+    data = InMemoryCache()
+    cache = BaseAttachmentCache(data)
+
+    cache.set_chunks(
+        [("c:foo", 123, 0, b"Hello World! "), ("c:foo", 123, 1, b""), ("c:foo", 123, 2, b"Bye.")]
+    )
+
+    att = CachedAttachment(key="c:foo", id=123, name="lol.txt", content_type="text/plain", chunks=3)
+    cache.set("c:foo", [att])
+
+    att2, = cache.get("c:foo")
+    assert att2.data == b"Hello World! Bye."
+
+
 def test_basic_unchunked():
     data = InMemoryCache()
     cache = BaseAttachmentCache(data)
@@ -10,6 +10,37 @@ from sentry.cache.redis import RedisClusterCache, RbCache
 from sentry.utils.imports import import_string
 
 
+class FakePipeline(object):
+    def __init__(self, client):
+        self.client = client
+        self.keys = []
+
+    def get(self, key):
+        self.keys.append(key)
+
+    def execute(self):
+        return [self.client.data.get(key) for key in self.keys]
+
+
+class FakePromise(object):
+    def __init__(self, value):
+        self.value = value
+
+
+class FakeMappingClient(object):
+    def __init__(self, client):
+        self.client = client
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def get(self, key):
+        return FakePromise(self.client.data.get(key))
+
+
 class FakeClient(object):
     def __init__(self):
         self.data = {}
@@ -17,6 +48,12 @@ class FakeClient(object):
     def get(self, key):
         return self.data[key]
 
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def map(self):
+        return FakeMappingClient(self)
+
 
 @pytest.fixture
 def mock_client():
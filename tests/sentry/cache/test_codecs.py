@@ -0,0 +1,39 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import absolute_import
+
+import pytest
+
+from sentry.cache import codecs
+
+
+VALUE = {
+    "event_id": "a" * 32,
+    "message": u"föö",
+    "tags": [["level", "error"], ["server_name", "web-1"]],
+    "extra": {"nested": {"count": 1, "ratio": 0.5, "flag": True, "missing": None}},
+}
+
+
+@pytest.mark.parametrize("codec", [codecs.JSONCodec(), codecs.CompressedMsgpackCodec()])
+def test_roundtrip(codec):
+    assert codec.decode(codec.encode(VALUE)) == VALUE
+    assert codecs.decode(codec.encode(VALUE)) == VALUE
+
+
+def test_msgpack_version_prefix():
+    codec = codecs.CompressedMsgpackCodec()
+    encoded = codec.encode(VALUE)
+    assert encoded[:1] == codec.version
+    assert len(encoded) < len(codecs.JSONCodec().encode(VALUE))
+
+
+def test_decode_legacy_json():
+    assert codecs.decode(b'{"foo":"bar"}') == {"foo": "bar"}
+    assert codecs.decode(b'"foo"') == "foo"
+
+
+def test_msgpack_preserves_byte_strings():
+    codec = codecs.CompressedMsgpackCodec()
+    value = {"data": b"\xff\xfe", "text": u"föö"}
+    assert codec.decode(codec.encode(value)) == value
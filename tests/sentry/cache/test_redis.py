@@ -23,3 +23,39 @@ class RedisCacheTest(TestCase):
 
         with self.assertRaises(ValueTooLarge):
             self.backend.set("foo", "x" * (RedisCache.max_size + 1), 0)
+
+    def test_set_many(self):
+        self.backend.set_many([("foo", {"foo": "bar"}), ("bar", [1, 2])], 50)
+
+        assert self.backend.get("foo") == {"foo": "bar"}
+        assert self.backend.get("bar") == [1, 2]
+
+        self.backend.set_many([("baz", b"raw")], 50, raw=True)
+        assert self.backend.get("baz", raw=True) == b"raw"
+
+        with self.assertRaises(ValueTooLarge):
+            self.backend.set_many([("qux", "x" * (RedisCache.max_size + 1))], 0)
+        assert self.backend.get("qux") is None
+
+    def test_codec(self):
+        backend = RedisCache(codec="sentry.cache.codecs.CompressedMsgpackCodec")
+        backend.set("foo", {"foo": u"bär"}, 50)
+
+        assert backend.get("foo", raw=True)[:1] == b"\x01"
+        assert backend.get("foo") == {"foo": u"bär"}
+
+        # Values written with either codec can be read by both backends.
+        assert self.backend.get("foo") == {"foo": u"bär"}
+        self.backend.set("bar", [1, 2], 50)
+        assert backend.get("bar") == [1, 2]
+
+    def test_get_many_delete_many(self):
+        self.backend.set_many([("foo", {"foo": "bar"}), ("bar", [1, 2])], 50)
+        self.backend.set("baz", b"raw", 50, raw=True)
+
+        assert self.backend.get_many(["foo", "missing", "bar"]) == [{"foo": "bar"}, None, [1, 2]]
+        assert self.backend.get_many(["baz"], raw=True) == [b"raw"]
+        assert self.backend.get_many([]) == []
+
+        self.backend.delete_many(["foo", "baz", "missing"])
+        assert self.backend.get_many(["foo", "bar", "baz"]) == [None, [1, 2], None]
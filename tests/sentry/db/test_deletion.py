@@ -35,6 +35,42 @@ class BulkDeleteQueryTest(TestCase):
         assert not Group.objects.filter(id=group1_2.id).exists()
         assert Group.objects.filter(id=group1_3.id).exists()
 
+    def test_id_restriction(self):
+        project = self.create_project()
+        groups = [self.create_group(project) for _ in range(4)]
+        deleted = BulkDeleteQuery(
+            model=Group, project_id=project.id, min_id=groups[1].id, max_id=groups[3].id
+        ).execute()
+        assert deleted == 2
+        assert set(Group.objects.filter(project=project).values_list("id", flat=True)) == set(
+            [groups[0].id, groups[3].id]
+        )
+
+    def test_get_id_ranges(self):
+        project = self.create_project()
+        group_ids = [self.create_group(project).id for _ in range(5)]
+        self.create_group(self.create_project())
+
+        query = BulkDeleteQuery(model=Group, project_id=project.id)
+        ranges = query.get_id_ranges(2)
+        assert len(ranges) == 2
+        assert ranges[0][0] == min(group_ids)
+        assert ranges[-1][1] == max(group_ids) + 1
+        assert ranges[0][1] == ranges[1][0]
+
+        deleted = sum(
+            BulkDeleteQuery(
+                model=Group, project_id=project.id, min_id=min_id, max_id=max_id
+            ).execute()
+            for min_id, max_id in ranges
+        )
+        assert deleted == 5
+        assert not Group.objects.filter(project=project).exists()
+
+    def test_get_id_ranges_empty(self):
+        project = self.create_project()
+        assert BulkDeleteQuery(model=Group, project_id=project.id).get_id_ranges(4) == []
+
 
 class BulkDeleteQueryIteratorTestCase(TransactionTestCase):
     def test_iteration(self):
@@ -58,3 +94,21 @@ class BulkDeleteQueryIteratorTestCase(TransactionTestCase):
             results.update(chunk)
 
         assert results == expected_group_ids
+
+    def test_iteration_same_timestamp(self):
+        last_seen = timezone.now() - timedelta(days=1)
+        expected_group_ids = [self.create_group(last_seen=last_seen).id for i in range(5)]
+
+        iterator = BulkDeleteQuery(
+            model=Group,
+            project_id=self.project.id,
+            dtfield="last_seen",
+            order_by="last_seen",
+            days=0,
+        ).iterator(chunk_size=1, batch_size=2)
+
+        results = []
+        for chunk in iterator:
+            results.extend(chunk)
+
+        assert sorted(results) == sorted(expected_group_ids)
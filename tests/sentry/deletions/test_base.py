@@ -0,0 +1,82 @@
+from __future__ import absolute_import
+
+from sentry import deletions
+from sentry.deletions import FastModelDeletionTask
+from sentry.models import Group, GroupMeta, GroupResolution, GroupSnooze
+from sentry.testutils import TestCase
+
+
+class FastModelDeletionTaskTest(TestCase):
+    def test_simple(self):
+        group = self.create_group()
+        other_group = self.create_group()
+        for i in range(5):
+            GroupMeta.objects.create(group=group, key="key%d" % i, value="value")
+        GroupMeta.objects.create(group=other_group, key="key", value="value")
+
+        task = deletions.get(
+            model=GroupMeta,
+            query={"group__project": group.project_id, "group": group.id},
+            task=FastModelDeletionTask,
+            chunk_size=2,
+            query_limit=2,
+        )
+        assert task.can_fast_delete()
+
+        chunks = 0
+        while task.chunk():
+            chunks += 1
+
+        assert chunks == 2
+        assert not GroupMeta.objects.filter(group=group).exists()
+        assert GroupMeta.objects.filter(group=other_group).exists()
+
+    def test_falls_back_with_cascades(self):
+        group = self.create_group()
+
+        task = deletions.get(model=Group, query={"id": group.id}, task=FastModelDeletionTask)
+        assert not task.can_fast_delete()
+
+        while task.chunk():
+            pass
+
+        assert not Group.objects.filter(id=group.id).exists()
+
+    def test_fallback_uses_base_chunk_size(self):
+        group = self.create_group()
+        GroupSnooze.objects.create(group=group, count=100)
+
+        task = deletions.get(
+            model=GroupSnooze,
+            query={"group__project": group.project_id},
+            task=FastModelDeletionTask,
+        )
+        # GroupSnooze invalidates caches when deleted
+        assert not task.can_fast_delete()
+        assert task.chunk_size == 100
+        assert task.query_limit == 100
+        assert task.fast_chunk_size == FastModelDeletionTask.FAST_CHUNK_SIZE
+
+        while task.chunk():
+            pass
+
+        assert not GroupSnooze.objects.filter(group=group).exists()
+
+    def test_clears_group_resolution_cache(self):
+        group = self.create_group()
+        release = self.create_release(project=self.project)
+        GroupResolution.objects.create(group=group, release=release)
+        assert GroupResolution.get_resolution_for_group(group) is not None
+
+        task = deletions.get(
+            model=GroupResolution,
+            query={"group__project": group.project_id},
+            task=FastModelDeletionTask,
+        )
+        assert task.can_fast_delete()
+
+        while task.chunk():
+            pass
+
+        assert not GroupResolution.objects.filter(group=group).exists()
+        assert GroupResolution.get_resolution_for_group(group) is None
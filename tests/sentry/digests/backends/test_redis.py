@@ -154,3 +154,45 @@ class RedisBackendTestCase(TestCase):
 
         with backend.digest("timeline", 0) as records:
             assert len(set(records)) == n
+
+    def test_schedule_batches(self):
+        backend = RedisBackend()
+
+        timelines = set(u"timeline:{}".format(i) for i in xrange(5))
+        for timeline in timelines:
+            backend.add(timeline, Record("record:1", "value", time.time()))
+            with backend.digest(timeline, 0):
+                pass
+
+        # Every ready timeline should be scheduled, even though each partition
+        # can only provide two of them per script call.
+        entries = list(backend.schedule(time.time(), batch_size=2))
+        assert set(entry.key for entry in entries) == timelines
+        assert len(entries) == len(timelines)
+
+        assert list(backend.schedule(time.time(), batch_size=2)) == []
+
+    def test_digest_many(self):
+        backend = RedisBackend()
+
+        record_1 = Record("record:1", "value", time.time())
+        backend.add("timeline:1", record_1)
+        record_2 = Record("record:2", "value", time.time())
+        backend.add("timeline:2", record_2)
+        backend.add("timeline:3", Record("record:3", "value", time.time()))
+        backend.delete("timeline:3")
+
+        with backend.digest_many(["timeline:1", "timeline:2", "timeline:3"], 0) as digests:
+            # The deleted timeline is not in the ready state, so it is skipped.
+            assert set(digests) == set(["timeline:1", "timeline:2"])
+            assert digests["timeline:1"] == [record_1]
+            assert digests["timeline:2"] == [record_2]
+
+            # Timelines removed from the mapping are not closed.
+            del digests["timeline:2"]
+
+        with backend.digest("timeline:1", 0) as records:
+            assert records == []
+
+        with backend.digest("timeline:2", 0) as records:
+            assert records == [record_2]
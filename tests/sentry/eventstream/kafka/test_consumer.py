@@ -620,3 +620,99 @@ def test_consumer_rebalance_from_uncommitted_offset(requires_kafka):
         assert (
             message is None or message.error() is KafkaError._PARTITION_EOF
         ), "there should be no more messages to receive"
+
+
+def test_consumer_consume_batch(requires_kafka):
+    synchronize_commit_group = "consumer-{}".format(uuid.uuid1().hex)
+
+    messages_delivered = defaultdict(list)
+
+    def record_message_delivered(error, message):
+        assert error is None
+        messages_delivered[message.topic()].append(message)
+
+    producer = Producer(
+        {
+            "bootstrap.servers": os.environ["SENTRY_KAFKA_HOSTS"],
+            "on_delivery": record_message_delivered,
+        }
+    )
+
+    with create_topic() as topic, create_topic() as commit_log_topic:
+
+        # Produce some messages into the topic.
+        for i in range(3):
+            producer.produce(topic, "{}".format(i).encode("utf8"))
+
+        assert producer.flush(5) == 0, "producer did not successfully flush queue"
+
+        consumer = SynchronizedConsumer(
+            bootstrap_servers=os.environ["SENTRY_KAFKA_HOSTS"],
+            consumer_group="consumer-{}".format(uuid.uuid1().hex),
+            commit_log_topic=commit_log_topic,
+            synchronize_commit_group=synchronize_commit_group,
+            initial_offset_reset="earliest",
+        )
+
+        assignments_received = []
+
+        def on_assign(c, assignment):
+            assignments_received.append(assignment)
+
+        consumer.subscribe([topic], on_assign=on_assign)
+
+        # Wait until we have received our assignments.
+        for i in xrange(10):  # this takes a while
+            assert consumer.consume(10, 1) == []
+            if assignments_received:
+                break
+
+        assert len(assignments_received) == 1, "expected to receive partition assignment"
+
+        # Move the committed offset forward past the first two messages.
+        message = messages_delivered[topic][1]
+        producer.produce(
+            commit_log_topic,
+            key="{}:{}:{}".format(
+                message.topic(), message.partition(), synchronize_commit_group
+            ).encode("utf8"),
+            value="{}".format(message.offset() + 1).encode("utf8"),
+        )
+
+        assert producer.flush(5) == 0, "producer did not successfully flush queue"
+
+        # Only the synchronized messages should be returned, even though the
+        # batch can contain the third message as well.
+        messages = []
+        for i in xrange(5):
+            messages.extend(consumer.consume(10, 1))
+            if len(messages) >= 2:
+                break
+
+        assert [m.offset() for m in messages] == [
+            m.offset() for m in messages_delivered[topic][:2]
+        ]
+
+        # We should not be able to continue reading into the topic.
+        assert consumer.consume(10, 1) == []
+
+        # Move the committed offset forward past the last message.
+        message = messages_delivered[topic][2]
+        producer.produce(
+            commit_log_topic,
+            key="{}:{}:{}".format(
+                message.topic(), message.partition(), synchronize_commit_group
+            ).encode("utf8"),
+            value="{}".format(message.offset() + 1).encode("utf8"),
+        )
+
+        assert producer.flush(5) == 0, "producer did not successfully flush queue"
+
+        # The message that was held back should be fetched again.
+        messages = []
+        for i in xrange(5):
+            messages.extend(consumer.consume(10, 1))
+            if messages:
+                break
+
+        assert [m.offset() for m in messages] == [messages_delivered[topic][2].offset()]
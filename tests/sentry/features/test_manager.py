@@ -0,0 +1,79 @@
+from __future__ import absolute_import
+
+from sentry.utils.compat.mock import Mock, patch
+
+from sentry.features import FeatureHandler, FeatureManager, OrganizationFeature
+from sentry.testutils import TestCase
+
+
+class MockFeatureHandler(FeatureHandler):
+    features = set(["organizations:enabled", "organizations:disabled"])
+
+    def __init__(self):
+        self.calls = []
+
+    def has(self, feature, actor):
+        self.calls.append((feature.name, feature.organization.id))
+        return feature.name == "organizations:enabled"
+
+
+class FeatureManagerTest(TestCase):
+    def setUp(self):
+        self.manager = FeatureManager()
+        for name in ("organizations:enabled", "organizations:disabled", "organizations:default"):
+            self.manager.add(name, OrganizationFeature)
+
+        self.handler = MockFeatureHandler()
+        self.plugin = Mock()
+        self.plugin.get_feature_hooks.return_value = [self.handler]
+
+        patcher = patch("sentry.plugins.base.plugins.all", return_value=[self.plugin])
+        self.mock_all = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_has(self):
+        org = self.create_organization()
+        with self.settings(SENTRY_FEATURES={"organizations:default": True}):
+            assert self.manager.has("organizations:enabled", org)
+            assert not self.manager.has("organizations:disabled", org)
+            assert self.manager.has("organizations:default", org)
+
+    def test_batch_has(self):
+        org = self.create_organization()
+        with self.settings(SENTRY_FEATURES={"organizations:default": True}):
+            assert self.manager.batch_has(
+                ["organizations:enabled", "organizations:disabled", "organizations:default"], org
+            ) == {
+                "organizations:enabled": True,
+                "organizations:disabled": False,
+                "organizations:default": True,
+            }
+
+        assert self.mock_all.call_count == 1
+        assert self.plugin.get_feature_hooks.call_count == 1
+
+    def test_cache_scope(self):
+        org = self.create_organization()
+        other_org = self.create_organization()
+
+        with self.manager.cache_scope():
+            assert self.manager.has("organizations:enabled", org)
+            assert self.manager.has("organizations:enabled", organization=org)
+            assert self.manager.has("organizations:enabled", org)
+            assert self.manager.has("organizations:enabled", other_org)
+
+            with self.manager.cache_scope():
+                assert self.manager.batch_has(["organizations:enabled"], org) == {
+                    "organizations:enabled": True
+                }
+
+        assert self.handler.calls == [
+            ("organizations:enabled", org.id),
+            ("organizations:enabled", org.id),
+            ("organizations:enabled", other_org.id),
+        ]
+        assert self.plugin.get_feature_hooks.call_count == 1
+
+        # results are not kept outside of the scope
+        assert self.manager.has("organizations:enabled", org)
+        assert len(self.handler.calls) == 4
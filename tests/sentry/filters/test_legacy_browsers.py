@@ -2,7 +2,11 @@ from __future__ import absolute_import
 
 from django.core.urlresolvers import reverse
 
-from sentry.message_filters import _legacy_browsers_filter, get_filter_key  # noqa
+from sentry.message_filters import (  # noqa
+    _legacy_browsers_filter,
+    _parse_user_agent,
+    get_filter_key,
+)
 from sentry.models.projectoption import ProjectOption
 from sentry.models.auditlogentry import AuditLogEntry, AuditLogEntryEvent
 from sentry.testutils import APITestCase, TestCase
@@ -389,3 +393,10 @@ class LegacyBrowsersFilterTest(TestCase):
         project_config = self._get_project_config()
         data = self.get_mock_data(USER_AGENTS["android_4"])
         assert self.apply_filter(project_config, data) is False
+
+    def test_repeated_user_agent_is_not_mutated(self):
+        project_config = self._get_project_config("1")
+        data = self.get_mock_data(USER_AGENTS["iemobile_9"])
+        assert self.apply_filter(project_config, data) is True
+        assert self.apply_filter(project_config, data) is True
+        assert _parse_user_agent(USER_AGENTS["iemobile_9"])["user_agent"]["family"] == "IE Mobile"
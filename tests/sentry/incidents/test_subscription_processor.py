@@ -10,7 +10,7 @@ import six
 from django.utils import timezone
 from exam import fixture, patcher
 from freezegun import freeze_time
-from sentry.utils.compat.mock import call, Mock
+from sentry.utils.compat.mock import call, Mock, patch
 
 from sentry.incidents.logic import (
     create_alert_rule,
@@ -33,10 +33,13 @@ from sentry.incidents.subscription_processor import (
     build_alert_rule_trigger_stat_key,
     build_trigger_stat_keys,
     get_alert_rule_stats,
+    get_alert_rule_stats_many,
     get_redis_client,
     partition,
+    process_subscription_updates,
     SubscriptionProcessor,
     update_alert_rule_stats,
+    update_alert_rule_stats_many,
 )
 from sentry.snuba.models import query_aggregation_to_snuba, QueryAggregations, QuerySubscription
 from sentry.testutils import TestCase
@@ -241,6 +244,87 @@ class ProcessUpdateTest(TestCase):
         self.send_update(self.rule, self.trigger.alert_threshold, timedelta(hours=1))
         self.metrics.incr.assert_not_called()  # NOQA
 
+    def test_process_subscription_updates(self):
+        rule = self.rule
+        rule.update(threshold_period=2)
+        trigger = self.trigger
+        process_subscription_updates(
+            [
+                (
+                    self.sub,
+                    [
+                        self.build_subscription_update(
+                            self.sub,
+                            value=trigger.alert_threshold + 1,
+                            time_delta=timedelta(minutes=-2),
+                        ),
+                        self.build_subscription_update(
+                            self.sub,
+                            value=trigger.alert_threshold + 1,
+                            time_delta=timedelta(minutes=-1),
+                        ),
+                    ],
+                ),
+                (
+                    self.other_sub,
+                    [
+                        self.build_subscription_update(
+                            self.other_sub, value=trigger.alert_threshold + 1
+                        )
+                    ],
+                ),
+            ]
+        )
+        incident = self.assert_active_incident(rule)
+        self.assert_trigger_exists_with_status(incident, trigger, TriggerStatus.ACTIVE)
+        self.assert_no_active_incident(rule, self.other_sub)
+
+        # Stats for both subscriptions are written back once the batch is done
+        processor = SubscriptionProcessor(self.sub)
+        assert processor.last_update == timezone.now().replace(microsecond=0) - timedelta(
+            minutes=1
+        )
+        self.assert_trigger_counts(processor, trigger, 0, 0)
+        other_processor = SubscriptionProcessor(self.other_sub)
+        self.assert_trigger_counts(other_processor, trigger, 1, 0)
+
+    def test_process_subscription_updates_failure(self):
+        rule = self.rule
+        rule.update(threshold_period=2)
+        trigger = self.trigger
+        updates = [
+            (
+                self.sub,
+                [self.build_subscription_update(self.sub, value=trigger.alert_threshold + 1)],
+            ),
+            (
+                self.other_sub,
+                [self.build_subscription_update(self.other_sub, value=trigger.alert_threshold + 1)],
+            ),
+        ]
+        process_update = SubscriptionProcessor.process_update
+
+        def fail_other_sub(processor, subscription_update, **kwargs):
+            process_update(processor, subscription_update, **kwargs)
+            if processor.subscription == self.other_sub:
+                raise ValueError("failed")
+
+        with patch.object(
+            SubscriptionProcessor, "process_update", autospec=True, side_effect=fail_other_sub
+        ):
+            with self.assertRaises(ValueError):
+                process_subscription_updates(updates)
+
+        # Only the stats of the successful processor are written
+        self.assert_trigger_counts(SubscriptionProcessor(self.sub), trigger, 1, 0)
+        self.assert_trigger_counts(SubscriptionProcessor(self.other_sub), trigger, 0, 0)
+
+        # When the batch is redelivered the failed update is evaluated again,
+        # while the processed one is skipped.
+        process_subscription_updates(updates)
+        self.assert_trigger_counts(SubscriptionProcessor(self.sub), trigger, 1, 0)
+        self.assert_trigger_counts(SubscriptionProcessor(self.other_sub), trigger, 1, 0)
+
     def test_no_alert(self):
         rule = self.rule
         trigger = self.trigger
@@ -740,6 +824,23 @@ class TestGetAlertRuleStats(TestCase):
         assert alert_counts == {3: 1, 4: 3}
         assert resolve_counts == {3: 2, 4: 4}
 
+    def test_many(self):
+        timestamp = datetime.now().replace(tzinfo=pytz.utc, microsecond=0)
+        update_alert_rule_stats(
+            AlertRule(id=1), QuerySubscription(project_id=2), timestamp, {3: 1}, {3: 2}
+        )
+
+        results = get_alert_rule_stats_many(
+            [
+                (AlertRule(id=1), QuerySubscription(project_id=2), [AlertRuleTrigger(id=3)]),
+                (AlertRule(id=5), QuerySubscription(project_id=2), [AlertRuleTrigger(id=6)]),
+            ]
+        )
+        assert results == [
+            (timestamp, {3: 1}, {3: 2}),
+            (datetime.fromtimestamp(0, pytz.utc), {6: 0}, {6: 0}),
+        ]
+
 
 class TestUpdateAlertRuleStats(TestCase):
     def test(self):
@@ -762,3 +863,32 @@ class TestUpdateAlertRuleStats(TestCase):
         )
 
         assert results == [int(to_timestamp(date)), 20, 10, 3, 15]
+
+    def test_many(self):
+        sub = QuerySubscription(project_id=2)
+        date = datetime.utcnow().replace(tzinfo=pytz.utc)
+        update_alert_rule_stats_many(
+            [
+                (AlertRule(id=1), sub, date, {3: 20}, {3: 10}),
+                (AlertRule(id=4), sub, date, {5: 1}, {}),
+            ]
+        )
+        client = get_redis_client()
+        results = map(
+            int,
+            client.mget(
+                [
+                    "{alert_rule:1:project:2}:last_update",
+                    "{alert_rule:1:project:2}:trigger:3:alert_triggered",
+                    "{alert_rule:1:project:2}:trigger:3:resolve_triggered",
+                ]
+            )
+            + client.mget(
+                [
+                    "{alert_rule:4:project:2}:last_update",
+                    "{alert_rule:4:project:2}:trigger:5:alert_triggered",
+                ]
+            ),
+        )
+
+        assert results == [int(to_timestamp(date)), 20, 10, int(to_timestamp(date)), 1]
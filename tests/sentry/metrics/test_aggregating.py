@@ -0,0 +1,57 @@
+from __future__ import absolute_import
+
+import os
+
+from sentry.utils.compat.mock import patch
+
+from sentry.metrics.aggregating import AggregatingMetricsBackend
+from sentry.metrics.logging import LoggingBackend
+from sentry.testutils import TestCase
+
+
+class AggregatingMetricsBackendTest(TestCase):
+    def setUp(self):
+        self.backend = AggregatingMetricsBackend("sentry.metrics.logging.LoggingBackend")
+        # Don't start the flusher thread, metrics are flushed explicitly.
+        self.backend._pid = os.getpid()
+
+    def test_incr(self):
+        self.backend.incr("foo", instance="bar")
+        self.backend.incr("foo", instance="bar", amount=2)
+        self.backend.incr("foo", instance="bar", tags={"a": "b"})
+
+        with patch.object(LoggingBackend, "incr") as mock_incr, patch(
+            "sentry.metrics.aggregating.random", return_value=0.0
+        ):
+            self.backend.incr("baz", sample_rate=0.5)
+            self.backend.flush()
+
+        assert sorted(
+            (key, instance, sorted(tags.items()), amount, sample_rate)
+            for key, instance, tags, amount, sample_rate in (
+                call[0] for call in mock_incr.call_args_list
+            )
+        ) == [
+            ("baz", None, [], 2, 1),
+            ("foo", "bar", [], 3, 1),
+            ("foo", "bar", [("a", "b")], 1, 1),
+        ]
+
+    def test_timing(self):
+        for value in (1.0, 1.01, 1.02, 5.0):
+            self.backend.timing("foo", value)
+
+        with patch.object(LoggingBackend, "weighted_timing") as mock_timing:
+            self.backend.flush()
+
+        calls = sorted(call[0] for call in mock_timing.call_args_list)
+        assert len(calls) == 2
+        key, value, weight, instance, tags = calls[0]
+        assert (key, weight, instance, tags) == ("foo", 3, None, {})
+        assert abs(value - 1.01) < 1e-9
+        assert calls[1] == ("foo", 5.0, 1, None, {})
+
+    def test_flush_empty(self):
+        with patch.object(LoggingBackend, "batch") as mock_batch:
+            self.backend.flush()
+        assert not mock_batch.called
@@ -0,0 +1,23 @@
+from __future__ import absolute_import
+
+from datadog import statsd
+
+from sentry.utils.compat.mock import patch
+
+from sentry.metrics.dogstatsd import DogStatsdMetricsBackend
+from sentry.testutils import TestCase
+
+
+class DogStatsdMetricsBackendTest(TestCase):
+    def setUp(self):
+        self.backend = DogStatsdMetricsBackend(prefix="sentrytest.")
+
+    @patch.object(statsd, "_send")
+    def test_timing(self, mock_send):
+        self.backend.timing("foo", 30, instance="bar")
+        mock_send.assert_called_once_with("sentrytest.foo:30|ms|#instance:bar")
+
+    @patch.object(statsd, "_send")
+    def test_weighted_timing(self, mock_send):
+        self.backend.weighted_timing("foo", 0.0123, 4, instance="bar")
+        mock_send.assert_called_once_with("sentrytest.foo:0.0123|ms|@0.25|#instance:bar")
@@ -19,3 +19,21 @@ class StatsdMetricsBackendTest(TestCase):
     def test_timing(self, mock_timing):
         self.backend.timing("foo", 30)
         mock_timing.assert_called_once_with("sentrytest.foo", 30, 1)
+
+    @patch("statsd.StatsClient._send")
+    def test_weighted_timing(self, mock_send):
+        self.backend.weighted_timing("foo", 30, 4)
+        mock_send.assert_called_once_with("sentrytest.foo:30.000000|ms|@0.25")
+
+    @patch("statsd.StatsClient._send")
+    def test_weighted_timing_float(self, mock_send):
+        self.backend.weighted_timing("foo", 0.0123, 4)
+        mock_send.assert_called_once_with("sentrytest.foo:0.012300|ms|@0.25")
+
+    @patch("statsd.StatsClient._send")
+    def test_batch(self, mock_send):
+        with self.backend.batch():
+            self.backend.incr("foo")
+            self.backend.timing("foo", 30)
+            assert not mock_send.called
+        mock_send.assert_called_once_with("sentrytest.foo:1|c\nsentrytest.foo:30|ms")
@@ -5,8 +5,10 @@ import os
 from django.core.files.base import ContentFile
 
 from sentry.models import File, FileBlob
+from sentry.models.file import PREFETCH_RANGE
 from sentry.testutils import TestCase
 from sentry.utils.compat import map
+from sentry.utils.compat.mock import patch
 
 
 class FileBlobTest(TestCase):
@@ -75,6 +77,31 @@ class FileTest(TestCase):
         with self.assertRaises(ValueError):
             fp.read()
 
+    def test_putfile_deduplicates_blobs(self):
+        existing = FileBlob.from_file(ContentFile(b"abc"))
+
+        file = File.objects.create(name="baz.js", type="default")
+        results = file.putfile(ContentFile(b"abcabcxyzabc"), 3)
+
+        assert [r.offset for r in results] == [0, 3, 6, 9]
+        blob_ids = [r.blob_id for r in results]
+        assert blob_ids == [existing.id, existing.id, blob_ids[2], existing.id]
+        assert blob_ids[2] != existing.id
+        assert FileBlob.objects.count() == 2
+        assert file.size == 12
+        assert file.getfile().read() == b"abcabcxyzabc"
+
+    @patch("sentry.models.file.PUTFILE_WINDOW", 2)
+    def test_putfile_windows(self):
+        random_data = os.urandom(1 << 12)
+
+        file = File.objects.create(name="test.bin", type="default")
+        results = file.putfile(ContentFile(random_data), 1 << 9)
+
+        assert len(results) == 8
+        assert [r.offset for r in results] == list(range(0, 1 << 12, 1 << 9))
+        assert file.getfile().read() == random_data
+
     def test_multi_chunk_prefetch(self):
         random_data = os.urandom(1 << 25)
 
@@ -84,3 +111,25 @@ class FileTest(TestCase):
 
         f = file.getfile(prefetch=True)
         assert f.read() == random_data
+
+    def test_range_prefetch(self):
+        random_data = os.urandom(1 << 16)
+
+        fileobj = ContentFile(random_data)
+        file = File.objects.create(name="test.bin", type="default", size=len(random_data))
+        file.putfile(fileobj, 1 << 12)
+
+        with file.getfile(prefetch=PREFETCH_RANGE) as f:
+            f.seek(5000)
+            assert f.read(10000) == random_data[5000:15000]
+            assert f.tell() == 15000
+            f.seek(100)
+            assert f.read(1) == random_data[100:101]
+            f.seek(-10, os.SEEK_END)
+            assert f.read() == random_data[-10:]
+            assert f.read() == b""
+            f.seek(0)
+            assert f.read() == random_data
+
+        with self.assertRaises(ValueError):
+            f.read()
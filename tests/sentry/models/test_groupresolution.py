@@ -3,10 +3,13 @@
 from __future__ import absolute_import, print_function
 
 from datetime import timedelta
+from django.db import transaction
 from django.utils import timezone
 
 from sentry.models import GroupResolution
 from sentry.testutils import TestCase
+from sentry.utils.cache import cache
+from sentry.utils.compat.mock import patch
 
 
 class GroupResolutionTest(TestCase):
@@ -61,3 +64,53 @@ class GroupResolutionTest(TestCase):
 
     def test_no_release_with_no_resolution(self):
         assert not GroupResolution.has_resolution(self.group, None)
+
+    def test_resolution_is_cached(self):
+        GroupResolution.objects.create(
+            release=self.old_release, group=self.group, type=GroupResolution.Type.in_release
+        )
+        assert not GroupResolution.has_resolution(self.group, self.new_release)
+
+        with self.assertNumQueries(0):
+            assert not GroupResolution.has_resolution(self.group, self.new_release)
+            assert GroupResolution.get_resolution_for_group(self.group) == (
+                GroupResolution.Type.in_release,
+                self.old_release.id,
+                self.old_release.date_added,
+            )
+
+    def test_no_resolution_is_cached(self):
+        assert not GroupResolution.has_resolution(self.group, self.new_release)
+
+        with self.assertNumQueries(0):
+            assert not GroupResolution.has_resolution(self.group, self.new_release)
+
+    def test_cache_is_cleared_on_change(self):
+        assert not GroupResolution.has_resolution(self.group, self.old_release)
+
+        resolution = GroupResolution.objects.create(
+            release=self.new_release, group=self.group, type=GroupResolution.Type.in_release
+        )
+        assert GroupResolution.has_resolution(self.group, self.old_release)
+
+        resolution.update(release=self.old_release)
+        assert not GroupResolution.has_resolution(self.group, self.new_release)
+
+        resolution.delete()
+        assert GroupResolution.get_resolution_for_group(self.group) is None
+
+    def test_cache_is_cleared_on_commit(self):
+        with patch("sentry.models.groupresolution.transaction.on_commit") as on_commit:
+            with transaction.atomic():
+                GroupResolution.objects.create(
+                    release=self.new_release, group=self.group, type=GroupResolution.Type.in_release
+                )
+                # a concurrent read caching the state before the commit
+                cache.set(GroupResolution.get_cache_key(self.group.id), False, 3600)
+
+        assert on_commit.call_count == 1
+        assert not GroupResolution.has_resolution(self.group, self.old_release)
+
+        callback = on_commit.call_args[0][0]
+        callback()
+        assert GroupResolution.has_resolution(self.group, self.old_release)
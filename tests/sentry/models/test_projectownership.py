@@ -3,7 +3,7 @@ from __future__ import absolute_import
 from sentry.testutils import TestCase
 from sentry.api.fields.actor import Actor
 from sentry.models import ProjectOwnership, User, Team
-from sentry.models.projectownership import resolve_actors
+from sentry.models.projectownership import get_compiled_schema, resolve_actors
 from sentry.ownership.grammar import Rule, Owner, Matcher, dump_schema
 from sentry.utils.cache import cache
 
@@ -79,6 +79,20 @@ class ProjectOwnershipTestCase(TestCase):
             ([Actor(self.team.id, Team), Actor(self.user.id, User)], [rule_a, rule_b]),
         )
 
+    def test_get_compiled_schema(self):
+        rule_a = Rule(Matcher("path", "*.py"), [Owner("team", self.team.slug)])
+        rule_b = Rule(Matcher("path", "src/*"), [Owner("user", self.user.email)])
+
+        compiled = get_compiled_schema(self.project.id, dump_schema([rule_a]))
+        assert compiled.rules == [rule_a]
+        assert get_compiled_schema(self.project.id, dump_schema([rule_a])) is compiled
+
+        # A changed schema is compiled again.
+        assert get_compiled_schema(self.project.id, dump_schema([rule_a, rule_b])).rules == [
+            rule_a,
+            rule_b,
+        ]
+
 
 class ResolveActorsTestCase(TestCase):
     def test_no_actors(self):
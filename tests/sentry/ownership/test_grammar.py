@@ -1,6 +1,14 @@
 from __future__ import absolute_import
 
-from sentry.ownership.grammar import Rule, Matcher, Owner, parse_rules, dump_schema, load_schema
+from sentry.ownership.grammar import (
+    Rule,
+    Matcher,
+    Owner,
+    parse_rules,
+    dump_schema,
+    load_schema,
+    compile_schema,
+)
 
 fixture_data = """
 # cool stuff comment
@@ -102,3 +110,25 @@ def test_matcher_test_stacktrace():
     assert not Matcher("path", "*.jsx").test(data)
     assert not Matcher("url", "*.py").test(data)
     assert not Matcher("path", "*.py").test({})
+
+
+def test_compiled_schema():
+    rules = parse_rules(fixture_data) + [
+        Rule(Matcher("path", "*.js"), [Owner("team", "other")]),
+        Rule(Matcher("path", "*.py"), [Owner("team", "python")]),
+    ]
+    compiled = compile_schema(dump_schema(rules))
+
+    data = {
+        "request": {"url": "http://google.com/foo"},
+        "stacktrace": {
+            "frames": [
+                {"filename": "src/sentry/app.js"},
+                {"abs_path": "src/sentry/app.js"},
+                {"filename": None},
+            ]
+        },
+    }
+    assert compiled.get_matching_rules(data) == [rule for rule in rules if rule.test(data)]
+    assert compiled.get_matching_rules(data) == [rules[0], rules[1], rules[2], rules[3]]
+    assert compiled.get_matching_rules({}) == []
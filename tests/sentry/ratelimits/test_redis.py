@@ -2,7 +2,9 @@
 
 from __future__ import absolute_import
 
+from sentry.ratelimits.base import RateLimit
 from sentry.ratelimits.redis import RedisRateLimiter
+from sentry.utils.compat import mock
 from sentry.testutils import TestCase
 
 
@@ -17,3 +19,33 @@ class RedisRateLimiterTest(TestCase):
     def test_simple_key(self):
         assert not self.backend.is_limited("foo", 1)
         assert self.backend.is_limited("foo", 1)
+
+    def test_check_many(self):
+        limits = [RateLimit("foo", 2), RateLimit("bar", 1, project=self.project)]
+
+        results = self.backend.check_many(limits)
+        assert [r.is_limited for r in results] == [False, False]
+        assert [r.remaining for r in results] == [1, 0]
+
+        # "bar" is exhausted, so the request isn't counted against "foo"
+        results = self.backend.check_many(limits)
+        assert [r.is_limited for r in results] == [False, True]
+        assert [r.remaining for r in results] == [1, 0]
+
+        assert not self.backend.is_limited("foo", 2)
+        assert self.backend.is_limited("foo", 2)
+
+    def test_sliding_window(self):
+        with mock.patch("sentry.ratelimits.redis.time", return_value=1005.0):
+            assert not self.backend.is_limited("foo", 2, window=10)
+            assert not self.backend.is_limited("foo", 2, window=10)
+            assert self.backend.is_limited("foo", 2, window=10)
+
+        # Half of the previous window still overlaps with the sliding window,
+        # so one of the two previous requests is still counted.
+        with mock.patch("sentry.ratelimits.redis.time", return_value=1015.0):
+            result = self.backend.check_many([RateLimit("foo", 2, window=10)])[0]
+            assert not result.is_limited
+            assert result.remaining == 0
+            assert result.reset == 1030
+            assert self.backend.is_limited("foo", 2, window=10)
@@ -3,12 +3,14 @@
 from __future__ import absolute_import
 
 from datetime import timedelta
+from django.core.cache import cache
 from django.utils import timezone
 
 from sentry.models import GroupRuleStatus, Rule
 from sentry.plugins.base import plugins
 from sentry.testutils import TestCase
 from sentry.rules.processor import RuleProcessor
+from sentry.utils.compat.mock import patch
 
 
 class RuleProcessorTest(TestCase):
@@ -50,3 +52,92 @@ class RuleProcessorTest(TestCase):
 
         results = list(rp.apply())
         assert len(results) == 1
+
+    def test_shared_rule_statuses(self):
+        event = self.store_event(data={}, project_id=self.project.id)
+        action_data = {"id": "sentry.rules.actions.notify_event.NotifyEventAction"}
+        condition_data = {"id": "sentry.rules.conditions.every_event.EveryEventCondition"}
+
+        Rule.objects.filter(project=event.project).delete()
+        rule = Rule.objects.create(
+            project=event.project, data={"conditions": [condition_data], "actions": [action_data]}
+        )
+
+        rules = [rule]
+        rule_statuses = {}
+
+        def apply():
+            rp = RuleProcessor(
+                event,
+                is_new=True,
+                is_regression=True,
+                is_new_group_environment=True,
+                has_reappeared=True,
+                rules=rules,
+                rule_statuses=rule_statuses,
+            )
+            return list(rp.apply())
+
+        assert len(apply()) == 1
+        assert rule_statuses[(event.group_id, rule.id)].last_active is not None
+
+        # the shared status is used instead of querying again
+        with self.assertNumQueries(0):
+            assert len(apply()) == 0
+
+    @patch("sentry.rules.conditions.event_frequency.EventFrequencyCondition.passes")
+    def test_cheap_conditions_first(self, mock_passes):
+        event = self.store_event(data={}, project_id=self.project.id)
+        frequency_data = {
+            "id": "sentry.rules.conditions.event_frequency.EventFrequencyCondition",
+            "value": 100,
+            "interval": "1h",
+        }
+        first_seen_data = {"id": "sentry.rules.conditions.first_seen_event.FirstSeenEventCondition"}
+
+        Rule.objects.filter(project=event.project).delete()
+        Rule.objects.create(
+            project=event.project,
+            data={"action_match": "all", "conditions": [frequency_data, first_seen_data]},
+        )
+
+        rp = RuleProcessor(
+            event,
+            is_new=False,
+            is_regression=False,
+            is_new_group_environment=False,
+            has_reappeared=False,
+        )
+        assert list(rp.apply()) == []
+        assert rp.conditions_evaluated == 1
+        assert not mock_passes.called
+
+    def test_get_rule_statuses(self):
+        event = self.store_event(data={}, project_id=self.project.id)
+        condition_data = {"id": "sentry.rules.conditions.every_event.EveryEventCondition"}
+
+        Rule.objects.filter(project=event.project).delete()
+        rule_list = [
+            Rule.objects.create(project=event.project, data={"conditions": [condition_data]})
+            for _ in range(3)
+        ]
+
+        rp = RuleProcessor(
+            event,
+            is_new=True,
+            is_regression=False,
+            is_new_group_environment=True,
+            has_reappeared=False,
+        )
+        statuses = rp.get_rule_statuses(rule_list)
+        assert sorted(statuses) == sorted(rule.id for rule in rule_list)
+        assert GroupRuleStatus.objects.filter(group=event.group).count() == 3
+
+        # cached statuses
+        with self.assertNumQueries(0):
+            assert rp.get_rule_statuses(rule_list) == statuses
+
+        # existing statuses are loaded with a single query
+        cache.clear()
+        with self.assertNumQueries(1):
+            assert rp.get_rule_statuses(rule_list) == statuses
@@ -6,6 +6,7 @@ from copy import deepcopy
 
 import mock
 import six
+from concurrent.futures import ThreadPoolExecutor
 import pytz
 from dateutil.parser import parse as parse_date
 from django.conf import settings
@@ -16,7 +17,9 @@ from sentry.snuba.models import QueryDatasets, QuerySubscription
 from sentry.snuba.query_subscription_consumer import (
     InvalidMessageError,
     InvalidSchemaError,
+    batch_subscriber_registry,
     QuerySubscriptionConsumer,
+    register_batch_subscriber,
     register_subscriber,
     subscriber_registry,
 )
@@ -110,6 +113,99 @@ class HandleMessageTest(BaseQuerySubscriptionTest, TestCase):
         mock_callback.assert_called_once_with(data["payload"], sub)
 
 
+class HandleMessagesTest(BaseQuerySubscriptionTest, TestCase):
+    metrics = patcher("sentry.snuba.query_subscription_consumer.metrics")
+
+    def create_subscription(self, subscription_id, type):
+        return QuerySubscription.objects.create(
+            project=self.project,
+            type=type,
+            subscription_id=subscription_id,
+            dataset="something",
+            query="hello",
+            aggregation=0,
+            time_window=1,
+            resolution=1,
+        )
+
+    def build_update_message(self, subscription_id, value):
+        data = deepcopy(self.valid_wrapper)
+        data["payload"]["subscription_id"] = subscription_id
+        data["payload"]["values"]["data"][0]["hello"] = value
+        return self.build_mock_message(data, topic=settings.KAFKA_EVENTS_SUBSCRIPTIONS_RESULTS)
+
+    def tearDown(self):
+        subscriber_registry.pop("registered_batch_test", None)
+        batch_subscriber_registry.pop("registered_batch_test", None)
+        super(HandleMessagesTest, self).tearDown()
+
+    def run_batch(self, consumer):
+        registration_key = "registered_batch_test"
+        calls = []
+        register_subscriber(registration_key)(
+            lambda contents, subscription: calls.append(
+                (subscription.id, contents["values"]["data"][0]["hello"])
+            )
+        )
+        sub_1 = self.create_subscription("sub_1", registration_key)
+        sub_2 = self.create_subscription("sub_2", registration_key)
+
+        with mock.patch("sentry.snuba.tasks._snuba_pool") as pool:
+            pool.urlopen.return_value.status = 202
+            consumer.handle_messages(
+                [
+                    self.build_update_message("sub_1", 1),
+                    self.build_update_message("sub_2", 2),
+                    self.build_update_message("missing", 3),
+                    self.build_update_message("sub_1", 4),
+                ]
+            )
+
+        assert sorted(calls) == [(sub_1.id, 1), (sub_1.id, 4), (sub_2.id, 2)]
+        # Updates for the same subscription are processed in order
+        assert [value for sub_id, value in calls if sub_id == sub_1.id] == [1, 4]
+        self.metrics.incr.assert_called_once_with(
+            "snuba_query_subscriber.subscription_doesnt_exist"
+        )
+
+    def test_serial(self):
+        self.run_batch(QuerySubscriptionConsumer("hello", batch_size=10))
+
+    def test_batch_subscriber(self):
+        registration_key = "registered_batch_test"
+        register_subscriber(registration_key)(Mock())
+        batch_callback = Mock()
+        register_batch_subscriber(registration_key)(batch_callback)
+        sub_1 = self.create_subscription("sub_1", registration_key)
+        sub_2 = self.create_subscription("sub_2", registration_key)
+
+        consumer = QuerySubscriptionConsumer("hello", batch_size=10)
+        consumer.handle_messages(
+            [
+                self.build_update_message("sub_1", 1),
+                self.build_update_message("sub_2", 2),
+                self.build_update_message("sub_1", 3),
+            ]
+        )
+
+        assert batch_callback.call_count == 1
+        updates, executor = batch_callback.call_args[0]
+        assert executor is None
+        assert [
+            (sub, [contents["values"]["data"][0]["hello"] for contents in sub_updates])
+            for sub, sub_updates in updates
+        ] == [(sub_1, [1, 3]), (sub_2, [2])]
+        assert not subscriber_registry[registration_key].called
+
+    def test_parallel(self):
+        consumer = QuerySubscriptionConsumer("hello", batch_size=10, max_workers=2)
+        consumer.executor = ThreadPoolExecutor(max_workers=2)
+        try:
+            self.run_batch(consumer)
+        finally:
+            consumer.executor.shutdown()
+
+
 class ParseMessageValueTest(BaseQuerySubscriptionTest, unittest.TestCase):
     def run_test(self, message):
         self.consumer.parse_message_value(json.dumps(message))
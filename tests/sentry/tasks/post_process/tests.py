@@ -12,7 +12,7 @@ from sentry.testutils import TestCase
 from sentry.testutils.helpers import with_feature
 from sentry.testutils.helpers.datetime import iso_format, before_now
 from sentry.tasks.merge import merge_groups
-from sentry.tasks.post_process import post_process_group
+from sentry.tasks.post_process import post_process_group, post_process_group_batch
 
 
 class PostProcessGroupTest(TestCase):
@@ -398,3 +398,85 @@ class PostProcessGroupTest(TestCase):
         )
 
         assert not delay.called
+
+
+class PostProcessGroupBatchTest(TestCase):
+    def get_task_kwargs(self, event, is_new=False):
+        return {
+            "event_id": event.event_id,
+            "group_id": event.group_id,
+            "is_new": is_new,
+            "is_regression": False,
+            "is_new_group_environment": False,
+            "primary_hash": None,
+        }
+
+    @patch("sentry.signals.event_processed.send_robust")
+    @patch("sentry.rules.processor.RuleProcessor")
+    def test_processes_each_event(self, mock_processor, mock_signal):
+        event1 = self.store_event(
+            data={"message": "foo", "fingerprint": ["group"]}, project_id=self.project.id
+        )
+        event2 = self.store_event(
+            data={"message": "bar", "fingerprint": ["group"]}, project_id=self.project.id
+        )
+        assert event1.group_id == event2.group_id
+
+        mock_processor.return_value.apply.return_value = []
+
+        post_process_group_batch(
+            project_id=self.project.id,
+            events=[self.get_task_kwargs(event1, is_new=True), self.get_task_kwargs(event2)],
+        )
+
+        assert mock_processor.call_count == 2
+        assert mock_signal.call_count == 2
+
+        processed = [call[1]["event"] for call in mock_signal.call_args_list]
+        assert [e.event_id for e in processed] == [event1.event_id, event2.event_id]
+        assert processed[0].data["logentry"]["formatted"] == "foo"
+        assert processed[1].data["logentry"]["formatted"] == "bar"
+        assert processed[0].group is processed[1].group
+
+        first_call, second_call = mock_processor.call_args_list
+        assert first_call[1]["rules"] is second_call[1]["rules"]
+        assert first_call[1]["rule_statuses"] is second_call[1]["rule_statuses"]
+
+    @patch("sentry.rules.processor.RuleProcessor")
+    def test_invalidates_snooze_once(self, mock_processor):
+        event1 = self.store_event(
+            data={"message": "foo", "fingerprint": ["group"]}, project_id=self.project.id
+        )
+        event2 = self.store_event(
+            data={"message": "bar", "fingerprint": ["group"]}, project_id=self.project.id
+        )
+        snooze = GroupSnooze.objects.create(
+            group=event1.group, until=timezone.now() - timedelta(hours=1)
+        )
+
+        post_process_group_batch(
+            project_id=self.project.id,
+            events=[self.get_task_kwargs(event1), self.get_task_kwargs(event2)],
+        )
+
+        has_reappeared = [call[0][4] for call in mock_processor.call_args_list]
+        assert has_reappeared == [True, False]
+
+        assert not GroupSnooze.objects.filter(id=snooze.id).exists()
+        assert Group.objects.get(id=event1.group_id).status == GroupStatus.UNRESOLVED
+
+    @patch("sentry.rules.processor.RuleProcessor")
+    def test_skips_missing_events(self, mock_processor):
+        event = self.store_event(data={}, project_id=self.project.id)
+
+        mock_processor.return_value.apply.return_value = []
+
+        post_process_group_batch(
+            project_id=self.project.id,
+            events=[
+                dict(self.get_task_kwargs(event), event_id="a" * 32),
+                self.get_task_kwargs(event),
+            ],
+        )
+
+        assert mock_processor.call_count == 1
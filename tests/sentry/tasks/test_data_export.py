@@ -2,8 +2,16 @@ from __future__ import absolute_import
 
 import six
 
-from sentry.models import ExportedData, File
-from sentry.tasks.data_export import assemble_download, get_file_name, DataExportError
+from django.core.files.base import ContentFile
+
+from sentry.models import ExportedData, File, FileBlobIndex
+from sentry.tasks.data_export import (
+    assemble_download,
+    get_file_name,
+    DataExportError,
+    ExportFileWriter,
+    MAX_CHECKPOINT_RETRIES,
+)
 from sentry.testutils import TestCase, SnubaTestCase
 from sentry.utils.compat.mock import patch
 
@@ -76,6 +84,100 @@ class AssembleDownloadTest(TestCase, SnubaTestCase):
         assert raw1.startswith("bar,1,")
         assert raw2.startswith("bar2,2,")
 
+    @patch("sentry.tasks.data_export.EXPORT_PAGES_PER_TASK", 1)
+    @patch("sentry.tasks.data_export.SNUBA_MAX_RESULTS", 1)
+    def test_issue_by_tag_checkpoint(self):
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=0,
+            query_info={
+                "project_id": self.project.id,
+                "group_id": self.event.group_id,
+                "key": "foo",
+            },
+        )
+        with self.tasks(), patch.object(
+            assemble_download, "delay", wraps=assemble_download.delay
+        ) as delay:
+            assemble_download(de.id)
+
+        # Every full page triggered a checkpoint and a resumed task
+        assert [call[1]["cursor"] for call in delay.call_args_list] == ["bar", "bar2"]
+        assert delay.call_args_list[0][1]["bytes_written"] > 0
+        assert (
+            delay.call_args_list[1][1]["bytes_written"]
+            > delay.call_args_list[0][1]["bytes_written"]
+        )
+
+        de = ExportedData.objects.get(id=de.id)
+        assert de.date_finished is not None
+        header, raw1, raw2 = de.file.getfile().read().strip().split("\r\n")
+        assert header == "value,times_seen,last_seen,first_seen"
+        assert raw1.startswith("bar,1,")
+        assert raw2.startswith("bar2,2,")
+
+    @patch("sentry.models.ExportedData.email_failure")
+    @patch("sentry.tasks.data_export.IssuesByTagProcessor.iter_pages")
+    def test_issue_by_tag_resumes_from_checkpoint(self, iter_pages, emailer):
+        iter_pages.side_effect = Exception("boom")
+        de = ExportedData.objects.create(
+            user=self.user,
+            organization=self.org,
+            query_type=0,
+            query_info={
+                "project_id": self.project.id,
+                "group_id": self.event.group_id,
+                "key": "foo",
+            },
+        )
+        file = File.objects.create(name="test.csv", type="export.csv")
+        writer = ExportFileWriter(file)
+        writer.write(b"value,times_seen,last_seen,first_seen\r\n")
+        writer.flush()
+
+        with patch.object(assemble_download, "delay") as delay:
+            assemble_download(de.id, file_id=file.id, cursor="bar", bytes_written=writer.offset)
+
+        # The checkpointed file is kept and the export retried from it
+        assert File.objects.filter(id=file.id).exists()
+        delay.assert_called_once_with(
+            data_export_id=de.id,
+            file_id=file.id,
+            cursor="bar",
+            bytes_written=writer.offset,
+            retries=1,
+        )
+        assert not emailer.called
+
+        with patch.object(assemble_download, "delay") as delay:
+            assemble_download(
+                de.id,
+                file_id=file.id,
+                cursor="bar",
+                bytes_written=writer.offset,
+                retries=MAX_CHECKPOINT_RETRIES,
+            )
+
+        assert not delay.called
+        assert not File.objects.filter(id=file.id).exists()
+        assert emailer.call_args[1]["message"] == "Internal processing failure"
+
+    def test_export_file_writer(self):
+        file = File.objects.create(name="test.csv", type="export.csv")
+        writer = ExportFileWriter(file, blob_size=4)
+        writer.write(u"hello")
+        writer.write(b" world")
+        writer.finalize()
+
+        assert FileBlobIndex.objects.filter(file=file).count() == 3
+        assert file.size == 11
+        assert file.getfile().read() == b"hello world"
+
+        other = File.objects.create(name="test.csv", type="export.csv")
+        other.putfile(ContentFile(b"hello world"))
+        assert file.checksum == other.checksum
+
     @patch("sentry.models.ExportedData.email_failure")
     def test_issue_by_tag_errors(self, emailer):
         de1 = ExportedData.objects.create(
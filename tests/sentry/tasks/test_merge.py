@@ -48,6 +48,30 @@ class MergeGroupTest(TestCase):
             .values_list("environment_id", flat=True)
         ) == [1, 2]
 
+    def test_merge_multiple_groups_with_conflicts(self):
+        target = self.create_group(self.project)
+        sources = [self.create_group(self.project) for _ in range(3)]
+
+        GroupEnvironment.objects.create(group_id=target.id, environment_id=1)
+        for group in sources:
+            GroupEnvironment.objects.create(group_id=group.id, environment_id=1)
+            GroupEnvironment.objects.create(group_id=group.id, environment_id=2)
+        GroupEnvironment.objects.create(group_id=sources[2].id, environment_id=3)
+
+        with self.tasks():
+            merge_groups([group.id for group in sources], target.id)
+
+        assert not Group.objects.filter(id__in=[group.id for group in sources]).exists()
+        assert list(
+            GroupEnvironment.objects.filter(group_id=target.id)
+            .order_by("environment")
+            .values_list("environment_id", flat=True)
+        ) == [1, 2, 3]
+        assert not GroupEnvironment.objects.filter(
+            group_id__in=[group.id for group in sources]
+        ).exists()
+        assert GroupRedirect.objects.filter(group_id=target.id).count() == 3
+
     def test_merge_with_event_integrity(self):
         project = self.create_project()
         event1 = self.store_event(
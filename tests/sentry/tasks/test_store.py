@@ -8,7 +8,12 @@ from time import time
 from sentry import quotas
 from sentry.event_manager import EventManager, HashDiscarded
 from sentry.plugins.base.v2 import Plugin2
-from sentry.tasks.store import preprocess_event, process_event, save_event
+from sentry.tasks.store import (
+    preprocess_and_save_event,
+    preprocess_event,
+    process_event,
+    save_event,
+)
 from sentry.testutils.helpers.features import Feature
 
 EVENT_ID = "cc3e6c2bb6b6498097f336d1e6979f4b"
@@ -111,6 +116,83 @@ def test_move_to_save_event(default_project, mock_process_event, mock_save_event
     assert mock_save_event.delay.call_count == 1
 
 
+@pytest.mark.django_db
+def test_fused_move_to_process_event(
+    default_project, mock_process_event, mock_save_event, mock_default_cache, register_plugin
+):
+    register_plugin(BasicPreprocessorPlugin)
+    data = {
+        "project": default_project.id,
+        "platform": "mattlang",
+        "logentry": {"formatted": "test"},
+        "event_id": EVENT_ID,
+        "extra": {"foo": "bar"},
+    }
+
+    preprocess_and_save_event(
+        cache_key="e:1", data=data, start_time=1, event_id=EVENT_ID, project=default_project
+    )
+
+    mock_default_cache.set.assert_called_once_with("e:1", data, 3600)
+    assert mock_process_event.delay.call_count == 1
+    assert mock_save_event.delay.call_count == 0
+
+
+@pytest.mark.django_db
+def test_fused_save_event(
+    default_project, mock_process_event, mock_save_event, mock_default_cache, register_plugin
+):
+    register_plugin(BasicPreprocessorPlugin)
+    data = {
+        "project": default_project.id,
+        "platform": "NOTMATTLANG",
+        "logentry": {"formatted": "test"},
+        "event_id": EVENT_ID,
+        "extra": {"foo": "bar"},
+    }
+
+    with mock.patch("sentry.tasks.store._do_save_event") as mock_do_save_event:
+        preprocess_and_save_event(
+            cache_key="e:1", data=data, start_time=1, event_id=EVENT_ID, project=default_project
+        )
+
+    mock_do_save_event.assert_called_once_with(
+        cache_key="e:1",
+        data=data,
+        start_time=1,
+        event_id=EVENT_ID,
+        project_id=default_project.id,
+        fused=True,
+    )
+    assert mock_default_cache.set.call_count == 0
+    assert mock_process_event.delay.call_count == 0
+    assert mock_save_event.delay.call_count == 0
+
+
+@pytest.mark.django_db
+def test_fused_save_event_failure(
+    default_project, mock_process_event, mock_save_event, mock_default_cache, register_plugin
+):
+    register_plugin(BasicPreprocessorPlugin)
+    data = {
+        "project": default_project.id,
+        "platform": "NOTMATTLANG",
+        "logentry": {"formatted": "test"},
+        "event_id": EVENT_ID,
+        "extra": {"foo": "bar"},
+    }
+
+    with mock.patch("sentry.tasks.store._do_save_event", side_effect=ValueError("broken")):
+        with mock.patch("sentry.tasks.store.capture_exception") as mock_capture_exception:
+            # does not raise
+            preprocess_and_save_event(
+                cache_key="e:1", data=data, start_time=1, event_id=EVENT_ID, project=default_project
+            )
+
+    assert mock_capture_exception.call_count == 1
+    assert mock_save_event.delay.call_count == 0
+
+
 @pytest.mark.django_db
 def test_process_event_mutate_and_save(
     default_project, mock_default_cache, mock_save_event, register_plugin
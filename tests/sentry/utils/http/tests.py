@@ -270,8 +270,24 @@ class IsValidIPTestCase(TestCase):
         assert not self.is_valid_ip("127.0.0.1", ["127.0.0.0/8"])
         assert not self.is_valid_ip("127.0.0.1", ["0.0.0.0", "127.0.0.0/8", "192.168.1.0/8"])
 
+    def test_match_blacklist_overlapping_ranges(self):
+        inputs = ["10.0.0.0/8", "10.1.0.0/16", "10.255.255.0/24", "192.168.0.0/24"]
+        assert not self.is_valid_ip("10.0.0.1", inputs)
+        assert not self.is_valid_ip("10.1.2.3", inputs)
+        assert not self.is_valid_ip("10.255.255.255", inputs)
+        assert not self.is_valid_ip("192.168.0.255", inputs)
+        assert self.is_valid_ip("11.0.0.0", inputs)
+        assert self.is_valid_ip("192.168.1.0", inputs)
+
+    def test_match_blacklist_ipv6(self):
+        inputs = ["127.0.0.0/8", "2001:db8::/32"]
+        assert not self.is_valid_ip("2001:db8::1", inputs)
+        assert self.is_valid_ip("2001:db9::1", inputs)
+        assert self.is_valid_ip("::1", inputs)
+
     def test_garbage_input(self):
         assert self.is_valid_ip("127.0.0.1", ["lol/bar"])
+        assert self.is_valid_ip("lol", ["127.0.0.0/8"])
 
 
 class IsValidReleaseTestCase(TestCase):
@@ -329,6 +345,11 @@ class IsValidErrorMessageTestCase(TestCase):
         patterns = [u"*google_tag_manager['GTM-3TL3'].macro(...)*"]
         assert self.is_valid_error_message("it bad", patterns)
 
+    def test_bad_pattern_does_not_disable_others(self):
+        patterns = [u"[z-a]*", u"TypeError*"]
+        assert not self.is_valid_error_message("TypeError: foo", patterns)
+        assert self.is_valid_error_message("ImportError: foo", patterns)
+
 
 class OriginFromRequestTestCase(TestCase):
     def test_nothing(self):
@@ -1,8 +1,16 @@
 from __future__ import absolute_import
 
 import pytest
+import sentry_relay
 
-from sentry.utils.glob import glob_match
+from sentry.utils.compat import mock
+from sentry.utils.glob import (
+    MAX_CACHED_VALUE_LENGTH,
+    _LRUCache,
+    compile_glob,
+    glob_match,
+    glob_match_many,
+)
 
 
 class GlobInput(object):
@@ -52,3 +60,40 @@ class GlobInput(object):
 )
 def test_glob_match(glob_input, expect):
     assert glob_input() == expect
+
+
+@pytest.mark.parametrize(
+    "glob_input,expect",
+    [
+        [GlobInput("foo/hello.PY", "**/*.py", doublestar=True, ignorecase=True), True],
+        [GlobInput("foo/hello.PY", "**/*.PY", doublestar=True, ignorecase=True), True],
+        [GlobInput("foo:\nbar", "foo:*", allow_newline=False), False],
+    ],
+)
+def test_compiled_glob(glob_input, expect):
+    glob = compile_glob(glob_input.pat, **glob_input.kwargs)
+    assert compile_glob(glob_input.pat, **glob_input.kwargs) is glob
+
+    with mock.patch("sentry.utils.glob._match_results", _LRUCache(10)), mock.patch.object(
+        sentry_relay, "is_glob_match", wraps=sentry_relay.is_glob_match
+    ) as is_glob_match:
+        assert glob.match(glob_input.value) == expect
+        # The second call is answered from the match cache
+        assert glob.match(glob_input.value) == expect
+
+    assert is_glob_match.call_count == 1
+
+
+def test_match_many():
+    glob = compile_glob("*.py")
+    assert glob.match_many(["foo.py", "foo.js", "foo/bar.py"]) == [True, False, True]
+    assert glob_match_many("foo/bar.py", ["*.py", "*.js", "foo/*"]) == [True, False, True]
+    assert glob_match_many("foo/bar.py", []) == []
+
+
+def test_long_values_are_not_cached():
+    value = "x" * (MAX_CACHED_VALUE_LENGTH + 1)
+    glob = compile_glob("x*")
+    with mock.patch("sentry.utils.glob._match_results") as match_results:
+        assert glob.match(value)
+    assert not match_results.set.called
@@ -1,7 +1,10 @@
 from __future__ import absolute_import
 
+from collections import defaultdict
+
 from sentry.utils.compat import mock
 import pytest
+from six.moves.queue import Queue
 
 from sentry.utils import metrics
 
@@ -45,3 +48,37 @@ def test_wraps():
         args, kwargs = timing.call_args
         assert args[0] == "key"
         assert args[3] == {"foo": True, "result": "success"}
+
+
+def test_internal_metrics_flush():
+    internal = metrics.InternalMetrics()
+    pending = defaultdict(int)
+    internal._aggregate(pending, "foo", None, 1, 1.0)
+    internal._aggregate(pending, "foo", None, 2, 1.0)
+    internal._aggregate(pending, "foo", "bar", 1, 0.5)
+    assert pending == {"foo": 3, "foo.bar": 2}
+
+    with mock.patch("sentry.tsdb.incr_multi") as incr_multi:
+        internal._flush(pending)
+
+    assert incr_multi.call_count == 1
+    items = sorted(incr_multi.call_args[0][0], key=lambda item: item[1])
+    assert [(key, options["count"]) for _, key, options in items] == [("foo", 3), ("foo.bar", 2)]
+
+
+def test_internal_metrics_drops_when_full():
+    internal = metrics.InternalMetrics()
+    internal._started = True
+    internal.q = Queue(maxsize=1)
+
+    internal.incr("foo")
+    internal.incr("foo")
+    internal.incr("foo")
+    assert internal.q.qsize() == 1
+    assert internal._dropped == 2
+
+    with mock.patch("sentry.utils.metrics.backend") as backend:
+        internal._flush({})
+
+    backend.incr.assert_called_once_with("internal_metrics.dropped", None, None, 2, 1.0)
+    assert internal._dropped == 0
@@ -10,11 +10,20 @@ from datetime import datetime, timedelta
 import pytz
 
 from sentry.utils.compat.mock import patch
+from django.db import IntegrityError
 from django.utils import timezone
 
 from sentry import eventstream, tagstore
 from sentry.app import tsdb
-from sentry.models import Environment, Group, GroupHash, GroupRelease, Release, UserReport
+from sentry.models import (
+    Environment,
+    Group,
+    GroupEnvironment,
+    GroupHash,
+    GroupRelease,
+    Release,
+    UserReport,
+)
 from sentry.similarity import features, _make_index_backend
 from sentry.tasks.unmerge import (
     get_caches,
@@ -22,6 +31,8 @@ from sentry.tasks.unmerge import (
     get_fingerprint,
     get_group_backfill_attributes,
     get_group_creation_attributes,
+    repair_group_environment_data,
+    repair_group_release_data,
     unmerge,
 )
 from sentry.testutils import SnubaTestCase, TestCase
@@ -169,6 +180,85 @@ class UnmergeTestCase(TestCase, SnubaTestCase):
             "first_release": None,
         }
 
+    def create_release_events(self):
+        now = before_now(minutes=5).replace(microsecond=0)
+        events = [
+            self.store_event(
+                data={
+                    "message": "hello",
+                    "fingerprint": ["group1"],
+                    "environment": "production",
+                    "release": release,
+                    "timestamp": iso_format(now + timedelta(seconds=i)),
+                },
+                project_id=self.project.id,
+            )
+            for i, release in enumerate(["1.0", "1.0", "2.0"])
+        ]
+        # repairs are given events sorted from newest to oldest
+        return events[::-1]
+
+    def test_repair_group_release_data(self):
+        events = self.create_release_events()
+        group_id = events[0].group_id
+        GroupRelease.objects.filter(group_id=group_id).delete()
+
+        caches = get_caches()
+        repair_group_release_data(caches, self.project, events)
+
+        releases = {
+            release.version: release
+            for release in Release.objects.filter(organization_id=self.organization.id)
+        }
+        instances = {
+            instance.release_id: instance
+            for instance in GroupRelease.objects.filter(group_id=group_id)
+        }
+        assert set(instances) == set([releases["1.0"].id, releases["2.0"].id])
+        assert instances[releases["1.0"].id].first_seen == events[2].datetime
+        assert instances[releases["1.0"].id].last_seen == events[1].datetime
+        assert instances[releases["2.0"].id].first_seen == events[0].datetime
+
+        # the created rows are primed into the cache for the tsdb repair
+        with self.assertNumQueries(0):
+            assert (
+                caches["GroupRelease"](group_id, "production", releases["2.0"].id).id
+                == instances[releases["2.0"].id].id
+            )
+
+    def test_repair_group_release_data_integrity_error(self):
+        events = self.create_release_events()
+        group_id = events[0].group_id
+        release = Release.objects.get(organization_id=self.organization.id, version="1.0")
+        GroupRelease.objects.filter(group_id=group_id, release_id=release.id).delete()
+
+        with patch.object(GroupRelease.objects, "bulk_create", side_effect=IntegrityError):
+            repair_group_release_data(get_caches(), self.project, events)
+
+        instance = GroupRelease.objects.get(group_id=group_id, release_id=release.id)
+        assert instance.first_seen == events[2].datetime
+        assert GroupRelease.objects.filter(group_id=group_id).count() == 2
+
+    def test_repair_group_environment_data(self):
+        events = self.create_release_events()
+        group_id = events[0].group_id
+        environment = Environment.objects.get(
+            organization_id=self.organization.id, name="production"
+        )
+        GroupEnvironment.objects.filter(group_id=group_id).delete()
+
+        repair_group_environment_data(get_caches(), self.project, events)
+
+        instance = GroupEnvironment.objects.get(group_id=group_id, environment_id=environment.id)
+        assert instance.first_release.version == "1.0"
+
+        with patch.object(GroupEnvironment.objects, "bulk_create", side_effect=IntegrityError):
+            GroupEnvironment.objects.filter(group_id=group_id).delete()
+            repair_group_environment_data(get_caches(), self.project, events)
+
+        instance = GroupEnvironment.objects.get(group_id=group_id, environment_id=environment.id)
+        assert instance.first_release.version == "1.0"
+
     def test_unmerge(self):
         now = before_now(minutes=5).replace(microsecond=0, tzinfo=pytz.utc)
 